@@ -0,0 +1,195 @@
+"""
+Address Validator Module
+Checks recipient addresses in bulk before anything is sent
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+try:
+    from email_config import BLOCKED_DOMAINS, INTERNAL_DOMAINS
+except ImportError:
+    BLOCKED_DOMAINS = []
+    INTERNAL_DOMAINS = []
+
+
+# Practical subset of RFC 5322: dot-atom local part, dotted hostname domain
+EMAIL_PATTERN = re.compile(
+    r"[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}"
+)
+
+POLICY_BLOCKED = "blocked"
+POLICY_INTERNAL = "internal"
+POLICY_EXTERNAL = "external"
+
+
+def normalize_address(value) -> str:
+    """
+    Normalize an address cell value
+
+    Args:
+        value: Raw cell value
+
+    Returns:
+        Address with surrounding whitespace removed, lower-cased
+    """
+    if value is None:
+        return ""
+    return str(value).strip().lower()
+
+
+class AddressValidator:
+    """Validates recipient addresses and applies per-domain policy"""
+
+    def __init__(self, blocked_domains: Optional[Iterable[str]] = None,
+                 internal_domains: Optional[Iterable[str]] = None):
+        """
+        Initialize validator
+
+        Args:
+            blocked_domains: Domains (and their subdomains) that must never be emailed
+            internal_domains: Domains (and their subdomains) treated as internal
+        """
+        self.blocked_domains = {d.lower() for d in (blocked_domains if blocked_domains is not None else BLOCKED_DOMAINS)}
+        self.internal_domains = {d.lower() for d in (internal_domains if internal_domains is not None else INTERNAL_DOMAINS)}
+        self._policy_cache: Dict[str, str] = {}
+
+    def domain_policy(self, domain: str) -> str:
+        """
+        Classify a domain, caching the result
+
+        Args:
+            domain: Normalized domain name
+
+        Returns:
+            "blocked", "internal" or "external"
+        """
+        policy = self._policy_cache.get(domain)
+        if policy is not None:
+            return policy
+
+        parts = domain.split(".")
+        # The domain and every parent domain, e.g. mail.corp.com -> corp.com
+        candidates = [".".join(parts[i:]) for i in range(len(parts) - 1)]
+        # A blocked parent wins over a subdomain listed as internal
+        if any(candidate in self.blocked_domains for candidate in candidates):
+            policy = POLICY_BLOCKED
+        elif any(candidate in self.internal_domains for candidate in candidates):
+            policy = POLICY_INTERNAL
+        else:
+            policy = POLICY_EXTERNAL
+
+        self._policy_cache[domain] = policy
+        return policy
+
+    def check(self, address: str) -> Optional[str]:
+        """
+        Check a single normalized address
+
+        Args:
+            address: Normalized email address
+
+        Returns:
+            Reason the address is invalid, or None if it is valid
+        """
+        if not address:
+            return "Missing email address"
+        if not EMAIL_PATTERN.fullmatch(address):
+            return "Invalid email address"
+        if self.domain_policy(address.rsplit("@", 1)[1]) == POLICY_BLOCKED:
+            return "Blocked domain"
+        return None
+
+    def is_internal(self, address: str) -> bool:
+        """
+        Whether a valid normalized address belongs to an internal domain
+
+        Args:
+            address: Normalized email address
+
+        Returns:
+            True if the domain (or a parent domain) is listed as internal
+        """
+        return "@" in address and self.domain_policy(address.rsplit("@", 1)[1]) == POLICY_INTERNAL
+
+    def internal_entries(self, interviews: List[Dict]) -> List[Dict]:
+        """
+        Report the interviews addressed to internal recipients
+
+        Args:
+            interviews: Validated interview dictionaries
+
+        Returns:
+            Entries with 'email' and 'row_num' for every internal recipient
+        """
+        return [{'email': interview['email'], 'row_num': interview.get('row_num')}
+                for interview in interviews if self.is_internal(interview['email'])]
+
+    def validate(self, interviews: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Validate the email of every interview, normalizing it in place
+
+        Args:
+            interviews: Interview dictionaries with an 'email' key
+
+        Returns:
+            Tuple of (valid interviews, invalid entries with 'email', 'error' and 'row_num')
+        """
+        valid = []
+        invalid = []
+
+        for interview in interviews:
+            address = normalize_address(interview['email'])
+            error = self.check(address)
+            if error:
+                invalid.append({
+                    'email': str(interview['email']),
+                    'error': error,
+                    'row_num': interview.get('row_num')
+                })
+                continue
+            interview['email'] = address
+            valid.append(interview)
+
+        return valid, invalid
+
+    def validate_series(self, emails):
+        """
+        Validate a pandas Series of addresses in one vectorized pass
+
+        Args:
+            emails: pandas Series of raw email cell values
+
+        Returns:
+            Tuple of (normalized Series, Series of error reasons with None for valid rows)
+
+        Internal recipients are valid; see internal_series to report them.
+        """
+        normalized = emails.fillna("").astype(str).str.strip().str.lower()
+        reasons = normalized.astype(object)
+        reasons[:] = None
+
+        syntax_ok = normalized.str.fullmatch(EMAIL_PATTERN.pattern)
+        reasons[normalized == ""] = "Missing email address"
+        reasons[(normalized != "") & ~syntax_ok] = "Invalid email address"
+
+        # Policy is evaluated once per distinct domain
+        domains = normalized[syntax_ok].str.rsplit("@", n=1).str[1]
+        policies = {domain: self.domain_policy(domain) for domain in domains.unique()}
+        blocked = domains.map(policies) == POLICY_BLOCKED
+        reasons[blocked[blocked].index] = "Blocked domain"
+
+        return normalized, reasons
+
+    def internal_series(self, normalized):
+        """
+        Flag the internal recipients in a normalized Series from validate_series
+
+        Args:
+            normalized: pandas Series of normalized addresses
+
+        Returns:
+            Boolean Series, True for addresses in an internal domain
+        """
+        domains = normalized.where(normalized.str.fullmatch(EMAIL_PATTERN.pattern), "").str.rsplit("@", n=1).str[-1]
+        policies = {domain: self.domain_policy(domain) for domain in domains.unique() if domain}
+        return domains.map(policies) == POLICY_INTERNAL
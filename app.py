@@ -7,9 +7,17 @@ import pandas as pd
 import openpyxl
 from datetime import datetime
 import os
-from email_sender import OutlookEmailer
+from transports import create_emailer
 from logger import EmailLogger
+from address_validator import AddressValidator
+from metrics import start_metrics_server, EMAILS_SENT, EMAILS_FAILED, EMAILS_SKIPPED, WRITEBACK_SECONDS
+from interview_record import Interview
+from excel_reader import RECORD_FIELDS, column_key
+from message_builder import MessageBuilder
+from exports import build_exports
+from workbook_cache import load_snapshot
 import tempfile
+import time
 
 
 # Page configuration
@@ -49,6 +57,9 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Serve live send metrics (started once per server process, if METRICS_PORT is set)
+start_metrics_server()
+
 # Initialize session state
 if 'uploaded_file_path' not in st.session_state:
     st.session_state.uploaded_file_path = None
@@ -56,18 +67,88 @@ if 'email_results' not in st.session_state:
     st.session_state.email_results = []
 if 'show_results' not in st.session_state:
     st.session_state.show_results = False
+if 'exports' not in st.session_state:
+    st.session_state.exports = None
+if 'upload_key' not in st.session_state:
+    st.session_state.upload_key = None
+if 'df' not in st.session_state:
+    st.session_state.df = None
+if 'quick_stats' not in st.session_state:
+    st.session_state.quick_stats = None
 
 
 def load_excel_data(file_path):
-    """Load and display Excel data"""
+    """
+    Load and display Excel data
+    
+    The sheet comes from the workbook cache shared with the command line
+    tool, so a workbook seen before (by either) opens without parsing it.
+    """
     try:
-        df = pd.read_excel(file_path)
-        return df
+        with load_snapshot(file_path) as snapshot:
+            return snapshot.to_dataframe()
     except Exception as e:
         st.error(f"Error loading Excel file: {str(e)}")
         return None
 
 
+def find_status_column(df):
+    """Guess the status column used for Quick Stats"""
+    for col in df.columns:
+        if 'status' in col.lower() or 'sent' in col.lower():
+            return col
+    return None
+
+
+def load_session_data(file_path):
+    """
+    Parse the working copy once and cache the DataFrame and Quick Stats
+    in the session; later reruns reuse them instead of re-reading the file
+    """
+    df = load_excel_data(file_path)
+    st.session_state.df = df
+    if df is None:
+        st.session_state.quick_stats = None
+        return
+    status_col_name = find_status_column(df)
+    # Status cells become "Sent" strings, even if the column started out empty
+    if status_col_name is not None and df[status_col_name].dtype != object:
+        df[status_col_name] = df[status_col_name].astype(object)
+    st.session_state.quick_stats = {
+        'total': len(df),
+        'sent': int((df[status_col_name] == 'Sent').sum()) if status_col_name else 0,
+        'status_col': status_col_name
+    }
+
+
+def apply_sent_rows(df, status_col, sent_rows, quick_stats):
+    """
+    Merge send results into the cached DataFrame
+
+    Only the rows that were just sent are touched, and Quick Stats are
+    adjusted by the number of rows that changed.
+    
+    Args:
+        df: Cached DataFrame (row 2 of the sheet is position 0)
+        status_col: Status column the results were written to
+        sent_rows: Worksheet row numbers marked as "Sent"
+        quick_stats: Cached Quick Stats to update
+    """
+    if df is None or not status_col or status_col not in df.columns:
+        return
+    if df[status_col].dtype != object:
+        df[status_col] = df[status_col].astype(object)
+    position = df.columns.get_loc(status_col)
+    changed = 0
+    for row_num in sent_rows:
+        index = row_num - 2
+        if 0 <= index < len(df) and df.iat[index, position] != 'Sent':
+            df.iat[index, position] = 'Sent'
+            changed += 1
+    if quick_stats and quick_stats['status_col'] == status_col:
+        quick_stats['sent'] += changed
+
+
 def detect_columns(df):
     """Auto-detect column mappings based on common patterns"""
     column_mapping = {
@@ -116,9 +197,31 @@ def detect_columns(df):
     return column_mapping
 
 
+def find_placeholder_columns(headers):
+    """
+    Match extra template placeholders to sheet columns by header
+    
+    Returns:
+        Tuple of ({placeholder: header}, [placeholders without a column])
+    """
+    by_key = {}
+    for header in headers:
+        if header is not None:
+            by_key.setdefault(column_key(header), header)
+    found = {}
+    missing = []
+    for field in sorted(MessageBuilder.from_config().fields - RECORD_FIELDS):
+        if field in by_key:
+            found[field] = by_key[field]
+        else:
+            missing.append(field)
+    return found, missing
+
+
 def send_emails_with_mapping(file_path, column_mapping):
     """Send emails using uploaded file with custom column mapping"""
     results = {
+        'sent_rows': [],
         'sent': [],
         'failed': [],
         'skipped': []
@@ -129,6 +232,8 @@ def send_emails_with_mapping(file_path, column_mapping):
     logger.log_session_start()
     
     # Load Excel file
+    wb = None
+    emailer = None
     try:
         wb = openpyxl.load_workbook(file_path)
         ws = wb.active
@@ -142,12 +247,21 @@ def send_emails_with_mapping(file_path, column_mapping):
         desc_col = header_row.get(column_mapping['description'])
         status_col = header_row.get(column_mapping['status']) if column_mapping['status'] else None
         
-        # Initialize Outlook emailer
-        emailer = OutlookEmailer()
+        # Read only the extra columns the templates use
+        placeholder_columns, missing = find_placeholder_columns(header_row)
+        if missing:
+            logger.log_email_failed("System", f"No column for placeholder(s): {', '.join(missing)}")
+            return None
+        extra_cols = [(field, header_row[header]) for field, header in placeholder_columns.items()]
+        
+        # Initialize emailer for the configured transport (Outlook runs COM on
+        # its own worker thread, independent of the Streamlit script thread)
+        emailer = create_emailer()
         if not emailer.connect():
-            wb.close()
             return None
         
+        candidates = []
+        
         # Process rows
         for row_num in range(2, ws.max_row + 1):
             email = ws.cell(row=row_num, column=email_col).value
@@ -159,51 +273,98 @@ def send_emails_with_mapping(file_path, column_mapping):
             # Skip if already sent or no email
             if status == "Sent" or not email:
                 if status == "Sent":
-                    results['skipped'].append({'email': str(email)})
+                    results['skipped'].append({'row_num': row_num, 'email': str(email),
+                                               'error': 'Already sent'})
+                    EMAILS_SKIPPED.inc()
                 continue
             
             # Validate required fields
             if not all([email, date, time_val, description]):
                 results['failed'].append({
+                    'row_num': row_num,
                     'email': str(email) if email else 'Unknown',
                     'error': 'Missing required data'
                 })
+                EMAILS_FAILED.inc()
                 continue
             
             # Prepare interview data
-            interview_data = {
-                'email': str(email).strip(),
-                'date': str(date).strip(),
-                'time': str(time_val).strip(),
-                'description': str(description).strip()
-            }
-            
-            # Send email
-            if emailer.send_interview_notification(interview_data):
+            extra = {field: ws.cell(row=row_num, column=col).value for field, col in extra_cols}
+            candidates.append(Interview.from_cells(row_num, email, date, time_val, description, extra))
+        
+        # Reject malformed or blocked addresses in one batch before sending
+        validator = AddressValidator()
+        candidates, invalid = validator.validate(candidates)
+        logger.log_invalid_addresses(invalid)
+        logger.log_internal_recipients(validator.internal_entries(candidates))
+        EMAILS_FAILED.inc(len(invalid))
+        for entry in invalid:
+            results['failed'].append({'row_num': entry['row_num'], 'email': entry['email'],
+                                      'error': entry['error']})
+        
+        # Queue every email; the transport sends while results are written back.
+        # Each future records when it finished, for the results report.
+        timings = [None] * len(candidates)
+        
+        def record_timing(index, started):
+            def done(future):
+                timings[index] = (datetime.now().isoformat(timespec='seconds'),
+                                  round((time.perf_counter() - started) * 1000, 1))
+            return done
+        
+        submitted = []
+        for index, interview_data in enumerate(candidates):
+            future = emailer.submit(interview_data)
+            future.add_done_callback(record_timing(index, time.perf_counter()))
+            submitted.append((interview_data, future))
+        
+        for index, (interview_data, future) in enumerate(submitted):
+            sent = future.result()
+            finished_at, elapsed_ms = timings[index] or ('', '')
+            if sent:
                 # Mark as sent
                 if status_col:
-                    ws.cell(row=row_num, column=status_col, value="Sent")
-                    wb.save(file_path)
+                    with WRITEBACK_SECONDS.time():
+                        ws.cell(row=interview_data['row_num'], column=status_col, value="Sent")
+                        wb.save(file_path)
                 
                 logger.log_email_sent(interview_data['email'])
+                EMAILS_SENT.inc()
+                if status_col:
+                    results['sent_rows'].append(interview_data['row_num'])
                 results['sent'].append({
+                    'row_num': interview_data['row_num'],
                     'email': interview_data['email'],
                     'date': interview_data['date'],
-                    'time': interview_data['time']
+                    'time': interview_data['time'],
+                    'finished_at': finished_at,
+                    'elapsed_ms': elapsed_ms
                 })
             else:
                 logger.log_email_failed(interview_data['email'], "Failed to send email")
+                EMAILS_FAILED.inc()
                 results['failed'].append({
+                    'row_num': interview_data['row_num'],
                     'email': interview_data['email'],
-                    'error': 'Failed to send email'
+                    'error': 'Failed to send email',
+                    'finished_at': finished_at,
+                    'elapsed_ms': elapsed_ms
                 })
         
-        wb.close()
         logger.log_session_end(len(results['sent']), len(results['failed']))
         
     except Exception as e:
         logger.log_email_failed("System", str(e))
         return None
+    finally:
+        # Stop the Outlook worker thread and release the workbook whether
+        # or not the run got through; each session also opens its own send
+        # log index connection
+        if emailer is not None:
+            emailer.close()
+        if wb is not None:
+            wb.close()
+        logger.close()
     
     return results
 
@@ -255,36 +416,27 @@ with col1:
 with col2:
     st.header("📊 Quick Stats")
     if uploaded_file is not None:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            temp_file_path = tmp_file.name
-            st.session_state.uploaded_file_path = temp_file_path
-        
-        # Load and display stats
-        df = load_excel_data(temp_file_path)
-        
-        if df is not None:
-            total_rows = len(df)
-            # Try to find status column
-            status_col_name = None
-            for col in df.columns:
-                if 'status' in col.lower() or 'sent' in col.lower():
-                    status_col_name = col
-                    break
-            
-            sent_count = len(df[df[status_col_name] == 'Sent']) if status_col_name and status_col_name in df.columns else 0
-            pending_count = total_rows - sent_count
-            
-            st.metric("Total Interviews", total_rows)
-            st.metric("Already Sent", sent_count, delta=None)
-            st.metric("Pending", pending_count, delta=None)
+        # Save a working copy of each new upload once; sending updates that
+        # copy, so reruns must not overwrite it with the original bytes
+        upload_key = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, 'file_id', None))
+        if st.session_state.upload_key != upload_key or not st.session_state.uploaded_file_path:
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
+                tmp_file.write(uploaded_file.getvalue())
+                st.session_state.uploaded_file_path = tmp_file.name
+            st.session_state.upload_key = upload_key
+            load_session_data(st.session_state.uploaded_file_path)
+        
+        stats = st.session_state.quick_stats
+        if stats is not None:
+            st.metric("Total Interviews", stats['total'])
+            st.metric("Already Sent", stats['sent'], delta=None)
+            st.metric("Pending", stats['total'] - stats['sent'], delta=None)
 
 # Display Excel content and column mapping
 if uploaded_file is not None and st.session_state.uploaded_file_path:
     st.markdown("---")
     
-    df = load_excel_data(st.session_state.uploaded_file_path)
+    df = st.session_state.df
     
     if df is not None:
         # Auto-detect columns
@@ -362,6 +514,22 @@ if uploaded_file is not None and st.session_state.uploaded_file_path:
         
         pending_df = pending_df[pending_df[email_col].notna()]
         
+        # Template placeholders must match a column header (e.g. {meeting_link} -> "Meeting Link")
+        _, missing_placeholders = find_placeholder_columns(df.columns)
+        if missing_placeholders:
+            st.error("❌ No column found for template placeholder(s): "
+                     + ", ".join(f"{{{field}}}" for field in missing_placeholders))
+        
+        # Flag invalid addresses up front; they are skipped when sending
+        validator = AddressValidator()
+        addresses, address_errors = validator.validate_series(pending_df[email_col])
+        invalid_count = int(address_errors.notna().sum())
+        if invalid_count:
+            st.warning(f"⚠️ {invalid_count} row(s) have invalid email addresses and will be skipped")
+        internal_count = int(validator.internal_series(addresses).sum())
+        if internal_count:
+            st.info(f"ℹ️ {internal_count} row(s) are addressed to internal recipients")
+        
         if len(pending_df) > 0:
             st.markdown("---")
             st.header("🚀 Send Notifications")
@@ -377,14 +545,20 @@ if uploaded_file is not None and st.session_state.uploaded_file_path:
                         results = send_emails_with_mapping(st.session_state.uploaded_file_path, column_mapping)
                         
                         if results is not None:
+                            # Patch the cached preview instead of re-reading the workbook
+                            apply_sent_rows(st.session_state.df, column_mapping['status'],
+                                            results['sent_rows'], st.session_state.quick_stats)
                             st.session_state.email_results = results
+                            st.session_state.exports = None
                             st.session_state.show_results = True
                             st.rerun()
                         else:
-                            st.error("Failed to connect to Outlook or process file!")
+                            st.error("Failed to connect to the email transport or process file!")
             
             with col3:
                 if st.button("🔄 Refresh Data", use_container_width=True):
+                    # Re-read the working copy, e.g. after it was changed outside the app
+                    load_session_data(st.session_state.uploaded_file_path)
                     st.rerun()
         else:
             st.markdown('<div class="info-box">ℹ️ No pending interviews to send. All notifications have been sent!</div>', unsafe_allow_html=True)
@@ -419,22 +593,49 @@ if st.session_state.show_results:
         failed_df = pd.DataFrame(results['failed'])
         st.dataframe(failed_df, use_container_width=True)
     
-    # Download updated file
+    # Downloads: built once per send job, then served from the session on every rerun
     st.markdown("---")
-    if st.button("📥 Download Updated Excel File"):
-        with open(st.session_state.uploaded_file_path, 'rb') as f:
+    if st.session_state.exports is None and st.session_state.uploaded_file_path:
+        st.session_state.exports = (datetime.now().strftime('%Y%m%d_%H%M%S'),
+                                    build_exports(results, st.session_state.uploaded_file_path))
+    
+    if st.session_state.exports is not None:
+        stamp, exports = st.session_state.exports
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
             st.download_button(
-                label="💾 Download",
-                data=f,
-                file_name=f"interviews_updated_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                label="📥 Download Updated Excel File",
+                data=exports['workbook'],
+                file_name=f"interviews_updated_{stamp}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
+        
+        with col2:
+            st.download_button(
+                label="📄 Download Results (CSV)",
+                data=exports['csv'],
+                file_name=f"send_results_{stamp}.csv",
+                mime="text/csv"
+            )
+        
+        with col3:
+            st.download_button(
+                label="🧾 Download Results (JSONL)",
+                data=exports['jsonl'],
+                file_name=f"send_results_{stamp}.jsonl",
+                mime="application/x-ndjson"
+            )
     
     # Clear results
     if st.button("🔄 Start New Session"):
         st.session_state.email_results = []
         st.session_state.show_results = False
+        st.session_state.exports = None
         st.session_state.uploaded_file_path = None
+        st.session_state.upload_key = None
+        st.session_state.df = None
+        st.session_state.quick_stats = None
         st.rerun()
 
 # Footer
@@ -0,0 +1,262 @@
+"""
+App Load Test Module
+Runs several headless sessions of the Streamlit app at once (upload,
+rerun, column mapping change, send) against the fake transport and
+reports latency percentiles per interaction and memory growth per session
+
+Requires streamlit 1.28 or newer (for streamlit.testing.v1.AppTest) and a
+pyarrow build that matches the installed NumPy. This harness has not been
+run end to end yet, so treat its first results as a shakedown of the test
+itself rather than as a baseline.
+"""
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List
+import openpyxl
+from check_outlook import summarize
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Session state key the scripted upload is read from
+UPLOAD_KEY = "load_test_upload"
+
+INTERACTIONS = ("upload", "rerun", "mapping", "send")
+
+# AppTest can't drive st.file_uploader, so the wrapper swaps it for a
+# function returning the session's scripted upload, then runs the app
+_WRAPPER = """
+import runpy
+import sys
+import streamlit as st
+sys.path.insert(0, {directory!r})
+st.file_uploader = lambda *args, **kwargs: st.session_state.get({key!r})
+runpy.run_path({app!r}, run_name="__main__")
+"""
+
+
+class ScriptedUpload:
+    """Stands in for Streamlit's UploadedFile"""
+
+    def __init__(self, name: str, content: bytes):
+        self.name = name
+        self.size = len(content)
+        self.file_id = f"{name}-{id(self)}"
+        self._content = content
+
+    def getvalue(self) -> bytes:
+        return self._content
+
+
+def make_workbook(rows: int, session: int, round_num: int) -> bytes:
+    """
+    A recruiter's workbook in the create_template.py layout
+
+    Args:
+        rows: Interview rows
+        session: Session number (keeps addresses distinct between sessions)
+        round_num: Upload round (each upload is a new file)
+
+    Returns:
+        .xlsx content
+    """
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Email", "Date", "Time", "Description", "Status"])
+    start = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=2)
+    for n in range(rows):
+        sheet.append([f"candidate{session}-{round_num}-{n}@example.com", start + timedelta(days=n % 20),
+                      f"{9 + n % 8}:00 AM" if n % 8 < 3 else f"{n % 8 - 2}:00 PM",
+                      ("Technical Interview", "HR Screening", "Final Round")[n % 3], None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _widget(widgets, label: str):
+    """The widget whose label contains `label`"""
+    for widget in widgets:
+        if label in widget.label:
+            return widget
+    raise LookupError(f"No widget labelled '{label}' on the page")
+
+
+class ScriptedSession:
+    """One browser session driven through streamlit.testing.AppTest"""
+
+    def __init__(self, number: int, rows: int, timeout: float):
+        """
+        Initialize session
+
+        Args:
+            number: Session number
+            rows: Rows in each uploaded workbook
+            timeout: Seconds a single script run may take
+        """
+        from streamlit.testing.v1 import AppTest
+
+        self.number = number
+        self.rows = rows
+        self.app = AppTest.from_string(
+            _WRAPPER.format(directory=os.path.dirname(APP_PATH), key=UPLOAD_KEY, app=APP_PATH),
+            default_timeout=timeout)
+        self.latencies: Dict[str, List[float]] = {name: [] for name in INTERACTIONS}
+        self.errors: List[str] = []
+        self.sent = 0
+
+    def _timed(self, name: str, action):
+        started = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            self.errors.append(f"{name}: {str(e)}")
+            return
+        self.latencies[name].append(time.perf_counter() - started)
+        for exception in self.app.exception:
+            self.errors.append(f"{name}: {exception.message}")
+
+    def run_round(self, round_num: int):
+        """Upload a new workbook, rerun, remap a column and back, then send"""
+        content = make_workbook(self.rows, self.number, round_num)
+        self.app.session_state[UPLOAD_KEY] = ScriptedUpload(f"interviews_{self.number}_{round_num}.xlsx", content)
+        errors = len(self.errors)
+        self._timed("upload", self.app.run)
+        if len(self.errors) > errors:
+            return
+        self._timed("rerun", self.app.run)
+
+        try:
+            # Point the description at another column and back, as a recruiter fixing a guess would
+            box = _widget(self.app.selectbox, "Description Column")
+            detected = box.value
+            other = next(option for option in box.options if option != detected)
+            self._timed("mapping", lambda: box.set_value(other).run())
+            box = _widget(self.app.selectbox, "Description Column")
+            self._timed("mapping", lambda: box.set_value(detected).run())
+            send = _widget(self.app.button, "Send All Notifications")
+        except LookupError as e:
+            self.errors.append(f"round {round_num + 1}: {str(e)}")
+            return
+        self._timed("send", lambda: send.click().run())
+        results = self.app.session_state["email_results"]
+        if results:
+            self.sent += len(results['sent'])
+            if results['failed']:
+                self.errors.append(f"send: {len(results['failed'])} email(s) failed")
+
+
+def load_test(sessions: int = 10, rows: int = 200, rounds: int = 3, latency: float = 0.001,
+              timeout: float = 120) -> Dict:
+    """
+    Run concurrent app sessions against the fake transport
+
+    Every round, each session uploads a new workbook and works through it
+    at the same time as the others. Memory is traced for the whole run,
+    which slows everything down alike, so compare latencies between runs
+    of this test rather than with production.
+
+    Args:
+        sessions: Concurrent sessions (recruiters)
+        rows: Interviews per uploaded workbook
+        rounds: Uploads per session
+        latency: Fake transport latency per message (seconds)
+        timeout: Seconds a single script run may take
+
+    Returns:
+        Latency percentiles per interaction (ms), memory growth per session
+        and round (KiB), emails sent and errors
+    """
+    import transports
+
+    create_emailer = transports.create_emailer
+    workdir = tempfile.mkdtemp(prefix="app_load_test_")
+    previous_dir = os.getcwd()
+    tracemalloc.start()
+    try:
+        # The app's log and workbook cache go to a scratch directory, and it
+        # sends through the fake transport
+        os.chdir(workdir)
+        transports.create_emailer = lambda *args, **kwargs: create_emailer(
+            "fake", identities=[], latency=latency, verbose=False)
+
+        runners = [ScriptedSession(n + 1, rows, timeout) for n in range(sessions)]
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        growth = []
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            for round_num in range(rounds):
+                list(pool.map(lambda session: session.run_round(round_num), runners))
+                gc.collect()
+                current = tracemalloc.get_traced_memory()[0]
+                growth.append(round((current - baseline) / sessions / 1024, 1))
+                baseline = current
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        transports.create_emailer = create_emailer
+        os.chdir(previous_dir)
+
+    samples = {name: [s for session in runners for s in session.latencies[name]] for name in INTERACTIONS}
+    return {
+        'sessions': sessions,
+        'rounds': rounds,
+        'elapsed': elapsed,
+        'latency_ms': {name: summarize(samples[name]) for name in INTERACTIONS},
+        'memory_kib_per_session': growth,
+        'peak_mib': peak / 2 ** 20,
+        'sent': sum(session.sent for session in runners),
+        'expected': sessions * rows * rounds,
+        'errors': [f"session {session.number}: {error}" for session in runners for error in session.errors],
+        'workdir': workdir,
+    }
+
+
+def print_report(results: Dict):
+    """Print a load test summary"""
+    print(f"\n{results['sessions']} sessions x {results['rounds']} rounds in {results['elapsed']:.1f}s, "
+          f"sent {results['sent']}/{results['expected']}\n")
+    print(f"{'interaction':<12}" + "".join(f"{key:>10}" for key in ("p50", "p90", "p95", "p99", "max")))
+    for name, summary in results['latency_ms'].items():
+        if summary:
+            print(f"{name:<12}" + "".join(f"{summary[key]:>10.1f}" for key in ("p50", "p90", "p95", "p99", "max")))
+    print("\nMemory growth per session by round (KiB): "
+          + ", ".join(f"{kib:g}" for kib in results['memory_kib_per_session'])
+          + f"   peak {results['peak_mib']:.1f} MiB")
+    if results['errors']:
+        print(f"\n✗ {len(results['errors'])} error(s):")
+        for error in results['errors'][:20]:
+            print(f"  {error}")
+    else:
+        print("\n✓ No errors")
+
+
+def check_requirements() -> bool:
+    """Whether streamlit's AppTest can be imported here"""
+    try:
+        from streamlit.testing.v1 import AppTest  # noqa: F401
+    except Exception as e:
+        print(f"✗ Cannot run the app load test: {str(e)}")
+        print("  It needs streamlit 1.28 or newer and a pyarrow build matching the installed NumPy")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    if not check_requirements():
+        sys.exit(2)
+    args = [int(a) for a in sys.argv[1:4]]
+    sessions, rows, rounds = args + [10, 200, 3][len(args):]
+    print(f"App load test: {sessions} sessions, {rows} rows per upload, {rounds} rounds")
+    print("ℹ This harness is unverified; check its errors before trusting the numbers")
+    results = load_test(sessions, rows, rounds)
+    print_report(results)
+    sys.exit(1 if results['errors'] or results['sent'] < results['expected'] else 0)
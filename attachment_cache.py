@@ -0,0 +1,279 @@
+"""
+Attachment Cache Module
+Reads, hashes and MIME-encodes each attachment file once per run and
+shares the encoded part between every message that attaches it
+"""
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+from email.header import Header
+from typing import Dict, Iterable, List, Optional, Tuple
+try:
+    from email_config import ATTACHMENT_CACHE_MB, ATTACHMENT_DIRECTORY
+except ImportError:
+    ATTACHMENT_CACHE_MB = 64
+    ATTACHMENT_DIRECTORY = "attachments"
+
+
+CRLF = "\r\n"
+
+# Base64 line length allowed by RFC 2045
+BASE64_LINE = 76
+
+# Separators between several files named in one attachment cell
+_PATH_SEPARATORS = re.compile(r"\s*[;\n]\s*")
+
+
+class Attachment:
+    """One attachment of a message: its own part headers plus the shared encoded content"""
+
+    __slots__ = ("path", "filename", "content_type", "digest", "size", "headers", "body")
+
+    def __init__(self, path: str, filename: str, content_type: str, digest: str, size: int,
+                 headers: bytes, body: bytes):
+        """
+        Initialize attachment
+
+        Args:
+            path: Absolute path of the file (Outlook attaches by path)
+            filename: File name shown to the recipient
+            content_type: MIME type
+            digest: SHA-256 of the content
+            size: Content size in bytes
+            headers: MIME part headers (ASCII bytes, ending with the blank line)
+            body: Base64 content (ASCII bytes), shared by files with the same content
+        """
+        self.path = path
+        self.filename = filename
+        self.content_type = content_type
+        self.digest = digest
+        self.size = size
+        self.headers = headers
+        self.body = body
+
+
+def encode_headers(filename: str, content_type: str) -> bytes:
+    """
+    MIME part headers for an attachment
+
+    Args:
+        filename: File name shown to the recipient
+        content_type: MIME type
+
+    Returns:
+        Headers as ASCII bytes, ending with the blank line before the content
+    """
+    try:
+        filename.encode("ascii")
+        quoted = f'"{filename}"'
+    except UnicodeEncodeError:
+        quoted = Header(filename, "utf-8").encode()
+    return (
+        f"Content-Type: {content_type}; name={quoted}" + CRLF +
+        "Content-Transfer-Encoding: base64" + CRLF +
+        f"Content-Disposition: attachment; filename={quoted}" + CRLF + CRLF
+    ).encode("ascii")
+
+
+def encode_body(content: bytes) -> bytes:
+    """
+    Base64 encode file content in RFC 2045 lines
+
+    Args:
+        content: File content
+
+    Returns:
+        Encoded content as ASCII bytes with CRLF line endings
+    """
+    encoded = base64.b64encode(content)
+    crlf = CRLF.encode("ascii")
+    return crlf.join(encoded[i:i + BASE64_LINE] for i in range(0, len(encoded), BASE64_LINE)) + crlf
+
+
+class AttachmentCache:
+    """
+    Content-addressed LRU cache of encoded attachment content
+
+    Encoded content is keyed by the SHA-256 of the file, so the same file
+    under two paths is encoded once. Paths are mapped to their attachment
+    by (mtime, size), so a file is only read again when it changes or its
+    content was evicted. Encoded content is kept within max_bytes; a file
+    larger than that is encoded for each message and never cached.
+    """
+
+    def __init__(self, max_bytes: int = ATTACHMENT_CACHE_MB * 1024 * 1024):
+        """
+        Initialize attachment cache
+
+        Args:
+            max_bytes: Memory cap for encoded content
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+        self._by_path: Dict[str, Tuple[int, int, Attachment]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Attachment:
+        """
+        Encoded attachment for a file
+
+        Args:
+            path: File path
+
+        Returns:
+            Attachment (raises OSError if the file can't be read)
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            known = self._by_path.get(path)
+            if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                body = self._bodies.get(known[2].digest)
+                if body is not None:
+                    self._bodies.move_to_end(known[2].digest)
+                    self.stats['hits'] += 1
+                    return self._attachment(known[2], body)
+
+        # Read and hash outside the lock so other files aren't held up
+        with open(path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        with self._lock:
+            body = self._bodies.get(digest)
+            if body is not None:
+                # Same content under another path (or another thread got here first)
+                self._bodies.move_to_end(digest)
+                self.stats['hits'] += 1
+        if body is None:
+            body = encode_body(content)
+            with self._lock:
+                self.stats['misses'] += 1
+                self._store(digest, body)
+
+        filename = os.path.basename(path)
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        # Per-path details without the content, so evicted content can be freed
+        details = Attachment(path, filename, content_type, digest, len(content),
+                             encode_headers(filename, content_type), b"")
+        with self._lock:
+            self._by_path[path] = (stat.st_mtime_ns, stat.st_size, details)
+        return self._attachment(details, body)
+
+    @staticmethod
+    def _attachment(details: Attachment, body: bytes) -> Attachment:
+        return Attachment(details.path, details.filename, details.content_type, details.digest,
+                          details.size, details.headers, body)
+
+    def _store(self, digest: str, body: bytes):
+        """Add encoded content, evicting the least recently used (call with the lock held)"""
+        if len(body) > self.max_bytes or digest in self._bodies:
+            return
+        self._bodies[digest] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._bodies.popitem(last=False)
+            self.size -= len(evicted)
+            self.stats['evictions'] += 1
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+
+def split_paths(value) -> List[str]:
+    """File names listed in an attachment cell ("a.pdf; b.pdf")"""
+    if value is None:
+        return []
+    return [part for part in _PATH_SEPARATORS.split(str(value).strip()) if part]
+
+
+class AttachmentSet:
+    """Decides which files each message carries"""
+
+    def __init__(self, paths: Iterable[str] = (), field: Optional[str] = None,
+                 directory: str = ATTACHMENT_DIRECTORY, cache: Optional[AttachmentCache] = None):
+        """
+        Initialize attachment set
+
+        Args:
+            paths: Files attached to every message
+            field: Interview field (sheet column) naming per-candidate files
+            directory: Directory relative file names are resolved against
+            cache: Shared cache (a new one by default)
+        """
+        self.directory = directory
+        self.paths = [self.resolve(path) for path in paths]
+        self.field = field
+        self.cache = cache if cache is not None else AttachmentCache()
+
+    def __bool__(self) -> bool:
+        return bool(self.paths or self.field)
+
+    def resolve(self, path: str) -> str:
+        """Absolute path of a configured file (relative names are looked up in the directory)"""
+        path = os.path.expanduser(path)
+        if not os.path.isabs(path):
+            path = os.path.join(self.directory, path)
+        return os.path.abspath(path)
+
+    def resolve_cell(self, name: str) -> str:
+        """
+        Path of a file named in the sheet, which must lie inside the directory
+
+        Sheet cells come from whoever filled in the workbook, so "../" or
+        absolute names (or symlinks) reaching outside the directory are refused.
+
+        Args:
+            name: File name from the attachment column
+
+        Returns:
+            Real path of the file
+
+        Raises:
+            ValueError: If the name resolves outside the directory
+        """
+        root = os.path.realpath(self.directory)
+        path = os.path.realpath(os.path.join(root, name))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Attachment '{name}' is outside the attachment directory {self.directory}")
+        return path
+
+    def paths_for(self, interview_data: Dict) -> List[str]:
+        """
+        Files attached to one message (Outlook attaches these by path)
+
+        Args:
+            interview_data: Interview record (reads `field` if configured)
+
+        Returns:
+            Absolute paths, shared files first
+
+        Raises:
+            ValueError: If a file named in the sheet is outside the directory
+        """
+        if not self.field:
+            return self.paths
+        paths = list(self.paths)
+        for name in split_paths(interview_data.get(self.field)):
+            path = self.resolve_cell(name)
+            if path not in paths:
+                paths.append(path)
+        return paths
+
+    def for_interview(self, interview_data: Dict) -> List[Attachment]:
+        """
+        Encoded attachments of one message
+
+        Args:
+            interview_data: Interview record
+
+        Returns:
+            Attachments from the cache, shared files first
+        """
+        return [self.cache.get(path) for path in self.paths_for(interview_data)]
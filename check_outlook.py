@@ -1,8 +1,25 @@
 """
 Outlook Connection Diagnostic Tool
-Run this to check if Outlook is properly configured
+Run this to check if Outlook is properly configured, or
+'python check_outlook.py probe [COUNT] [TRANSPORT]' to measure how
+fast the configured transport sends
 """
+import json
+import os
+import socket
 import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+try:
+    from email_config import HR_EMAIL, PROBE_RECIPIENT, PROBE_RESULTS_FILE, SENDER_IDENTITIES
+except ImportError:
+    HR_EMAIL = "hr@company.com"
+    PROBE_RECIPIENT = None
+    PROBE_RESULTS_FILE = "transport_probe.jsonl"
+    SENDER_IDENTITIES = []
+
+PERCENTILES = (50, 90, 95, 99)
 
 def check_outlook():
     """Check Outlook installation and configuration"""
@@ -44,9 +61,16 @@ def check_outlook():
             return False
         else:
             print(f"   ✓ {accounts.Count} email account(s) configured:")
-            for i in range(1, min(accounts.Count + 1, 4)):  # Show max 3 accounts
+            pool = {str(entry.get("account", "")).lower() for entry in SENDER_IDENTITIES}
+            found = set()
+            for i in range(1, accounts.Count + 1):
                 account = accounts.Item(i)
-                print(f"      - {account.DisplayName}")
+                names = {str(account.DisplayName).lower(), str(getattr(account, "SmtpAddress", "")).lower()}
+                in_pool = bool(names & pool)
+                found |= names & pool
+                print(f"      - {account.DisplayName}{'  (sender pool)' if in_pool else ''}")
+            for missing in sorted(pool - found - {""}):
+                print(f"   ✗ Sender pool account '{missing}' is not configured in Outlook")
     except Exception as e:
         print(f"   ✗ Cannot access Outlook accounts")
         print(f"   Error: {str(e)}")
@@ -72,7 +96,147 @@ def check_outlook():
     return True
 
 
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Percentiles (in milliseconds) of a list of durations in seconds"""
+    if not samples:
+        return {}
+    summary = {f"p{pct}": round(percentile(samples, pct) * 1000, 2) for pct in PERCENTILES}
+    summary['max'] = round(max(samples) * 1000, 2)
+    return summary
+
+
+def load_previous_probe(results_file: str, host: str, transport: str) -> Optional[Dict]:
+    """Most recent saved probe for the same host and transport"""
+    if not os.path.exists(results_file):
+        return None
+    previous = None
+    with open(results_file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('host') == host and entry.get('transport') == transport:
+                previous = entry
+    return previous
+
+
+def probe_transport(count: int = 20, transport: Optional[str] = None,
+                    recipient: Optional[str] = None, results_file: str = PROBE_RESULTS_FILE) -> Optional[Dict]:
+    """
+    Measure connection setup, per-message render/send latency and
+    sustained throughput of an email transport
+
+    Sends `count` real messages to the probe recipient (PROBE_RECIPIENT,
+    or HR_EMAIL), so point it at a mailbox you own.
+
+    Args:
+        count: Number of probe messages
+        transport: Transport name (defaults to EMAIL_TRANSPORT)
+        recipient: Probe recipient address
+        results_file: JSON Lines file the results are appended to
+
+    Returns:
+        Probe results, or None if the transport could not connect
+    """
+    from transports import EMAIL_TRANSPORT, create_emailer
+
+    transport = (transport or EMAIL_TRANSPORT).lower()
+    recipient = recipient or PROBE_RECIPIENT or HR_EMAIL
+    host = socket.gethostname()
+
+    print("=" * 70)
+    print(f"  TRANSPORT PROBE: {transport} ({count} messages to {recipient})")
+    print("=" * 70)
+
+    emailer = create_emailer(transport)
+    started = time.perf_counter()
+    connected = emailer.connect()
+    connect_seconds = time.perf_counter() - started
+    if not connected:
+        emailer.close()
+        return None
+
+    render_times = []
+    send_times = []
+    failures = 0
+    run_started = time.perf_counter()
+    try:
+        for n in range(count):
+            # Extra template placeholders (e.g. {meeting_link}) get dummy values
+            interview_data = emailer.builder.sample_data({
+                'email': recipient,
+                'date': datetime.now().strftime("%Y-%m-%d"),
+                'time': datetime.now().strftime("%I:%M %p").lstrip("0"),
+                'description': f"Transport probe message {n + 1} of {count} - please ignore"
+            })
+            t0 = time.perf_counter()
+            message = emailer.render_message(interview_data)
+            t1 = time.perf_counter()
+            sent = emailer.send_message(message)
+            t2 = time.perf_counter()
+            # Rendering is Python only; creating the Outlook item is part of the send
+            render_times.append(t1 - t0)
+            if sent:
+                send_times.append(t2 - t1)
+            else:
+                failures += 1
+    finally:
+        elapsed = time.perf_counter() - run_started
+        emailer.close()
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'host': host,
+        'transport': transport,
+        'messages': count,
+        'failures': failures,
+        'connect_ms': round(connect_seconds * 1000, 2),
+        'render_ms': summarize(render_times),
+        'send_ms': summarize(send_times),
+        'messages_per_second': round(count / elapsed, 2) if elapsed else 0.0
+    }
+
+    print()
+    print(f"  Connection setup:   {results['connect_ms']:.1f} ms")
+    for label, key in (("Render", 'render_ms'), ("Create + send", 'send_ms')):
+        stats = results[key]
+        if stats:
+            print(f"  {label + ':':<19} " + "  ".join(f"{name} {value:.2f} ms" for name, value in stats.items()))
+    print(f"  Sustained rate:     {results['messages_per_second']:.1f} messages/sec")
+    print(f"  Failures:           {failures}")
+
+    previous = load_previous_probe(results_file, host, transport)
+    if previous and previous.get('messages_per_second'):
+        change = (results['messages_per_second'] / previous['messages_per_second'] - 1) * 100
+        print(f"  Previous run:       {previous['messages_per_second']:.1f} messages/sec "
+              f"({previous['timestamp']}, {change:+.0f}%)")
+        if change <= -20:
+            print("  ⚠ Throughput dropped by 20% or more since the last probe on this host")
+
+    with open(results_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(results) + "\n")
+    print(f"\n✓ Results appended to {results_file}")
+    return results
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "probe":
+        try:
+            probe_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+            probe = probe_transport(probe_count, sys.argv[3] if len(sys.argv) > 3 else None)
+        except Exception as e:
+            print(f"\n✗ Unexpected error: {str(e)}")
+            sys.exit(1)
+        sys.exit(0 if probe and not probe['failures'] else 1)
+
     try:
         success = check_outlook()
         if not success:
@@ -0,0 +1,377 @@
+"""
+Delivery Reconciler Module
+Checks that the messages a run reported as sent actually landed in the
+sent-mail store (Outlook Sent Items, or a maildir / mbox for SMTP and the
+fake transport), and flags unconfirmed rows for re-sending
+"""
+import bisect
+import mailbox
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from email.parser import BytesHeaderParser
+from email.utils import getaddresses, parsedate_to_datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from address_validator import normalize_address
+try:
+    from email_config import (RECONCILE_MAILBOX, RECONCILE_WINDOW_MINUTES,
+                              RECONCILE_TIMEOUT_SECONDS, RECONCILE_POLL_SECONDS)
+except ImportError:
+    RECONCILE_MAILBOX = None
+    RECONCILE_WINDOW_MINUTES = 15
+    RECONCILE_TIMEOUT_SECONDS = 60
+    RECONCILE_POLL_SECONDS = 5
+
+
+# Outlook's OlDefaultFolders value for Sent Items
+OL_FOLDER_SENT_MAIL = 5
+
+# Rows fetched per Table.GetArray call (one COM round trip each)
+SENT_ITEMS_BATCH = 1000
+
+# Named property (PS_PUBLIC_STRINGS) the Outlook emailer stamps with the
+# recipient's SMTP address: the To column only holds display names, which
+# for contacts in the address book are not the address
+RECIPIENT_PROPERTY = "http://schemas.microsoft.com/mapi/string/{00020329-0000-0000-C000-000000000046}/InterviewRecipient"
+
+# PR_CLIENT_SUBMIT_TIME (SentOn); DASL filters take it in UTC, as
+# "YYYY-MM-DD HH:MM" regardless of the Windows date format
+SENT_ON_PROPERTY = "http://schemas.microsoft.com/mapi/proptag/0x00390040"
+
+# Status written to rows whose message could not be found; anything other
+# than "Sent" is pending, so the next run sends these rows again
+UNCONFIRMED_STATUS = "Unconfirmed"
+
+# (row number, recipient, time the send started), one per message the run sent
+JournalEntry = Tuple[int, str, datetime]
+
+
+def _local_naive(value) -> Optional[datetime]:
+    """Turn a datetime (aware or naive, COM or stdlib) into naive local time"""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    # pywintypes datetimes are datetime subclasses; keep a plain datetime
+    return datetime(value.year, value.month, value.day, value.hour, value.minute, value.second)
+
+
+def read_outlook_sent_items(outlook, since: datetime) -> List[Tuple[str, datetime]]:
+    """
+    Read recipient and send time of every Sent Items message since a time
+
+    Uses a filtered Outlook Table with only the columns needed, read
+    SENT_ITEMS_BATCH rows per call, instead of opening each MailItem.
+    The filter is a DASL query on the UTC send time, so it doesn't depend
+    on the date format of the Windows locale.
+
+    Args:
+        outlook: Outlook.Application object
+        since: Earliest send time to include
+
+    Returns:
+        List of (recipient, SentOn) pairs: the SMTP address stamped at send
+        (RECIPIENT_PROPERTY), or the To field for messages sent without it
+    """
+    # The filter has minute resolution; round down so nothing is missed
+    since_utc = _local_naive(since).astimezone(timezone.utc) - timedelta(minutes=1)
+    folder = outlook.GetNamespace("MAPI").GetDefaultFolder(OL_FOLDER_SENT_MAIL)
+    table = folder.GetTable(f'@SQL="{SENT_ON_PROPERTY}" >= \'{since_utc.strftime("%Y-%m-%d %H:%M")}\'')
+    table.Columns.RemoveAll()
+    table.Columns.Add(RECIPIENT_PROPERTY)
+    table.Columns.Add("To")
+    table.Columns.Add("SentOn")
+
+    messages = []
+    while not table.EndOfTable:
+        rows = table.GetArray(SENT_ITEMS_BATCH)
+        if not rows:
+            break
+        messages.extend((row[0] or row[1], row[2]) for row in rows)
+    return messages
+
+
+def read_mailbox(path: str, since: datetime, kind: str = "maildir") -> List[Tuple[str, datetime]]:
+    """
+    Read recipient and date of every message in a maildir or mbox since a time
+
+    Only the headers of each message are parsed. In a maildir, messages
+    delivered before `since` are skipped by their file name alone.
+
+    Args:
+        path: Maildir directory or mbox file
+        since: Earliest send time to include
+        kind: "maildir" or "mbox"
+
+    Returns:
+        List of (To header, Date) pairs
+    """
+    parser = BytesHeaderParser()
+    messages = []
+
+    if kind == "maildir":
+        box = mailbox.Maildir(path, create=False)
+        # Maildir file names start with the delivery time in seconds
+        cutoff = since.timestamp() - 60
+        for key in box.iterkeys():
+            try:
+                if int(key.split(".", 1)[0]) < cutoff:
+                    continue
+            except ValueError:
+                pass
+            with box.get_file(key) as f:
+                headers = parser.parse(f)
+            messages.append((headers.get("To", ""), headers.get("Date")))
+    elif kind == "mbox":
+        box = mailbox.mbox(path, create=False)
+        for key in box.iterkeys():
+            with box.get_file(key) as f:
+                headers = parser.parse(f)
+            messages.append((headers.get("To", ""), headers.get("Date")))
+    else:
+        raise ValueError(f"Unknown mailbox type '{kind}' (expected 'maildir' or 'mbox')")
+
+    since_local = _local_naive(since)
+    result = []
+    for to, date in messages:
+        try:
+            sent_at = _local_naive(parsedate_to_datetime(date)) if date else None
+        except (TypeError, ValueError):
+            sent_at = None
+        if sent_at is not None and sent_at >= since_local - timedelta(minutes=1):
+            result.append((to, sent_at))
+    return result
+
+
+def sent_mail_reader(emailer=None, mailbox_spec: Optional[str] = RECONCILE_MAILBOX
+                     ) -> Optional[Callable[[datetime], List[Tuple[str, datetime]]]]:
+    """
+    Pick where sent messages can be read back from
+
+    Args:
+        emailer: Connected emailer of the run
+        mailbox_spec: "maildir:PATH" or "mbox:PATH"; overrides the emailer's own store
+
+    Returns:
+        Function taking a start time and returning (recipients, send time)
+        pairs, or None if there is no store to reconcile against
+    """
+    if mailbox_spec:
+        kind, _, path = mailbox_spec.partition(":")
+        return lambda since: read_mailbox(path, since, kind.lower())
+    if emailer is None:
+        return None
+    if hasattr(emailer, "identities"):
+        # Sender pool: read the store of every distinct emailer in the pool
+        emailers = list({id(i.emailer): i.emailer for i in emailer.identities}.values())
+        readers = [sent_mail_reader(e, None) for e in emailers]
+        if not all(readers):
+            return None
+        return lambda since: [message for read in readers for message in read(since)]
+    if hasattr(emailer, "call") and hasattr(emailer, "outlook"):
+        # Outlook: read Sent Items on the emailer's COM thread
+        return lambda since: emailer.call(lambda outlook: read_outlook_sent_items(outlook, since))
+    if getattr(emailer, "mode", None) == "maildir":
+        return lambda since: read_mailbox(emailer.maildir_path, since, "maildir")
+    return None
+
+
+class SentIndex:
+    """Send times of the stored messages, grouped by normalized recipient"""
+
+    def __init__(self, messages: Iterable[Tuple[str, datetime]]):
+        """
+        Build the index in one pass over the store
+
+        Args:
+            messages: (recipient field, send time) pairs; the recipient field
+                      may list several addresses
+        """
+        self._times: Dict[str, List[datetime]] = defaultdict(list)
+        self.size = 0
+        for recipients, sent_at in messages:
+            sent_at = _local_naive(sent_at)
+            if sent_at is None:
+                continue
+            for _, address in getaddresses([str(recipients).replace(";", ",")]):
+                if address:
+                    self._times[normalize_address(address)].append(sent_at)
+            self.size += 1
+        for times in self._times.values():
+            times.sort()
+
+    def match(self, journal: Iterable[JournalEntry], window: timedelta) -> Tuple[List[JournalEntry], List[JournalEntry]]:
+        """
+        Pair journal entries with stored messages
+
+        Every stored message confirms at most one journal entry, so a
+        candidate emailed twice needs two stored messages.
+
+        Args:
+            journal: Entries of the run
+            window: Largest difference between journal and store times
+
+        Returns:
+            Tuple of (confirmed entries, unconfirmed entries)
+        """
+        by_address: Dict[str, List[JournalEntry]] = defaultdict(list)
+        for entry in journal:
+            by_address[normalize_address(entry[1])].append(entry)
+
+        confirmed, unconfirmed = [], []
+        for address, entries in by_address.items():
+            times = self._times.get(address, [])
+            entries.sort(key=lambda entry: entry[2])
+            # Both lists are in time order: walk them together, using each stored message once
+            position = 0
+            for entry in entries:
+                position = bisect.bisect_left(times, entry[2] - window, position)
+                if position < len(times) and times[position] <= entry[2] + window:
+                    confirmed.append(entry)
+                    position += 1
+                else:
+                    unconfirmed.append(entry)
+        return confirmed, unconfirmed
+
+
+def reconcile(journal: List[JournalEntry], read_sent: Callable[[datetime], List[Tuple[str, datetime]]],
+              window_minutes: float = RECONCILE_WINDOW_MINUTES,
+              timeout: float = RECONCILE_TIMEOUT_SECONDS,
+              poll_seconds: float = RECONCILE_POLL_SECONDS) -> Dict:
+    """
+    Confirm a run's sends against the sent-mail store
+
+    Outlook moves messages from the Outbox to Sent Items in the background,
+    so the store is read again (in bulk) until everything is confirmed or
+    the timeout passes.
+
+    Args:
+        journal: Entries of the run
+        read_sent: Store reader from sent_mail_reader()
+        window_minutes: Allowed difference between journal and store times
+        timeout: Seconds to keep waiting for unconfirmed messages
+        poll_seconds: Seconds between reads of the store
+
+    Returns:
+        Dictionary with 'confirmed' and 'unconfirmed' journal entries and
+        the number of stored messages 'scanned'
+    """
+    if not journal:
+        return {'confirmed': [], 'unconfirmed': [], 'scanned': 0}
+
+    window = timedelta(minutes=window_minutes)
+    since = min(entry[2] for entry in journal) - window
+    deadline = time.monotonic() + timeout
+    while True:
+        index = SentIndex(read_sent(since))
+        confirmed, unconfirmed = index.match(journal, window)
+        if not unconfirmed or time.monotonic() + poll_seconds > deadline:
+            return {'confirmed': confirmed, 'unconfirmed': unconfirmed, 'scanned': index.size}
+        print(f"⏳ {len(unconfirmed)} message(s) not in the sent mail yet, checking again in {poll_seconds:g}s...")
+        time.sleep(poll_seconds)
+
+
+def flag_for_resend(excel_reader, entries: Iterable[JournalEntry]) -> int:
+    """
+    Mark rows whose message wasn't confirmed so the next run sends them again
+
+    Args:
+        excel_reader: Loaded Excel reader
+        entries: Unconfirmed journal entries
+
+    Returns:
+        Number of rows flagged
+    """
+    rows = sorted({entry[0] for entry in entries})
+    flagged = sum(1 for row_num in rows if excel_reader.set_status(row_num, UNCONFIRMED_STATUS, save=False))
+    if flagged:
+        excel_reader.save()
+    return flagged
+
+
+def print_reconciliation(result: Dict):
+    """Print a reconciliation summary"""
+    confirmed = len(result['confirmed'])
+    unconfirmed = result['unconfirmed']
+    print(f"✓ Reconciled against {result['scanned']} sent message(s): {confirmed} confirmed, "
+          f"{len(unconfirmed)} unconfirmed")
+    for row_num, email, sent_at in unconfirmed:
+        print(f"  Row {row_num}: {email} (sent {sent_at:%Y-%m-%d %H:%M:%S}) not found - flagged for re-send")
+
+
+def journal_from_workbook(excel_reader, index, since: str) -> List[JournalEntry]:
+    """
+    Rebuild a journal after the fact: rows marked "Sent" whose recipient has
+    a "Sent" entry in the send log index since a date
+
+    Args:
+        excel_reader: Loaded Excel reader
+        index: SendLogIndex
+        since: First date to include (YYYY-MM-DD)
+
+    Returns:
+        Journal entries (the send time is the time the send was logged)
+    """
+    logged: Dict[str, List[datetime]] = defaultdict(list)
+    for email, logged_at in index.sent_since(since):
+        logged[email].append(datetime.strptime(logged_at, "%Y-%m-%d %H:%M:%S"))
+
+    journal = []
+    for interview in excel_reader.get_all_interviews():
+        times = logged.get(normalize_address(interview['email']))
+        if times and excel_reader.get_status(interview['row_num']) == "Sent":
+            journal.append((interview['row_num'], interview['email'], times.pop(0)))
+    return journal
+
+
+def main():
+    """Command line entry point: reconcile a workbook's sends since a date"""
+    from excel_reader import ExcelReader
+    from send_log_index import SendLogIndex
+    from transports import create_emailer
+
+    if len(sys.argv) < 2:
+        print("Usage: python delivery_reconciler.py WORKBOOK [SINCE]")
+        print("  SINCE defaults to today (YYYY-MM-DD); set RECONCILE_MAILBOX to read a maildir/mbox")
+        sys.exit(1)
+
+    workbook = sys.argv[1]
+    since = sys.argv[2] if len(sys.argv) > 2 else datetime.now().strftime("%Y-%m-%d")
+
+    excel_reader = ExcelReader(workbook)
+    if not excel_reader.load_file():
+        sys.exit(1)
+    index = SendLogIndex()
+    journal = journal_from_workbook(excel_reader, index, since)
+    index.close()
+    print(f"✓ {len(journal)} sent row(s) logged since {since}")
+
+    emailer = None
+    if not RECONCILE_MAILBOX:
+        emailer = create_emailer()
+        if not emailer.connect():
+            emailer.close()
+            excel_reader.close()
+            sys.exit(1)
+    read_sent = sent_mail_reader(emailer)
+    try:
+        if read_sent is None:
+            print("✗ This transport keeps no sent mail; set RECONCILE_MAILBOX to a maildir or mbox")
+            sys.exit(1)
+        result = reconcile(journal, read_sent, timeout=0)
+    finally:
+        if emailer:
+            emailer.close()
+
+    print_reconciliation(result)
+    flagged = flag_for_resend(excel_reader, result['unconfirmed'])
+    excel_reader.close()
+    if flagged:
+        print(f"⚠ Flagged {flagged} row(s) as '{UNCONFIRMED_STATUS}' in {os.path.basename(workbook)}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
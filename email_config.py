@@ -2,6 +2,7 @@
 Email Template Configuration
 Customize your interview notification email template here
 """
+import os
 
 # Email Subject
 EMAIL_SUBJECT = "Interview Scheduled - Action Required"
@@ -11,6 +12,189 @@ COMPANY_NAME = "Your Company Name"
 HR_EMAIL = "hr@company.com"
 HR_DEPARTMENT = "Recruitment Department"
 
+# Transport used to send emails: "outlook" (desktop Outlook), "smtp",
+# or "fake" (no mail server; for load testing, see FAKE_* below)
+EMAIL_TRANSPORT = "outlook"
+
+# Send an HTML version alongside the plain-text body
+SEND_HTML = True
+
+# Optional HTML template (same placeholders as EMAIL_TEMPLATE).
+# If None, the plain-text template is wrapped in a <pre> block.
+EMAIL_HTML_TEMPLATE = None
+
+# SMTP settings (used when EMAIL_TRANSPORT = "smtp")
+SMTP_HOST = "smtp.company.com"
+SMTP_PORT = 587
+SMTP_USE_TLS = True
+SMTP_USERNAME = ""
+SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "")
+SMTP_SENDER = "hr@company.com"
+
+# Sender pool: spread emails over several Outlook accounts or SMTP identities.
+# Each entry may set "weight" (share of the traffic), "daily_quota" and
+# "per_minute" limits. Outlook entries name an "account" (display name or
+# address); SMTP entries give "sender" plus any SMTP_* override such as
+# "username"/"password"/"host". An identity that keeps failing temporarily
+# (throttled, 4xx) rests for SENDER_COOLDOWN_SECONDS and its emails go to the
+# others; emails the server rejects outright (e.g. 550 unknown mailbox) are not
+# retried from another identity.
+# Leave empty to send everything from the default account / SMTP_SENDER.
+SENDER_IDENTITIES = []
+# e.g. [{"account": "hr@company.com", "weight": 2, "daily_quota": 5000, "per_minute": 30},
+#       {"account": "recruiting@company.com", "daily_quota": 2000, "per_minute": 15}]
+SENDER_USAGE_FILE = "sender_usage.db"     # today's send count per identity, shared by all runs
+SENDER_COOLDOWN_SECONDS = 60
+SENDER_FAILURES_BEFORE_COOLDOWN = 3
+SENDER_FAILOVER_ATTEMPTS = 2              # other identities tried after a failed send
+
+# Fake transport (used when EMAIL_TRANSPORT = "fake")
+FAKE_MODE = "memory"                # "memory" or "maildir"
+FAKE_MAILDIR = "fake_maildir"
+FAKE_LATENCY = 0.0                  # seconds, or e.g. "uniform:0.005:0.02", "lognormal:0.01:0.5"
+FAKE_RATE_LIMIT = 0                 # messages/second before throttling (0 = unlimited)
+FAKE_TRANSIENT_FAILURE_RATE = 0.0   # probability an attempt fails temporarily
+FAKE_PERMANENT_FAILURE_RATE = 0.0   # fraction of recipients that always fail
+
+# Transport probe (python check_outlook.py probe [COUNT] [TRANSPORT]):
+# probe messages really are sent, to this address (None = HR_EMAIL)
+PROBE_RECIPIENT = None
+PROBE_RESULTS_FILE = "transport_probe.jsonl"
+
+# Column headers of the core fields, for sheets that don't use the template
+# layout (e.g. ATS exports). None = columns 1-5 as in create_template.py.
+# Any other column can be used in the templates by its header in lower case
+# with spaces as underscores, e.g. "Meeting Link" -> {meeting_link}.
+EXCEL_COLUMNS = None
+# EXCEL_COLUMNS = {
+#     'email': "Candidate Email",
+#     'date': "Interview Date",
+#     'time': "Interview Time",
+#     'description': "Interview Description",
+#     'status': "Status",
+# }
+
+# Attachments: files attached to every email, and/or the header of a sheet
+# column naming per-candidate files (several separated by ";"). Relative
+# names are looked up in ATTACHMENT_DIRECTORY; files named in the sheet must
+# be inside it. Each file is read and encoded once per run;
+# ATTACHMENT_CACHE_MB caps the memory used for encoded files
+ATTACHMENTS = []                # e.g. ["company_brochure.pdf"]
+ATTACHMENT_COLUMN = None        # e.g. "Job Description"
+ATTACHMENT_DIRECTORY = "attachments"
+ATTACHMENT_CACHE_MB = 64
+
+# Calendar invites: attach an .ics invite for each interview. INVITE_TIMEZONE
+# is the IANA zone the sheet's times are in (e.g. "Asia/Kolkata"); None uses
+# this machine's local time. INVITE_SUMMARY may use any interview placeholder
+INVITES = False
+INVITE_TIMEZONE = None
+INVITE_DURATION_MINUTES = 60
+INVITE_SUMMARY = "Interview: {description} - {company_name}"
+INVITE_LOCATION = ""            # e.g. office address or meeting link
+# Sequence numbers of sent invites, so a rescheduled interview updates the
+# candidate's event instead of adding a second one (None = every invite is new)
+INVITE_DB = "invites.db"
+# Header of a column with a stable id per interview; None tells a candidate's
+# interviews apart by their row (so keep each interview on its row)
+INVITE_ID_COLUMN = None         # e.g. "Interview ID"
+
+# Order of day and month in all-numeric text dates such as "12/01/2026":
+# "DMY" (12 January), "MDY" (1 December), or None to leave dates that could
+# be either unchanged (no reminders, invites or send-order for those rows)
+DATE_ORDER = None
+
+# Recipient domain policy (subdomains are matched too)
+BLOCKED_DOMAINS = []        # e.g. ["example.com"] - never email these
+INTERNAL_DOMAINS = []       # e.g. ["company.com"] - reported as internal recipients
+
+# Log rotation: compress the log into a dated .gz archive above this size (0 = never)
+LOG_MAX_BYTES = 10 * 1024 * 1024
+
+# Index of logged sends for "was this candidate notified?" lookups
+# (python send_log_index.py lookup <email>); None disables it
+SEND_LOG_INDEX = "send_log_index.db"
+
+# Local Prometheus metrics endpoint (http://127.0.0.1:<port>/metrics), off by
+# default; set a port (e.g. 9108) to opt in
+METRICS_PORT = None
+
+# Send pipeline: queue capacity between stages, threads per stage, and how
+# many status updates are written to the workbook before each save
+# (1 = save after every email, safest against duplicate sends after a crash)
+PIPELINE_QUEUE_SIZE = 100
+PIPELINE_RENDER_WORKERS = 1
+PIPELINE_SEND_WORKERS = 1
+PIPELINE_SAVE_EVERY = 1
+
+# Send order: sheet row order unless SEND_PRIORITY is True, which sends
+# pending interviews soonest-first. With it on, SEND_ROUND_WEIGHTS scales the
+# time until an interview by round (matched in the description), e.g.
+# {"final": 0.5} sends final rounds as if they were twice as close, and
+# SEND_DEADLINE_MODE decides what happens when a notification would give
+# less than SEND_MIN_NOTICE_MINUTES of notice: "warn", "skip" or None (off)
+SEND_PRIORITY = False           # True = soonest interview first
+SEND_ROUND_WEIGHTS = {}
+SEND_DEADLINE_MODE = "warn"
+SEND_MIN_NOTICE_MINUTES = 60
+# Rows held for ordering at once, which caps memory on huge sheets: a row
+# can only overtake the SEND_PRIORITY_WINDOW rows above it (None = whole sheet)
+SEND_PRIORITY_WINDOW = 10000
+
+# Retries of temporary send failures (throttling, SMTP 4xx replies), for every transport
+SEND_MAX_RETRIES = 3
+SEND_RETRY_BACKOFF = 0.5        # seconds before the first retry (doubles each time)
+
+# Delivery reconciliation: after a run, check that every sent email landed
+# in the sent mail (Outlook Sent Items, the fake transport's maildir, or
+# RECONCILE_MAILBOX e.g. "maildir:/path/Sent" or "mbox:/path/sent.mbox" for
+# SMTP). Rows that can't be found are marked "Unconfirmed" and sent again
+# on the next run. Not used with LEASE_DB; run delivery_reconciler.py afterwards
+RECONCILE_AFTER_SEND = False
+RECONCILE_MAILBOX = None
+RECONCILE_WINDOW_MINUTES = 15   # allowed clock difference between the run and the store
+RECONCILE_TIMEOUT_SECONDS = 60  # how long to wait for Outlook to move mail to Sent Items
+RECONCILE_POLL_SECONDS = 5
+
+# Workbook cache: parsed sheets are kept in WORKBOOK_CACHE_DIR, keyed by the
+# workbook's content, so main.py, the daemon and the web app only parse a
+# workbook the first time they see it. Least recently used entries are removed
+# once the directory passes WORKBOOK_CACHE_MB. None = no cache
+WORKBOOK_CACHE_DIR = ".workbook_cache"
+WORKBOOK_CACHE_MB = 256
+
+# Row leasing: set LEASE_DB to a SQLite file (on a filesystem shared by all
+# runners) to let several copies of main.py drain one workbook together
+LEASE_DB = None                 # e.g. "leases.db"
+LEASE_SECONDS = 120             # leases of a crashed runner are reclaimed after this
+LEASE_BATCH_SIZE = 50           # rows claimed per transaction
+
+# Drop directory watched by watch_daemon.py and seconds between scans
+WATCH_DIRECTORY = "incoming"
+WATCH_POLL_SECONDS = 2.0
+
+# Reminder offsets (hours before each interview) used by reminder_scheduler.py
+REMINDER_OFFSETS_HOURS = [24, 1]
+REMINDER_POLL_SECONDS = 30        # how often the dispatcher looks for newly scheduled reminders
+REMINDER_MAX_ATTEMPTS = 5         # sends tried before a reminder is marked failed
+REMINDER_RETRY_SECONDS = 60       # wait before the first retry (doubles on every retry)
+REMINDER_SUBJECT = "Interview Reminder"
+# Reminder email; same placeholders as EMAIL_TEMPLATE
+REMINDER_TEMPLATE = """Dear Candidate,
+
+This is a reminder of your upcoming interview at {company_name}.
+
+📅 Date:        {date}
+⏰ Time:        {time}
+📝 Round:       {description}
+
+If you can no longer attend, please contact us at {hr_email} as soon as possible.
+
+Best Regards,
+HR Team
+{hr_department}
+"""
+
 # Email Template
 # You can use these placeholders: {date}, {time}, {description}
 EMAIL_TEMPLATE = """Dear Candidate,
@@ -2,25 +2,39 @@
 Outlook Email Sender Module
 Handles sending emails via Outlook desktop application
 """
-import win32com.client
-from typing import Dict
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, Optional
 try:
-    from email_config import EMAIL_SUBJECT, EMAIL_TEMPLATE, COMPANY_NAME, HR_EMAIL, HR_DEPARTMENT
+    import win32com.client
 except ImportError:
-    # Default values if config file doesn't exist
-    EMAIL_SUBJECT = "Interview Scheduled"
-    COMPANY_NAME = "Our Company"
-    HR_EMAIL = "hr@company.com"
-    HR_DEPARTMENT = "Recruitment Department"
-    EMAIL_TEMPLATE = None
+    # pywin32 is Windows-only; fake COM objects can still be injected
+    win32com = None
+from delivery_reconciler import RECIPIENT_PROPERTY
+from message_builder import MessageBuilder
+from metrics import RENDER_SECONDS, TRANSPORT_SECONDS
+from send_retry import deliver_with_retry
 
 
 class OutlookEmailer:
     """Sends interview notification emails using Outlook"""
     
-    def __init__(self):
-        """Initialize Outlook connection"""
+    def __init__(self, application_factory: Optional[Callable] = None,
+                 builder: Optional[MessageBuilder] = None):
+        """
+        Initialize Outlook connection
+        
+        Args:
+            application_factory: Optional callable returning an Outlook.Application
+                                 object (used to inject a fake COM object)
+            builder: Message builder (defaults to one built from email_config)
+        """
         self.outlook = None
+        self.accounts = {}
+        self.application_factory = application_factory
+        self.builder = builder or MessageBuilder.from_config()
+        self._invite_directory = None
         
     def connect(self) -> bool:
         """
@@ -30,14 +44,19 @@ class OutlookEmailer:
             True if connected successfully, False otherwise
         """
         try:
-            # Try to connect to existing Outlook instance first
-            try:
-                self.outlook = win32com.client.GetActiveObject("Outlook.Application")
-                print("✓ Connected to running Outlook instance")
-            except:
-                # If not running, start new instance
-                self.outlook = win32com.client.Dispatch("Outlook.Application")
-                print("✓ Started new Outlook instance")
+            if self.application_factory:
+                self.outlook = self.application_factory()
+            elif win32com is None:
+                raise RuntimeError("pywin32 is not installed")
+            else:
+                # Try to connect to existing Outlook instance first
+                try:
+                    self.outlook = win32com.client.GetActiveObject("Outlook.Application")
+                    print("✓ Connected to running Outlook instance")
+                except:
+                    # If not running, start new instance
+                    self.outlook = win32com.client.Dispatch("Outlook.Application")
+                    print("✓ Started new Outlook instance")
             
             # Test the connection by accessing namespace
             namespace = self.outlook.GetNamespace("MAPI")
@@ -49,6 +68,14 @@ class OutlookEmailer:
                 print("  Please open Outlook and set up an email account first.")
                 return False
             
+            # Accounts by display name and address, for sending from a chosen account
+            self.accounts = {}
+            for i in range(1, accounts.Count + 1):
+                account = accounts.Item(i)
+                for name in (account.DisplayName, getattr(account, "SmtpAddress", "")):
+                    if name:
+                        self.accounts[str(name).lower()] = account
+            
             print(f"✓ Connected to Outlook with {accounts.Count} account(s)")
             return True
             
@@ -61,6 +88,11 @@ class OutlookEmailer:
             print("  4. If issue persists, run Outlook as Administrator once")
             return False
     
+    @property
+    def account_names(self):
+        """Lower-cased display names and addresses of the Outlook accounts"""
+        return set(self.accounts)
+    
     def send_interview_notification(self, interview_data: Dict) -> bool:
         """
         Send interview notification email
@@ -75,26 +107,139 @@ class OutlookEmailer:
             print("✗ Outlook not connected!")
             return False
         
+        return self.send_message(self.render_message(interview_data))
+    
+    def send_message(self, message: Dict) -> bool:
+        """
+        Send an already rendered message, retrying temporary failures
+        
+        Args:
+            message: Rendered message from render_message()
+            
+        Returns:
+            True if email sent successfully, False otherwise
+        """
         try:
+            deliver_with_retry(self._deliver, message)
+            self.builder.record_sent(message)
+            
+            print(f"✓ Email sent to {message['to']}")
+            return True
+            
+        except Exception as e:
+            print(f"✗ Error sending email to {message['to']}: {str(e)}")
+            return False
+    
+    def deliver(self, message: Dict):
+        """
+        Send an already rendered message, retrying temporary failures, and
+        raise instead of reporting (the sender pool tells failures apart)
+        
+        Args:
+            message: Rendered message from render_message()
+            
+        Raises:
+            The delivery error (see send_retry.is_transient / is_permanent)
+        """
+        deliver_with_retry(self._deliver, message)
+    
+    def render_message(self, interview_data: Dict) -> Dict:
+        """
+        Render everything Outlook needs for one email
+        
+        Args:
+            interview_data: Dictionary containing interview details
+            
+        Returns:
+            Dictionary with to, subject, body, html_body (None for plain text),
+            attachments (file paths), invites ((file name, .ics text) pairs)
+            and invite_revision (committed once the message is sent)
+        """
+        with RENDER_SECONDS.time():
+            revision = self.builder.plan_invite(interview_data)
+            return {
+                'to': interview_data['email'],
+                'subject': self.builder.subject,
+                'body': self._create_email_body(interview_data),
+                'html_body': self.builder.render_html(interview_data) if self.builder.send_html else None,
+                'attachments': self.builder.attachments.paths_for(interview_data),
+                'invites': self.builder.render_invites(interview_data, revision),
+                'invite_revision': revision
+            }
+    
+    def _deliver(self, message: Dict):
+        """
+        Create and send a single mail item through Outlook
+        
+        Args:
+            message: Rendered message from render_message()
+        """
+        with TRANSPORT_SECONDS.time():
             # Create email
             mail = self.outlook.CreateItem(0)  # 0 = MailItem
             
             # Set email properties
-            mail.To = interview_data['email']
-            mail.Subject = EMAIL_SUBJECT
-            
-            # Create email body
-            mail.Body = self._create_email_body(interview_data)
+            if message.get('account'):
+                # Send from a specific account (sender pool) instead of the default one
+                account = self.accounts.get(message['account'].lower())
+                if account is None:
+                    raise RuntimeError(f"Outlook has no account '{message['account']}'")
+                mail.SendUsingAccount = account
+            mail.To = message['to']
+            # Outlook shows (and reports in Sent Items) display names in To;
+            # keep the SMTP address for delivery_reconciler
+            mail.PropertyAccessor.SetProperty(RECIPIENT_PROPERTY, message['to'])
+            mail.Subject = message['subject']
+            mail.Body = message['body']
+            if message['html_body']:
+                # Outlook sends HTMLBody when set and derives the plain-text part itself
+                mail.HTMLBody = message['html_body']
+            # Outlook reads and encodes attachment files itself
+            for path in message.get('attachments') or ():
+                mail.Attachments.Add(path)
+            for filename, invite in message.get('invites') or ():
+                self._attach_invite(mail, filename, invite)
             
             # Send email
             mail.Send()
+    
+    def _attach_invite(self, mail, filename: str, invite: str):
+        """
+        Attach a calendar file (invite or cancellation); Outlook attaches by path and copies the
+        file when it is added, so one scratch file serves every message
+        
+        Args:
+            mail: Mail item
+            filename: File name shown to the recipient
+            invite: .ics text
+        """
+        if self._invite_directory is None:
+            self._invite_directory = tempfile.mkdtemp(prefix="interview_invites_")
+        path = os.path.join(self._invite_directory, filename)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(invite)
+        try:
+            mail.Attachments.Add(path)
+        finally:
+            os.remove(path)
+    
+    def close(self):
+        """Remove the scratch directory used for invite files"""
+        if self._invite_directory is not None:
+            shutil.rmtree(self._invite_directory, ignore_errors=True)
+            self._invite_directory = None
+    
+    def call(self, func: Callable):
+        """
+        Run a function against the Outlook application object
+        
+        Args:
+            func: Called with the Outlook.Application object
             
-            print(f"✓ Email sent to {interview_data['email']}")
-            return True
-            
-        except Exception as e:
-            print(f"✗ Error sending email to {interview_data['email']}: {str(e)}")
-            return False
+        Returns:
+            Whatever func returns
+        """
+        return func(self.outlook)
     
     def _create_email_body(self, interview_data: Dict) -> str:
         """
@@ -106,50 +251,4 @@ class OutlookEmailer:
         Returns:
             Formatted email body
         """
-        # Use custom template if available
-        if EMAIL_TEMPLATE:
-            body = EMAIL_TEMPLATE.format(
-                date=interview_data['date'],
-                time=interview_data['time'],
-                description=interview_data['description'],
-                company_name=COMPANY_NAME,
-                hr_email=HR_EMAIL,
-                hr_department=HR_DEPARTMENT
-            )
-        else:
-            # Default template
-            body = f"""Dear Candidate,
-
-We are pleased to inform you that your interview has been scheduled with our team.
-
-══════════════════════════════════════════════════════════════
-                    INTERVIEW DETAILS
-══════════════════════════════════════════════════════════════
-
-📅 Date:        {interview_data['date']}
-⏰ Time:        {interview_data['time']}
-📝 Round:       {interview_data['description']}
-
-══════════════════════════════════════════════════════════════
-
-IMPORTANT INSTRUCTIONS:
-------------------------
-✓ Please join 5-10 minutes before the scheduled time
-✓ Ensure you have a stable internet connection
-✓ Keep your resume and relevant documents ready
-✓ Prepare any questions you may have for us
-
-If you need to reschedule or have any questions, please contact us immediately.
-
-We look forward to speaking with you!
-
-Best Regards,
-HR Team
-Recruitment Department
-
-══════════════════════════════════════════════════════════════
-This is an automated notification. Please do not reply to this email.
-For queries, contact: hr@company.com
-══════════════════════════════════════════════════════════════
-"""
-        return body
+        return self.builder.render_text(interview_data)
@@ -3,23 +3,63 @@ Excel Reader Module
 Handles reading interview data from Excel file
 """
 import openpyxl
-from typing import List, Dict
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
 import os
+from interview_record import Interview
+from metrics import EMAILS_SKIPPED
+from workbook_cache import Snapshot, WorkbookCache, default_cache, file_digest
+try:
+    from email_config import EXCEL_COLUMNS
+except ImportError:
+    EXCEL_COLUMNS = None
+
+
+# Default layout (see create_template.py): column number of each core field
+DEFAULT_COLUMNS = {'email': 1, 'date': 2, 'time': 3, 'description': 4, 'status': 5}
+
+# Fields every record has; any other template placeholder is read from a sheet column
+RECORD_FIELDS = set(Interview.FIELDS)
+
+
+def column_key(header) -> str:
+    """
+    Placeholder name for a column header
+
+    "Meeting Link" -> "meeting_link", "Interviewer (Name)" -> "interviewer_name"
+    """
+    return re.sub(r"\W+", "_", str(header).strip().lower()).strip("_")
 
 
 class ExcelReader:
     """Reads and manages interview data from Excel file"""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, fields: Optional[Iterable[str]] = None,
+                 columns: Optional[Dict[str, str]] = EXCEL_COLUMNS, cache: Optional[WorkbookCache] = None):
         """
         Initialize Excel reader
         
         Args:
             file_path: Path to the Excel file
+            fields: Template placeholders to provide (e.g. MessageBuilder.fields);
+                    extra ones are read from the column whose header matches
+            columns: Header of each core column ('email', 'date', 'time',
+                     'description', 'status'); None for the default layout
+            cache: Parsed-sheet cache rows are read from (the shared one by default)
         """
         self.file_path = file_path
-        self.workbook = None
-        self.worksheet = None
+        self.fields = set(fields or ())
+        self.column_names = columns
+        self.columns: Dict[str, int] = {}
+        self.cache = cache if cache is not None else default_cache()
+        self.snapshot: Optional[Snapshot] = None
+        self._workbook = None
+        self._worksheet = None
+        self._saved = False
+        # Status updates and saves come from the send pipeline's write-back
+        # thread while other threads may look up a status
+        self._lock = threading.Lock()
         
     def load_file(self) -> bool:
         """
@@ -33,37 +73,147 @@ class ExcelReader:
                 print(f"✗ Error: File '{self.file_path}' not found!")
                 return False
                 
-            self.workbook = openpyxl.load_workbook(self.file_path)
-            self.worksheet = self.workbook.active
+            # Rows are read from the cached parse; openpyxl only opens the
+            # workbook once a status has to be written back
+            if self.snapshot is not None:
+                self.snapshot.close()
+            self.snapshot = self.cache.load(self.file_path)
+            if not self._resolve_columns():
+                return False
             print(f"✓ Excel file loaded: {self.file_path}")
             return True
         except Exception as e:
             print(f"✗ Error loading Excel file: {str(e)}")
             return False
     
-    def get_pending_interviews(self) -> List[Dict]:
+    @property
+    def workbook(self):
+        """The openpyxl workbook, opened on first use"""
+        if self._workbook is None:
+            self._workbook = openpyxl.load_workbook(self.file_path)
+            self._worksheet = self._workbook.active
+        return self._workbook
+    
+    @property
+    def worksheet(self):
+        """The active worksheet, opened on first use"""
+        if self._worksheet is None:
+            self.workbook
+        return self._worksheet
+    
+    def _resolve_columns(self) -> bool:
+        """
+        Work out which columns the rows are read from
+        
+        Only the core columns and the columns of extra template placeholders
+        are read; everything else in a wide sheet is ignored.
+        
+        Returns:
+            True if every needed column was found, False otherwise
+        """
+        header = self.snapshot.headers
+        by_key = {}
+        for index, value in enumerate(header, 1):
+            if value is not None:
+                by_key.setdefault(column_key(value), index)
+        
+        missing = []
+        if self.column_names:
+            self.columns = {}
+            for field in DEFAULT_COLUMNS:
+                name = self.column_names.get(field)
+                if name is not None and column_key(name) in by_key:
+                    self.columns[field] = by_key[column_key(name)]
+                else:
+                    missing.append(f"{field} column '{name}'")
+        else:
+            self.columns = dict(DEFAULT_COLUMNS)
+        
+        for field in sorted(self.fields - RECORD_FIELDS):
+            if field in by_key:
+                self.columns[field] = by_key[field]
+            else:
+                missing.append(f"placeholder {{{field}}}")
+        
+        if missing:
+            print(f"✗ Error: No matching column for {', '.join(missing)}")
+            return False
+        return True
+    
+    @property
+    def extra_fields(self) -> List[str]:
+        """Template placeholders read from extra columns"""
+        return sorted(self.fields - RECORD_FIELDS)
+    
+    def get_pending_interviews(self) -> List[Interview]:
         """
         Get all interviews that haven't been sent yet
         
         Returns:
-            List of dictionaries containing interview details
+            List of interview records
+        """
+        return list(self.iter_pending_interviews())
+    
+    def iter_pending_interviews(self, count_skipped: bool = False) -> Iterator[Interview]:
+        """
+        Lazily yield interviews that haven't been sent yet
+        
+        Args:
+            count_skipped: Count rows already marked "Sent" in EMAILS_SKIPPED
+                           (set by the send paths, once per run)
+        
+        Yields:
+            Interview records
+        """
+        return self._iter_interviews(include_sent=False, count_skipped=count_skipped)
+    
+    def get_all_interviews(self) -> List[Interview]:
+        """
+        Get all interviews with complete data, including ones already sent
+        
+        Returns:
+            List of interview records
+        """
+        return list(self._iter_interviews(include_sent=True))
+    
+    def _iter_interviews(self, include_sent: bool, count_skipped: bool = False) -> Iterator[Interview]:
+        """
+        Read interview rows from the sheet snapshot
+        
+        Args:
+            include_sent: Whether rows already marked as "Sent" are returned
+            count_skipped: Count the rows skipped as already sent in EMAILS_SKIPPED
+            
+        Yields:
+            Interview records
         """
-        interviews = []
+        if not self.snapshot:
+            return
         
-        if not self.worksheet:
-            return interviews
+        # Only the needed columns are decoded; a row is a tuple of them
+        needed = sorted(set(self.columns.values()))
+        positions = {field: needed.index(column) for field, column in self.columns.items()}
+        email_at = positions['email']
+        date_at = positions['date']
+        time_at = positions['time']
+        description_at = positions['description']
+        status_at = positions['status']
+        extra_at = [(field, positions[field]) for field in self.extra_fields]
+        rows = zip(*(self.snapshot.column(column) for column in needed))
         
         # Skip header row (row 1)
-        for row_num in range(2, self.worksheet.max_row + 1):
+        for row_num, row in enumerate(rows, 2):
             # Get values from cells
-            email = self.worksheet.cell(row=row_num, column=1).value
-            date = self.worksheet.cell(row=row_num, column=2).value
-            time = self.worksheet.cell(row=row_num, column=3).value
-            description = self.worksheet.cell(row=row_num, column=4).value
-            status = self.worksheet.cell(row=row_num, column=5).value
+            email = row[email_at]
+            date = row[date_at]
+            time = row[time_at]
+            description = row[description_at]
+            status = row[status_at]
             
             # Skip if already sent or if email is empty
-            if status == "Sent" or not email:
+            if (status == "Sent" and not include_sent) or not email:
+                if count_skipped and email and status == "Sent":
+                    EMAILS_SKIPPED.inc()
                 continue
             
             # Validate required fields
@@ -71,35 +221,85 @@ class ExcelReader:
                 print(f"⚠ Warning: Row {row_num} has missing data, skipping...")
                 continue
             
-            interviews.append({
-                'row_num': row_num,
-                'email': str(email).strip(),
-                'date': str(date).strip(),
-                'time': str(time).strip(),
-                'description': str(description).strip()
-            })
-        
-        return interviews
+            extra = {field: row[index] for field, index in extra_at} if extra_at else None
+            yield Interview.from_cells(row_num, email, date, time, description, extra)
     
-    def mark_as_sent(self, row_num: int) -> bool:
+    def mark_as_sent(self, row_num: int, save: bool = True) -> bool:
         """
         Mark an interview as sent in the Excel file
         
         Args:
             row_num: Row number to update
+            save: Whether to save the workbook immediately (see save())
+            
+        Returns:
+            True if updated successfully, False otherwise
+        """
+        return self.set_status(row_num, "Sent", save)
+    
+    def set_status(self, row_num: int, status: str, save: bool = True) -> bool:
+        """
+        Write a row's status (anything but "Sent" leaves the row pending)
+        
+        Args:
+            row_num: Row number to update
+            status: Status text
+            save: Whether to save the workbook immediately (see save())
             
         Returns:
             True if updated successfully, False otherwise
         """
         try:
-            self.worksheet.cell(row=row_num, column=5, value="Sent")
-            self.workbook.save(self.file_path)
+            with self._lock:
+                self.worksheet.cell(row=row_num, column=self.columns['status'], value=status)
+                if save:
+                    self.workbook.save(self.file_path)
+                    self._saved = True
+            return True
+        except Exception as e:
+            print(f"✗ Error marking row {row_num} as {status}: {str(e)}")
+            return False
+    
+    def get_status(self, row_num: int):
+        """Current status cell value of a row"""
+        with self._lock:
+            if self._workbook is None and self.snapshot is not None:
+                # Nothing written yet, so the snapshot is current
+                column = self.snapshot.column(self.columns['status'])
+                return column[row_num - 2] if 2 <= row_num < len(column) + 2 else None
+            return self.worksheet.cell(row=row_num, column=self.columns['status']).value
+    
+    def save(self) -> bool:
+        """
+        Save pending status updates to the Excel file
+        
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        try:
+            with self._lock:
+                if self._workbook is not None:
+                    self._workbook.save(self.file_path)
+                    self._saved = True
             return True
         except Exception as e:
-            print(f"✗ Error marking row {row_num} as sent: {str(e)}")
+            print(f"✗ Error saving Excel file: {str(e)}")
             return False
     
     def close(self):
-        """Close the workbook"""
-        if self.workbook:
-            self.workbook.close()
+        """Close the workbook and snapshot, caching the saved sheet for the next load"""
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+        if self._workbook is None:
+            return
+        if self._saved and self.cache.directory:
+            # The file's content changed; snapshot it from memory rather than
+            # letting the next run parse it again
+            try:
+                snapshot = Snapshot.from_rows(self._worksheet.iter_rows(values_only=True),
+                                              file_digest(self.file_path))
+                self.cache.store(snapshot)
+            except Exception as e:
+                print(f"⚠ Warning: Could not cache the saved workbook: {str(e)}")
+        self._workbook.close()
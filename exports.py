@@ -0,0 +1,91 @@
+"""
+Exports Module
+Builds the updated workbook and send results report (CSV / JSONL) downloads
+"""
+import csv
+import io
+import json
+from typing import Dict, Iterator
+
+# Results sections in report order, with the status written for each row
+SECTIONS = [('sent', 'Sent'), ('failed', 'Failed'), ('skipped', 'Skipped')]
+REPORT_FIELDS = ['status', 'row_num', 'email', 'date', 'time', 'reason', 'finished_at', 'elapsed_ms']
+
+
+def iter_report_rows(results: Dict) -> Iterator[Dict]:
+    """
+    Flatten send results into one report row per email
+
+    Args:
+        results: Results with 'sent', 'failed' and 'skipped' lists
+
+    Yields:
+        Dictionaries with the REPORT_FIELDS keys
+    """
+    for section, status in SECTIONS:
+        for entry in results.get(section, []):
+            yield {
+                'status': status,
+                'row_num': entry.get('row_num', ''),
+                'email': entry.get('email', ''),
+                'date': entry.get('date', ''),
+                'time': entry.get('time', ''),
+                'reason': entry.get('error', ''),
+                'finished_at': entry.get('finished_at', ''),
+                'elapsed_ms': entry.get('elapsed_ms', '')
+            }
+
+
+def results_csv(results: Dict) -> bytes:
+    """
+    Serialize the results report as CSV
+
+    Args:
+        results: Send results
+
+    Returns:
+        UTF-8 encoded CSV (header first)
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=REPORT_FIELDS)
+    writer.writeheader()
+    writer.writerows(iter_report_rows(results))
+    return buffer.getvalue().encode('utf-8')
+
+
+def results_jsonl(results: Dict) -> bytes:
+    """
+    Serialize the results report as JSON Lines
+
+    Args:
+        results: Send results
+
+    Returns:
+        UTF-8 encoded JSON objects, one per line
+    """
+    return "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n"
+                   for row in iter_report_rows(results)).encode('utf-8')
+
+
+def build_exports(results: Dict, workbook_path: str) -> Dict[str, bytes]:
+    """
+    Build every download for a finished send job
+
+    st.download_button takes the whole payload as bytes, so each download is
+    built in full here. Call once per job and cache the result: reruns then
+    serve the downloads without touching the workbook or re-serializing results.
+
+    Args:
+        results: Send results
+        workbook_path: Updated workbook
+
+    Returns:
+        Dictionary with 'workbook', 'csv' and 'jsonl' bytes
+    """
+    with open(workbook_path, 'rb') as f:
+        workbook = f.read()
+    return {
+        'workbook': workbook,
+        'csv': results_csv(results),
+        'jsonl': results_jsonl(results),
+    }
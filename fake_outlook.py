@@ -0,0 +1,210 @@
+"""
+Fake Outlook Module
+In-memory stand-in for the Outlook COM objects, used to run the
+sending code on machines without Outlook (e.g. Linux build boxes)
+"""
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+
+# Outlook's OlDefaultFolders value for Sent Items
+OL_FOLDER_SENT_MAIL = 5
+
+
+class FakeAccounts:
+    """Mimics the Namespace.Accounts collection"""
+
+    def __init__(self, names: List[str]):
+        self.names = names
+
+    @property
+    def Count(self) -> int:
+        return len(self.names)
+
+    def Item(self, index: int) -> "FakeAccount":
+        # COM collections are 1-based
+        return FakeAccount(self.names[index - 1])
+
+
+class FakeAccount:
+    """Mimics an Outlook Account object"""
+
+    def __init__(self, name: str):
+        self.DisplayName = name
+        self.SmtpAddress = name
+
+
+class FakeNamespace:
+    """Mimics the MAPI namespace"""
+
+    def __init__(self, accounts: List[str], application: Optional["FakeOutlookApplication"] = None):
+        self.Accounts = FakeAccounts(accounts)
+        self._application = application
+
+    def GetDefaultFolder(self, folder_type: int) -> "FakeFolder":
+        if folder_type != OL_FOLDER_SENT_MAIL or self._application is None:
+            raise RuntimeError(f"Fake namespace has no folder {folder_type}")
+        return FakeFolder(self._application)
+
+
+class FakeFolder:
+    """Mimics the Sent Items folder (only GetTable is supported)"""
+
+    def __init__(self, application: "FakeOutlookApplication"):
+        self._application = application
+
+    def GetTable(self, filter_text: str = "") -> "FakeTable":
+        # Supports the DASL send time filter used for reconciliation:
+        # @SQL="<PR_CLIENT_SUBMIT_TIME>" >= 'YYYY-MM-DD HH:MM' (UTC)
+        since = None
+        match = re.search(r"0x00390040\" >= '([^']+)'", filter_text or "")
+        if match:
+            since_utc = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+            since = since_utc.astimezone().replace(tzinfo=None)
+        with self._application._lock:
+            items = [mail for mail in self._application.sent_items if since is None or mail.SentOn >= since]
+        return FakeTable(items)
+
+
+class FakeColumns:
+    """Mimics Table.Columns"""
+
+    def __init__(self):
+        self.names: List[str] = []
+
+    def RemoveAll(self):
+        self.names = []
+
+    def Add(self, name: str):
+        self.names.append(name)
+
+
+class FakeTable:
+    """Mimics an Outlook Table: rows of selected columns read in blocks with GetArray"""
+
+    def __init__(self, items: List["FakeMailItem"]):
+        self.Columns = FakeColumns()
+        self._items = items
+        self._position = 0
+
+    @property
+    def EndOfTable(self) -> bool:
+        return self._position >= len(self._items)
+
+    def GetArray(self, max_rows: int):
+        block = self._items[self._position:self._position + max_rows]
+        self._position += len(block)
+        return tuple(tuple(mail.column(name) for name in self.Columns.names) for mail in block)
+
+
+class FakeAttachments:
+    """Mimics MailItem.Attachments"""
+
+    def __init__(self):
+        self.paths: List[str] = []
+
+    @property
+    def Count(self) -> int:
+        return len(self.paths)
+
+    def Add(self, source: str):
+        if not os.path.exists(source):
+            raise RuntimeError(f"Cannot find attachment file {source}")
+        self.paths.append(source)
+
+
+class FakePropertyAccessor:
+    """Mimics MailItem.PropertyAccessor (named properties by DASL name)"""
+
+    def __init__(self):
+        self.properties = {}
+
+    def SetProperty(self, name: str, value):
+        self.properties[name] = value
+
+    def GetProperty(self, name: str):
+        if name not in self.properties:
+            raise RuntimeError(f"The property {name} cannot be found")
+        return self.properties[name]
+
+
+class FakeMailItem:
+    """Mimics an Outlook MailItem"""
+
+    def __init__(self, application: "FakeOutlookApplication"):
+        self._application = application
+        self.To = ""
+        self.Subject = ""
+        self.Body = ""
+        self.HTMLBody = ""
+        self.SentOn = None
+        self.SendUsingAccount = None
+        self.Attachments = FakeAttachments()
+        self.PropertyAccessor = FakePropertyAccessor()
+
+    def column(self, name: str):
+        """Value of a Table column: a property by name or DASL name (None if unset)"""
+        if name.startswith("http://"):
+            return self.PropertyAccessor.properties.get(name)
+        return getattr(self, name)
+
+    def Send(self):
+        """Simulate the cross-process round trip and record the message"""
+        self._application._record(self)
+
+
+class FakeOutlookApplication:
+    """
+    Mimics Outlook.Application with injectable latency
+
+    Each CreateItem/Send call sleeps for the configured latency so the
+    cost of COM round trips can be reproduced without Outlook.
+    """
+
+    def __init__(self, create_latency: float = 0.0, send_latency: float = 0.0,
+                 accounts: Optional[List[str]] = None, fail_for: Optional[List[str]] = None,
+                 lose_for: Optional[List[str]] = None):
+        """
+        Initialize fake application
+
+        Args:
+            create_latency: Seconds to sleep on every CreateItem call
+            send_latency: Seconds to sleep on every Send call
+            accounts: Account names reported by the MAPI namespace
+            fail_for: Recipient addresses whose Send call should raise
+            lose_for: Recipient addresses whose Send call succeeds but whose
+                      message never reaches Sent Items
+        """
+        self.create_latency = create_latency
+        self.send_latency = send_latency
+        self.accounts = accounts if accounts is not None else ["fake@company.com"]
+        self.fail_for = set(fail_for or [])
+        self.lose_for = set(lose_for or [])
+        self.sent_items: List[FakeMailItem] = []
+        self.calling_threads = set()
+        self._lock = threading.Lock()
+
+    def GetNamespace(self, name: str) -> FakeNamespace:
+        return FakeNamespace(self.accounts, self)
+
+    def CreateItem(self, item_type: int) -> FakeMailItem:
+        self.calling_threads.add(threading.get_ident())
+        if self.create_latency:
+            time.sleep(self.create_latency)
+        return FakeMailItem(self)
+
+    def _record(self, mail: FakeMailItem):
+        self.calling_threads.add(threading.get_ident())
+        if self.send_latency:
+            time.sleep(self.send_latency)
+        if mail.To in self.fail_for:
+            raise RuntimeError(f"Simulated send failure for {mail.To}")
+        if mail.To in self.lose_for:
+            return
+        mail.SentOn = datetime.now()
+        with self._lock:
+            self.sent_items.append(mail)
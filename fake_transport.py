@@ -0,0 +1,367 @@
+"""
+Fake Transport Module
+In-process stand-in for a mail server, used to load-test the sending
+path without Outlook or SMTP. Messages are kept in memory or delivered
+to a local maildir; latency, throttling and failures are simulated.
+"""
+import mailbox
+import math
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Union
+from message_builder import MessageBuilder
+from metrics import RENDER_SECONDS, TRANSPORT_SECONDS
+from send_retry import (SEND_MAX_RETRIES, SEND_RETRY_BACKOFF, PermanentSendError,
+                        TransientSendError, deliver_with_retry)
+try:
+    from email_config import (FAKE_MODE, FAKE_MAILDIR, FAKE_LATENCY, FAKE_RATE_LIMIT,
+                              FAKE_TRANSIENT_FAILURE_RATE, FAKE_PERMANENT_FAILURE_RATE)
+except ImportError:
+    FAKE_MODE = "memory"
+    FAKE_MAILDIR = "fake_maildir"
+    FAKE_LATENCY = 0.0
+    FAKE_RATE_LIMIT = 0
+    FAKE_TRANSIENT_FAILURE_RATE = 0.0
+    FAKE_PERMANENT_FAILURE_RATE = 0.0
+
+
+# Messages kept in memory mode (older ones are dropped, counts are kept)
+MEMORY_LIMIT = 10000
+
+
+def parse_latency(spec: Union[float, str]) -> Callable[[random.Random], float]:
+    """
+    Turn a latency spec into a sampler
+
+    Specs (seconds):
+        0.01 or "fixed:0.01"        constant
+        "uniform:0.005:0.02"        uniform between low and high
+        "normal:0.01:0.003"         normal (mean, stddev), clipped at 0
+        "lognormal:0.01:0.5"        log-normal (median, sigma) - long tail
+        "exponential:0.01"          exponential with the given mean
+
+    Args:
+        spec: Latency spec
+
+    Returns:
+        Function taking a random.Random and returning a delay in seconds
+    """
+    if isinstance(spec, (int, float)):
+        value = float(spec)
+        return lambda rng: value
+
+    kind, _, args = str(spec).partition(":")
+    params = [float(p) for p in args.split(":")] if args else []
+    kind = kind.lower()
+
+    if kind == "fixed" and len(params) == 1:
+        return lambda rng: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "normal" and len(params) == 2:
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == "lognormal" and len(params) == 2 and params[0] > 0:
+        mu = math.log(params[0])
+        return lambda rng: rng.lognormvariate(mu, params[1])
+    if kind == "exponential" and len(params) == 1 and params[0] > 0:
+        return lambda rng: rng.expovariate(1.0 / params[0])
+
+    raise ValueError(f"Invalid latency spec '{spec}'")
+
+
+class FakeEmailer:
+    """Emailer that 'sends' to memory or a maildir with simulated server behaviour"""
+
+    def __init__(self, mode: str = FAKE_MODE, maildir: str = FAKE_MAILDIR,
+                 latency: Union[float, str] = FAKE_LATENCY, rate_limit: float = FAKE_RATE_LIMIT,
+                 transient_failure_rate: float = FAKE_TRANSIENT_FAILURE_RATE,
+                 permanent_failure_rate: float = FAKE_PERMANENT_FAILURE_RATE,
+                 max_retries: int = SEND_MAX_RETRIES, retry_backoff: float = SEND_RETRY_BACKOFF,
+                 seed: Optional[int] = None, verbose: bool = True,
+                 builder: Optional[MessageBuilder] = None):
+        """
+        Initialize fake emailer
+
+        Args:
+            mode: "memory" or "maildir"
+            maildir: Maildir directory (maildir mode)
+            latency: Per-send latency spec (see parse_latency)
+            rate_limit: Accepted messages per second before the server throttles
+                        (0 = unlimited; below 1, e.g. 0.5 = one message every 2 seconds)
+            transient_failure_rate: Probability that an attempt fails temporarily
+            permanent_failure_rate: Fraction of recipients that always fail
+            max_retries: Retries after a transient failure or throttling response (see send_retry)
+            retry_backoff: First retry delay in seconds (doubles on every retry)
+            seed: Random seed for reproducible runs
+            verbose: Print a line per message
+            builder: Message builder (defaults to one built from email_config)
+        """
+        if mode not in ("memory", "maildir"):
+            raise ValueError(f"Unknown fake transport mode '{mode}' (expected 'memory' or 'maildir')")
+        if rate_limit < 0:
+            raise ValueError(f"Fake transport rate_limit must be 0 (unlimited) or positive, got {rate_limit}")
+        self.mode = mode
+        self.maildir_path = maildir
+        self.latency = parse_latency(latency)
+        self.rate_limit = rate_limit
+        self.transient_failure_rate = transient_failure_rate
+        self.permanent_failure_rate = permanent_failure_rate
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.verbose = verbose
+        self.builder = builder or MessageBuilder.from_config()
+
+        self.outbox = deque(maxlen=MEMORY_LIMIT)
+        self.stats = {'sent': 0, 'throttled': 0, 'transient': 0, 'permanent': 0}
+        self.maildir = None
+        self.connected = False
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # Token bucket for the simulated server rate limit; it holds at least
+        # one token so rates below 1/s still let a message through
+        self._capacity = max(1.0, float(rate_limit))
+        self._tokens = self._capacity
+        self._refilled_at = time.monotonic()
+
+    def connect(self) -> bool:
+        """
+        'Connect' to the fake server (opens the maildir in maildir mode)
+
+        Returns:
+            True if connected successfully, False otherwise
+        """
+        try:
+            if self.mode == "maildir":
+                self.maildir = mailbox.Maildir(self.maildir_path, create=True)
+            self.connected = True
+            print(f"✓ Connected to fake transport ({self.mode})")
+            return True
+        except Exception as e:
+            print(f"✗ Error opening fake maildir '{self.maildir_path}': {str(e)}")
+            return False
+
+    def send_interview_notification(self, interview_data: Dict) -> bool:
+        """
+        Send interview notification email
+
+        Args:
+            interview_data: Dictionary containing email, date, time, and description
+
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        if not self.connected:
+            print("✗ Fake transport not connected!")
+            return False
+
+        return self.send_message(self.render_message(interview_data))
+
+    def render_message(self, interview_data: Dict) -> Dict:
+        """
+        Render the MIME message for one email
+
+        Args:
+            interview_data: Dictionary containing interview details
+
+        Returns:
+            Dictionary with to, mime (message bytes) and invite_revision
+            (committed once the message is sent)
+        """
+        with RENDER_SECONDS.time():
+            revision = self.builder.plan_invite(interview_data)
+            return {'to': interview_data['email'], 'mime': self.builder.build_mime(interview_data, revision),
+                    'invite_revision': revision}
+
+    def send_message(self, message: Dict) -> bool:
+        """
+        Send an already rendered message, retrying transient failures
+
+        Args:
+            message: Rendered message from render_message()
+
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        try:
+            self.deliver(message)
+            self.builder.record_sent(message)
+            if self.verbose:
+                print(f"✓ Email sent to {message['to']}")
+            return True
+        except Exception as e:
+            if self.verbose:
+                print(f"✗ Error sending email to {message['to']}: {str(e)}")
+            return False
+
+    def deliver(self, message: Dict):
+        """
+        Send an already rendered message, retrying transient failures, and
+        raise instead of reporting (the sender pool tells failures apart)
+
+        Args:
+            message: Rendered message from render_message()
+
+        Raises:
+            TransientSendError or PermanentSendError
+        """
+        deliver_with_retry(self._timed_deliver, message, self.max_retries, self.retry_backoff)
+
+    def _timed_deliver(self, message: Dict):
+        with TRANSPORT_SECONDS.time():
+            self._deliver(message)
+
+    def _deliver(self, message: Dict):
+        """One simulated SMTP transaction"""
+        with self._lock:
+            delay = self.latency(self._rng)
+            transient = self._rng.random() < self.transient_failure_rate
+            throttled = not self._take_token()
+        if delay:
+            time.sleep(delay)
+
+        if throttled:
+            self._count('throttled')
+            raise TransientSendError("421 4.7.0 Too many messages, slow down")
+        if self._permanently_fails(message['to']):
+            self._count('permanent')
+            raise PermanentSendError(f"550 5.1.1 Mailbox unavailable: {message['to']}")
+        if transient:
+            self._count('transient')
+            raise TransientSendError("451 4.3.0 Temporary server error")
+
+        if self.mode == "maildir":
+            with self._lock:
+                self.maildir.add(message['mime'])
+        else:
+            self.outbox.append((message['to'], message['mime']))
+        self._count('sent')
+
+    def _take_token(self) -> bool:
+        """Take one send token from the rate-limit bucket (call with the lock held)"""
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _permanently_fails(self, address: str) -> bool:
+        """The same recipients always fail, independent of retries and threads"""
+        if not self.permanent_failure_rate:
+            return False
+        return zlib.crc32(address.encode("utf-8")) % 10000 < self.permanent_failure_rate * 10000
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def submit(self, interview_data: Dict) -> Future:
+        """
+        Send an email and return its result as an already completed Future
+
+        Args:
+            interview_data: Dictionary containing email, date, time, and description
+
+        Returns:
+            Future resolving to True if the email was sent, False otherwise
+        """
+        future = Future()
+        future.set_result(self.send_interview_notification(interview_data))
+        return future
+
+    def close(self):
+        """Close the fake transport"""
+        self.connected = False
+        self.maildir = None
+
+
+class _MemoryWorkbook:
+    """Minimal stand-in for ExcelReader write-back during load tests"""
+
+    def __init__(self):
+        self.marked = 0
+        self.saves = 0
+
+    def mark_as_sent(self, row_num: int, save: bool = True) -> bool:
+        self.marked += 1
+        return True
+
+    def save(self) -> bool:
+        self.saves += 1
+        return True
+
+
+class _QuietLogger:
+    """EmailLogger stand-in that only counts, so console output doesn't dominate"""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+
+    def log_email_sent(self, email: str, status: str = "Sent"):
+        self.sent += 1
+
+    def log_email_failed(self, email: str, error: str = ""):
+        self.failed += 1
+
+    def log_invalid_addresses(self, invalid):
+        self.failed += len(invalid)
+
+    def log_internal_recipients(self, internal):
+        pass
+
+
+def load_test(count: int = 100000, send_workers: int = 8, **emailer_options) -> Dict:
+    """
+    Push synthetic interviews through the send pipeline into a fake transport
+
+    Args:
+        count: Number of messages
+        send_workers: Send stage threads
+        **emailer_options: Passed to FakeEmailer
+
+    Returns:
+        Pipeline results plus elapsed seconds, throughput and transport stats
+    """
+    from pipeline import run_send_pipeline
+
+    emailer_options.setdefault("verbose", False)
+    emailer_options.setdefault("retry_backoff", 0.01)
+    emailer = FakeEmailer(**emailer_options)
+    emailer.connect()
+
+    interviews = ({'row_num': n + 2, 'email': f"candidate{n}@example.com", 'date': "2025-12-20",
+                   'time': "2:00 PM", 'description': "Technical interview"} for n in range(count))
+
+    start = time.perf_counter()
+    results = run_send_pipeline(interviews, _MemoryWorkbook(), emailer, _QuietLogger(),
+                                send_workers=send_workers, save_every=1000)
+    elapsed = time.perf_counter() - start
+    emailer.close()
+
+    results.update(elapsed=elapsed, per_second=count / elapsed, stats=emailer.stats)
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    scenarios = [
+        ("no latency", {}),
+        ("1ms latency, 1% transient, 0.1% permanent",
+         {'latency': 0.001, 'transient_failure_rate': 0.01, 'permanent_failure_rate': 0.001}),
+        ("lognormal latency, throttled at 2k/s",
+         {'latency': "lognormal:0.001:0.5", 'rate_limit': 2000}),
+    ]
+    print(f"Load test: {count} messages per scenario\n")
+    for name, options in scenarios:
+        r = load_test(count, seed=1, **options)
+        print(f"{name:<45} {r['per_second']:>9.0f} msg/s  sent {r['sent']}  failed {r['failed']}  "
+              f"transient {r['stats']['transient']}  throttled {r['stats']['throttled']}")
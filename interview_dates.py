@@ -0,0 +1,180 @@
+"""
+Interview Dates Module
+Parses and formats interview date/time cells with memoized parsers
+"""
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Optional
+try:
+    from email_config import DATE_ORDER
+except ImportError:
+    DATE_ORDER = None
+
+
+# Formats whose day and month can't be confused
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y"]
+# All-numeric formats, by the order of day and month
+DAY_FIRST_FORMATS = ["%d/%m/%Y", "%d-%m-%Y"]
+MONTH_FIRST_FORMATS = ["%m/%d/%Y", "%m-%d-%Y"]
+TIME_FORMATS = ["%I:%M %p", "%I %p", "%I:%M%p", "%I%p", "%H:%M", "%H:%M:%S", "%I:%M:%S %p"]
+
+# Output formats used when rendering emails
+DATE_OUTPUT_FORMAT = "%Y-%m-%d"
+TIME_OUTPUT_FORMAT = "%I:%M %p"
+
+# Sheets repeat a handful of dates and slots, so a small cache covers them
+CACHE_SIZE = 4096
+
+
+def _cached(func):
+    """Memoize on the raw cell value(s), falling back for unhashable values"""
+    cached_func = lru_cache(maxsize=CACHE_SIZE)(func)
+
+    def wrapper(*values):
+        try:
+            return cached_func(*values)
+        except TypeError:
+            return func(*values)
+
+    wrapper.cache_info = cached_func.cache_info
+    wrapper.cache_clear = cached_func.cache_clear
+    wrapper.__doc__ = func.__doc__
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+
+def _parse_text(text: str, formats) -> Optional[datetime]:
+    """Try each strptime format in turn"""
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+@_cached
+def parse_date(value) -> Optional[date]:
+    """
+    Parse a date cell value
+
+    Args:
+        value: Cell value (datetime/date or text such as "2025-12-20")
+
+    Returns:
+        Parsed date, or None if it can't be understood
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if value is None:
+        return None
+
+    text = str(value).strip()
+    parsed = _parse_date_text(text)
+    if parsed is None and " " in text:
+        # Excel datetimes stored as text, e.g. "2025-12-20 00:00:00"
+        parsed = _parse_date_text(text.split(" ")[0])
+    return parsed.date() if parsed else None
+
+
+def _parse_date_text(text: str, order: Optional[str] = None) -> Optional[datetime]:
+    """
+    Parse date text, reading numeric dates in DATE_ORDER
+
+    With no DATE_ORDER, a numeric date that reads differently day-first
+    and month-first (e.g. "12/01/2026") is ambiguous and left unparsed
+    rather than guessed.
+    """
+    order = (order or DATE_ORDER or "").upper()
+    parsed = _parse_text(text, DATE_FORMATS)
+    if parsed is not None:
+        return parsed
+    if order == "DMY":
+        return _parse_text(text, DAY_FIRST_FORMATS)
+    if order == "MDY":
+        return _parse_text(text, MONTH_FIRST_FORMATS)
+    day_first = _parse_text(text, DAY_FIRST_FORMATS)
+    month_first = _parse_text(text, MONTH_FIRST_FORMATS)
+    if day_first is not None and month_first is not None and day_first != month_first:
+        return None
+    return day_first or month_first
+
+
+@_cached
+def parse_time(value) -> Optional[time]:
+    """
+    Parse a time cell value
+
+    Args:
+        value: Cell value (datetime/time or text such as "2 PM" or "14:30")
+
+    Returns:
+        Parsed time, or None if it can't be understood
+    """
+    if isinstance(value, datetime):
+        return value.time()
+    if isinstance(value, time):
+        return value
+    if value is None:
+        return None
+
+    text = str(value).strip().upper().replace(".", "")
+    parsed = _parse_text(text, TIME_FORMATS)
+    return parsed.time() if parsed else None
+
+
+@_cached
+def format_date(value) -> str:
+    """
+    Format a date cell value for display in emails
+
+    Args:
+        value: Raw cell value
+
+    Returns:
+        Date formatted as YYYY-MM-DD, or the stripped original text
+    """
+    parsed = parse_date(value)
+    if parsed is None:
+        return str(value).strip()
+    return parsed.strftime(DATE_OUTPUT_FORMAT)
+
+
+@_cached
+def format_time(value) -> str:
+    """
+    Format a time cell value for display in emails
+
+    Args:
+        value: Raw cell value
+
+    Returns:
+        Time formatted like "2:00 PM", or the stripped original text
+    """
+    parsed = parse_time(value)
+    if parsed is None:
+        return str(value).strip()
+    return parsed.strftime(TIME_OUTPUT_FORMAT).lstrip("0")
+
+
+@_cached
+def interview_datetime(date_value, time_value) -> Optional[datetime]:
+    """
+    Combine an interview date and time into a datetime
+
+    Rows with the same date and slot share one (immutable) datetime object.
+
+    Args:
+        date_value: Date cell value
+        time_value: Time cell value
+
+    Returns:
+        Combined datetime, or None if either part can't be parsed
+    """
+    day = parse_date(date_value)
+    clock = parse_time(time_value)
+    if day is None or clock is None:
+        return None
+    return datetime.combine(day, clock)
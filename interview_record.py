@@ -0,0 +1,184 @@
+"""
+Interview Record Module
+Compact per-row interview record shared by the reader, pipeline,
+emailers and logger
+"""
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
+from interview_dates import CACHE_SIZE, format_date, format_time, interview_datetime
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def clean_text(value) -> str:
+    """
+    Strip a text cell and intern the result
+
+    Descriptions repeat across thousands of rows; every row gets the same
+    string object instead of its own copy.
+
+    Args:
+        value: Raw cell value
+
+    Returns:
+        Stripped, interned string
+    """
+    return sys.intern(str(value).strip())
+
+
+def clean_value(value) -> str:
+    """Text for an extra placeholder column (empty cells become "")"""
+    return "" if value is None else clean_text(value)
+
+
+class Interview:
+    """
+    One interview row
+
+    Uses __slots__ instead of a per-row dict, and shares the strings and
+    datetimes of low-cardinality fields (date, time, description) between
+    rows. Supports item access (interview['email'], .get(), 'key' in
+    interview), so code written for the old dictionaries keeps working.
+    Values of extra template placeholders (e.g. interviewer, meeting_link)
+    live in `extra` and are reachable the same way.
+    """
+
+    FIELDS = ("row_num", "email", "date", "time", "description", "interview_at")
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, row_num: Optional[int], email: str, date: str, time: str, description: str,
+                 interview_at: Optional[datetime] = None, extra: Optional[Dict[str, Any]] = None):
+        """
+        Initialize interview record
+
+        Args:
+            row_num: Worksheet row number
+            email: Candidate email address
+            date: Formatted interview date
+            time: Formatted interview time
+            description: Interview description
+            interview_at: Interview start (None if date/time can't be parsed)
+            extra: Values of extra placeholder columns (None if there are none)
+        """
+        self.row_num = row_num
+        self.email = email
+        self.date = date
+        self.time = time
+        self.description = description
+        self.interview_at = interview_at
+        self.extra = extra
+
+    @classmethod
+    def from_cells(cls, row_num: Optional[int], email, date, time, description,
+                   extra: Optional[Dict[str, Any]] = None) -> "Interview":
+        """
+        Build a record from raw worksheet cell values
+
+        Args:
+            row_num: Worksheet row number
+            email: Email cell value
+            date: Date cell value
+            time: Time cell value
+            description: Description cell value
+            extra: Raw values of extra placeholder columns, keyed by placeholder
+
+        Returns:
+            Interview record
+        """
+        return cls(
+            row_num,
+            str(email).strip(),
+            sys.intern(format_date(date)),
+            sys.intern(format_time(time)),
+            clean_text(description),
+            interview_datetime(date, time),
+            {field: clean_value(value) for field, value in extra.items()} if extra else None
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + len(self.extra or ())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.FIELDS + tuple(self.extra or ())
+
+    def to_dict(self) -> dict:
+        """Plain dictionary copy (e.g. for DataFrames or JSON)"""
+        data = {key: getattr(self, key) for key in self.FIELDS}
+        data.update(self.extra or {})
+        return data
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Interview):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Interview(row_num={self.row_num!r}, email={self.email!r}, date={self.date!r}, time={self.time!r})"
+
+
+def _benchmark(rows: int = 1000000):
+    """Compare the per-row memory of dict rows and Interview records"""
+    import gc
+    import tracemalloc
+    from datetime import time as clock
+
+    # Distinct string objects per cell, as openpyxl produces them
+    slots = [clock(hour, minute) for hour in range(9, 18) for minute in (0, 30)]
+    descriptions = ["Technical Interview - Round 1", "HR Screening", "Final Round with Director",
+                    "System Design Interview", " Culture Fit Chat "]
+
+    def read_cells():
+        return ((n + 2, f"candidate{n}@example.com", datetime(2025, 12, 1 + n % 28),
+                 slots[n % len(slots)], "".join(list(descriptions[n % len(descriptions)])))
+                for n in range(rows))
+
+    def as_dicts():
+        return [{'row_num': r, 'email': str(e).strip(), 'date': format_date(d), 'time': format_time(t),
+                 'description': str(s).strip(), 'interview_at': datetime.combine(d.date(), t)}
+                for r, e, d, t, s in read_cells()]
+
+    def as_records():
+        return [Interview.from_cells(r, e, d, t, s) for r, e, d, t, s in read_cells()]
+
+    print(f"Memory retained by {rows:,} rows (including the cell values each row keeps alive)\n")
+    for name, build in (("dict", as_dicts), ("Interview", as_records)):
+        gc.collect()
+        tracemalloc.start()
+        records = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<10} {current / rows:7.1f} bytes/row   {current / 2 ** 20:8.1f} MiB total")
+        del records
+
+
+if __name__ == "__main__":
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -2,22 +2,127 @@
 Logger Module
 Handles logging of email sending activities
 """
+import gzip
 import logging
-from datetime import datetime
+import logging.handlers
 import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+from send_log_index import ARCHIVE_TIME_FORMAT, SendLogIndex
+try:
+    from email_config import LOG_MAX_BYTES, SEND_LOG_INDEX
+except ImportError:
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    SEND_LOG_INDEX = "send_log_index.db"
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Hold an exclusive lock on a lock file, across processes"""
+    with open(path, "a+b") as lock:
+        if msvcrt:
+            lock.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10 seconds; keep waiting
+                    continue
+            try:
+                yield
+            finally:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Size-rotated log file whose archives are gzip-compressed and named by
+    rotation time (e.g. email_notifications.log.20251214-103015-123456.gz),
+    so older archives never need renaming
+
+    Several processes (e.g. leased runners, the reminder scheduler) can share
+    one log. Each keeps it open in append mode, so the size check sees what
+    every process has written, and only a rollover takes the lock file. The
+    rotating process copies the log into the archive and truncates it in
+    place (like logrotate's copytruncate), which leaves the other processes'
+    handles valid on every platform. A line another process writes in the
+    instant between the copy and the truncation can be lost.
+    """
+    
+    def __init__(self, filename: str, maxBytes: int = 0, encoding: Optional[str] = None):
+        super().__init__(filename, maxBytes=maxBytes, encoding=encoding, delay=True)
+        self.lock_file = self.baseFilename + ".lock"
+        self._checked_size = 0
+    
+    def shouldRollover(self, record) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes <= 0:
+            return False
+        # Append-mode writes land at the end of the shared file, whoever wrote last
+        self._checked_size = self.stream.seek(0, 2)
+        return self._checked_size + len(self.format(record)) + 1 >= self.maxBytes
+    
+    def doRollover(self):
+        with _file_lock(self.lock_file):
+            if self.stream:
+                self.stream.flush()
+            try:
+                if os.path.getsize(self.baseFilename) < self._checked_size:
+                    # Another process has just rotated it
+                    return
+            except OSError:
+                return
+            
+            temp = f"{self.baseFilename}.{os.getpid()}.gz.tmp"
+            with open(self.baseFilename, 'rb') as source, gzip.open(temp, 'wb') as target:
+                shutil.copyfileobj(source, target)
+            with open(self.baseFilename, 'r+b') as log:
+                log.truncate(0)
+            
+            # Named once the log is truncated: every line in the archive was
+            # written before that time (send_log_index relies on it)
+            while True:
+                archive = f"{self.baseFilename}.{datetime.now().strftime(ARCHIVE_TIME_FORMAT)}.gz"
+                if not os.path.exists(archive):
+                    break
+            os.replace(temp, archive)
 
 
 class EmailLogger:
     """Logs email sending activities to file"""
     
-    def __init__(self, log_file: str = "email_notifications.log"):
+    def __init__(self, log_file: str = "email_notifications.log", max_bytes: int = LOG_MAX_BYTES,
+                 index_path: Optional[str] = SEND_LOG_INDEX):
         """
         Initialize logger
         
         Args:
             log_file: Path to the log file
+            max_bytes: Rotate (and compress) the log when it exceeds this size (0 = never)
+            index_path: Send log index to update with every entry (None = no index)
         """
         self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.index = SendLogIndex(index_path) if index_path else None
         self.logger = self._setup_logger()
     
     def _setup_logger(self) -> logging.Logger:
@@ -31,11 +136,13 @@ class EmailLogger:
         logger = logging.getLogger("EmailNotificationLogger")
         logger.setLevel(logging.INFO)
         
-        # Clear any existing handlers
+        # Replace any existing handlers (closing the log file they hold open)
+        for handler in logger.handlers:
+            handler.close()
         logger.handlers = []
         
         # Create file handler
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
+        file_handler = CompressingRotatingFileHandler(self.log_file, maxBytes=self.max_bytes, encoding='utf-8')
         file_handler.setLevel(logging.INFO)
         
         # Create console handler
@@ -66,7 +173,10 @@ class EmailLogger:
             email: Email address
             status: Status of the email (default: "Sent")
         """
+        written_after = time.time()
         self.logger.info(f"Email: {email} | Status: {status}")
+        if self.index:
+            self.index.record(email, status, self.log_file, written_after=written_after)
     
     def log_email_failed(self, email: str, error: str = ""):
         """
@@ -77,7 +187,39 @@ class EmailLogger:
             error: Error message (optional)
         """
         error_msg = f" | Error: {error}" if error else ""
+        written_after = time.time()
         self.logger.error(f"Email: {email} | Status: Failed{error_msg}")
+        if self.index:
+            self.index.record(email, "Failed", self.log_file, written_after=written_after)
+    
+    def log_invalid_addresses(self, invalid: list):
+        """
+        Log a batch of addresses rejected before sending
+        
+        Args:
+            invalid: List of dictionaries with 'email' and 'error' keys
+        """
+        if not invalid:
+            return
+        self.logger.warning(f"{len(invalid)} invalid address(es) skipped before sending")
+        for entry in invalid:
+            written_after = time.time()
+            self.logger.warning(f"Email: {entry['email']} | Status: Invalid | Error: {entry['error']}")
+            if self.index:
+                self.index.record(entry['email'], "Invalid", self.log_file, written_after=written_after)
+    
+    def log_internal_recipients(self, internal: list):
+        """
+        Log the recipients in an internal domain (see INTERNAL_DOMAINS)
+        
+        Args:
+            internal: List of dictionaries with an 'email' key
+        """
+        if not internal:
+            return
+        self.logger.info(f"{len(internal)} internal recipient(s) in this batch")
+        for entry in internal:
+            self.logger.info(f"Email: {entry['email']} | Internal recipient")
     
     def log_session_start(self):
         """Log the start of a new session"""
@@ -97,3 +239,15 @@ class EmailLogger:
         self.logger.info(f"SESSION SUMMARY: {total_sent} sent, {total_failed} failed")
         self.logger.info("=" * 70)
         self.logger.info("")  # Blank line for readability
+        if self.index:
+            self.index.flush()
+    
+    def close(self):
+        """Close the log file and the send log index connection"""
+        for handler in self.logger.handlers:
+            if isinstance(handler, CompressingRotatingFileHandler):
+                handler.close()
+        if self.index:
+            self.index.close()
+            self.index = None
+
@@ -3,9 +3,97 @@ Main Script - Interview Notification Scheduler
 Orchestrates the entire process of sending interview notifications
 """
 from excel_reader import ExcelReader
-from email_sender import OutlookEmailer
+from transports import create_emailer
 from logger import EmailLogger
+from message_builder import MessageBuilder
+from pipeline import run_send_pipeline
+from metrics import start_metrics_server
+from row_leases import LeaseStore, run_leased_send
+from send_queue import PrioritySendQueue
+from delivery_reconciler import flag_for_resend, print_reconciliation, reconcile, sent_mail_reader
+from typing import Dict, List
+import itertools
+import os
 import sys
+try:
+    from email_config import LEASE_DB, SEND_PRIORITY, RECONCILE_AFTER_SEND
+except ImportError:
+    LEASE_DB = None
+    SEND_PRIORITY = False
+    RECONCILE_AFTER_SEND = False
+
+
+def print_invalid_addresses(invalid: List[Dict]):
+    """
+    Print the rows that were skipped because of invalid email addresses
+    
+    Args:
+        invalid: Invalid entries with 'row_num', 'email' and 'error'
+    """
+    if not invalid:
+        return
+    print(f"\n⚠ {len(invalid)} row(s) with invalid email addresses were skipped:")
+    for entry in invalid:
+        print(f"  Row {entry['row_num']}: {entry['email']} ({entry['error']})")
+
+
+def print_internal_recipients(internal: List[Dict]):
+    """
+    Print the recipients in an internal domain (see INTERNAL_DOMAINS)
+    
+    Args:
+        internal: Internal entries with 'row_num' and 'email'
+    """
+    if not internal:
+        return
+    print(f"\nℹ {len(internal)} row(s) were addressed to internal recipients:")
+    for entry in internal:
+        print(f"  Row {entry['row_num']}: {entry['email']}")
+
+
+def print_late_interviews(late: List[Dict], logger: EmailLogger):
+    """
+    Report the interviews whose notification came too close to the interview
+    
+    Args:
+        late: Late entries from PrioritySendQueue ('row_num', 'email', 'error', 'skipped')
+        logger: Email logger (skipped notifications are logged as failed)
+    """
+    if not late:
+        return
+    skipped = [entry for entry in late if entry['skipped']]
+    print(f"\n⚠ {len(late)} notification(s) could not give enough notice"
+          f" ({len(skipped)} skipped, {len(late) - len(skipped)} sent anyway):")
+    for entry in late:
+        action = "skipped" if entry['skipped'] else "sent anyway"
+        print(f"  Row {entry['row_num']}: {entry['email']} ({entry['error']}, {action})")
+    for entry in skipped:
+        logger.log_email_failed(entry['email'], f"Skipped: {entry['error']}")
+
+
+def reconcile_run(journal: List, excel_reader: ExcelReader, emailer):
+    """
+    Check the run's sends against the sent mail and flag missing ones for re-send
+    
+    Args:
+        journal: (row number, email, send time) of every email sent this run
+        excel_reader: Loaded Excel reader
+        emailer: Connected emailer
+    """
+    read_sent = sent_mail_reader(emailer)
+    if read_sent is None:
+        print("⚠ Skipping reconciliation: this transport keeps no sent mail (set RECONCILE_MAILBOX)")
+        return
+    print("\nReconciling with sent mail...")
+    try:
+        result = reconcile(journal, read_sent)
+    except Exception as e:
+        print(f"✗ Error reading sent mail for reconciliation: {str(e)}")
+        return
+    print_reconciliation(result)
+    flagged = flag_for_resend(excel_reader, result['unconfirmed'])
+    if flagged:
+        print(f"⚠ {flagged} row(s) marked 'Unconfirmed'; they will be sent again on the next run")
 
 
 def main():
@@ -21,8 +109,11 @@ def main():
     logger = EmailLogger()
     logger.log_session_start()
     
-    # Initialize Excel reader
-    excel_reader = ExcelReader(excel_file)
+    # Serve live counters while the run is in progress (if METRICS_PORT is set)
+    start_metrics_server()
+    
+    # Initialize Excel reader (reading only the columns the templates use)
+    excel_reader = ExcelReader(excel_file, fields=MessageBuilder.from_config().fields)
     if not excel_reader.load_file():
         print("\n✗ Failed to load Excel file. Please check the file path.")
         print(f"  Expected file: {excel_file}")
@@ -31,21 +122,22 @@ def main():
         logger.log_session_end(0, 0)
         return
     
-    # Get pending interviews
-    pending_interviews = excel_reader.get_pending_interviews()
+    # Get pending interviews (read lazily, one row at a time); with leases,
+    # run_leased_send reads the sheet again and counts the skipped rows itself
+    pending_interviews = excel_reader.iter_pending_interviews(count_skipped=not LEASE_DB)
+    first_interview = next(pending_interviews, None)
     
-    if not pending_interviews:
+    if first_interview is None:
         print("\n✓ No pending interviews found.")
         print("  All interviews have already been sent or the file is empty.")
         excel_reader.close()
         logger.log_session_end(0, 0)
         return
     
-    print(f"\n✓ Found {len(pending_interviews)} pending interview(s) to send\n")
-    
-    # Initialize Outlook emailer
-    emailer = OutlookEmailer()
+    # Initialize emailer for the configured transport (Outlook runs COM on its own thread)
+    emailer = create_emailer()
     if not emailer.connect():
+        emailer.close()
         excel_reader.close()
         logger.log_session_end(0, 0)
         return
@@ -53,27 +145,41 @@ def main():
     print("\nStarting to send emails...\n")
     print("-" * 70)
     
-    # Send emails
-    sent_count = 0
-    failed_count = 0
-    
-    for interview in pending_interviews:
-        email_address = interview['email']
-        
-        # Send email
-        if emailer.send_interview_notification(interview):
-            # Mark as sent in Excel
-            if excel_reader.mark_as_sent(interview['row_num']):
-                logger.log_email_sent(email_address)
-                sent_count += 1
-            else:
-                logger.log_email_failed(email_address, "Failed to update Excel")
-                failed_count += 1
-        else:
-            logger.log_email_failed(email_address, "Failed to send email")
-            failed_count += 1
-    
-    # Close Excel file
+    # Soonest interviews first: under a rate limit or a slow transport the
+    # available throughput goes to the candidates who need the email soonest
+    queues = []
+    
+    def send_order(interviews):
+        if not SEND_PRIORITY:
+            return interviews
+        queues.append(PrioritySendQueue(interviews))
+        return queues[-1]
+    
+    # Stream rows through validate/render -> send -> write-back; invalid
+    # addresses are rejected before they reach the transport
+    if LEASE_DB:
+        # Share the workbook with other runners: only send rows we lease
+        store = LeaseStore(LEASE_DB, os.path.basename(excel_file))
+        print(f"✓ Leasing rows as worker {store.worker} ({LEASE_DB})")
+        try:
+            results = run_leased_send(excel_reader, emailer, logger, store, order=send_order)
+        finally:
+            store.close()
+    else:
+        journal = [] if RECONCILE_AFTER_SEND else None
+        results = run_send_pipeline(send_order(itertools.chain([first_interview], pending_interviews)),
+                                    excel_reader, emailer, logger, journal=journal)
+        if journal:
+            reconcile_run(journal, excel_reader, emailer)
+    late = [entry for q in queues for entry in q.late]
+    sent_count = results['sent']
+    failed_count = results['failed'] + sum(1 for entry in late if entry['skipped'])
+    print_invalid_addresses(results['invalid'])
+    print_internal_recipients(results['internal'])
+    print_late_interviews(late, logger)
+    
+    # Stop the emailer and close Excel file
+    emailer.close()
     excel_reader.close()
     
     # Print summary
@@ -0,0 +1,491 @@
+"""
+Message Builder Module
+Renders interview emails as plain text, HTML and multipart MIME
+
+Templates are compiled once per run: the run-wide constants (company name,
+HR contact, ...) are substituted up front and every line that doesn't
+contain a per-candidate placeholder is quoted-printable encoded once.
+Quoted-printable encodes each line independently, so per-message work is
+limited to encoding the few lines that contain candidate values.
+"""
+import html
+import socket
+import string
+import time
+import uuid
+from email import quoprimime
+from email.header import Header
+from email.utils import formatdate, make_msgid
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from attachment_cache import AttachmentSet
+from calendar_invite import InviteBuilder, InviteRevision
+
+
+DEFAULT_EMAIL_SUBJECT = "Interview Scheduled"
+
+DEFAULT_EMAIL_TEMPLATE = """Dear Candidate,
+
+We are pleased to inform you that your interview has been scheduled with our team.
+
+══════════════════════════════════════════════════════════════
+                    INTERVIEW DETAILS
+══════════════════════════════════════════════════════════════
+
+📅 Date:        {date}
+⏰ Time:        {time}
+📝 Round:       {description}
+
+══════════════════════════════════════════════════════════════
+
+IMPORTANT INSTRUCTIONS:
+------------------------
+✓ Please join 5-10 minutes before the scheduled time
+✓ Ensure you have a stable internet connection
+✓ Keep your resume and relevant documents ready
+✓ Prepare any questions you may have for us
+
+If you need to reschedule or have any questions, please contact us immediately.
+
+We look forward to speaking with you!
+
+Best Regards,
+HR Team
+{hr_department}
+
+══════════════════════════════════════════════════════════════
+This is an automated notification. Please do not reply to this email.
+For queries, contact: {hr_email}
+══════════════════════════════════════════════════════════════
+"""
+
+DEFAULT_REMINDER_SUBJECT = "Interview Reminder"
+
+DEFAULT_REMINDER_TEMPLATE = """Dear Candidate,
+
+This is a reminder of your upcoming interview.
+
+📅 Date:        {date}
+⏰ Time:        {time}
+📝 Round:       {description}
+
+If you can no longer attend, please let us know as soon as possible.
+
+Best Regards,
+HR Team
+"""
+
+# Wrapper used when no HTML template is configured: keeps the plain-text layout
+HTML_PREFIX = ('<html><body><pre style="font-family: Consolas, \'Courier New\', monospace; '
+               'font-size: 14px;">')
+HTML_SUFFIX = "</pre></body></html>"
+
+CRLF = "\r\n"
+
+
+def _qp_encode(text: str) -> str:
+    """Quoted-printable encode UTF-8 text with CRLF line endings"""
+    return quoprimime.body_encode(text.encode("utf-8").decode("latin-1"), eol=CRLF)
+
+
+class CompiledTemplate:
+    """A template with run-wide constants substituted and static lines pre-encoded"""
+
+    def __init__(self, template: str, constants: Dict, escape: Optional[Callable] = None,
+                 escape_literals: bool = False, prefix: str = "", suffix: str = ""):
+        """
+        Compile a template
+
+        Args:
+            template: str.format-style template
+            constants: Values that are the same for every message
+            escape: Optional function applied to every substituted value
+            escape_literals: Whether the template text itself is escaped too
+            prefix: Text placed before the rendered template
+            suffix: Text placed after the rendered template
+        """
+        escape = escape or (lambda value: value)
+        literal = escape if escape_literals else (lambda value: value)
+
+        # Each line is a list of literal strings and (field, spec, conversion) tuples
+        lines: List[List] = [[prefix]]
+        self.fields = set()
+
+        for text, field, spec, conversion in string.Formatter().parse(template):
+            self._add_text(lines, literal(text))
+            if field is None:
+                continue
+            if field in constants:
+                value = constants[field]
+                if conversion:
+                    value = {"r": repr, "s": str, "a": ascii}[conversion](value)
+                self._add_text(lines, escape(format(value, spec or "")))
+            else:
+                self.fields.add(field)
+                lines[-1].append((field, spec or "", conversion, escape))
+        self._add_text(lines, suffix)
+
+        # Group runs of static lines into pre-rendered, pre-encoded chunks
+        self._chunks = []
+        static_run = []
+        for line in lines:
+            if all(isinstance(part, str) for part in line):
+                static_run.append("".join(line))
+                continue
+            if static_run:
+                self._chunks.append(self._static_chunk(static_run))
+                static_run = []
+            self._chunks.append((False, self._merge_literals(line), None))
+        if static_run:
+            self._chunks.append(self._static_chunk(static_run))
+
+    @staticmethod
+    def _add_text(lines: List[List], text: str):
+        """Append literal text, starting a new line at every newline"""
+        pieces = text.split("\n")
+        lines[-1].append(pieces[0])
+        for piece in pieces[1:]:
+            lines.append([piece])
+
+    @staticmethod
+    def _merge_literals(line: List) -> List:
+        """Join adjacent literal strings within a line"""
+        merged = []
+        for part in line:
+            if isinstance(part, str) and merged and isinstance(merged[-1], str):
+                merged[-1] += part
+            elif part != "":
+                merged.append(part)
+        return merged
+
+    @staticmethod
+    def _static_chunk(static_lines: List[str]):
+        text = "\n".join(static_lines)
+        return (True, text, _qp_encode(text))
+
+    def _render_line(self, parts: List, data: Dict) -> str:
+        rendered = []
+        for part in parts:
+            if isinstance(part, str):
+                rendered.append(part)
+                continue
+            field, spec, conversion, escape = part
+            value = data[field]
+            if conversion:
+                value = {"r": repr, "s": str, "a": ascii}[conversion](value)
+            rendered.append(escape(format(value, spec)))
+        return "".join(rendered)
+
+    def render(self, data: Dict) -> str:
+        """
+        Render the template for one message
+
+        Args:
+            data: Per-candidate values (e.g. date, time, description)
+
+        Returns:
+            Rendered text
+        """
+        return "\n".join(
+            text if static else self._render_line(text, data)
+            for static, text, _ in self._chunks
+        )
+
+    def render_encoded(self, data: Dict) -> str:
+        """
+        Render the template as quoted-printable text, encoding only dynamic lines
+
+        Args:
+            data: Per-candidate values
+
+        Returns:
+            Quoted-printable encoded body with CRLF line endings
+        """
+        return CRLF.join(
+            encoded if static else _qp_encode(self._render_line(text, data))
+            for static, text, encoded in self._chunks
+        )
+
+
+class MessageBuilder:
+    """Builds interview notification messages from compiled templates"""
+
+    def __init__(self, subject: str = DEFAULT_EMAIL_SUBJECT, template: Optional[str] = None,
+                 constants: Optional[Dict] = None, html_template: Optional[str] = None,
+                 sender: str = "", attachments: Optional[AttachmentSet] = None,
+                 invites: Optional[InviteBuilder] = None, send_html: bool = False):
+        """
+        Initialize message builder
+
+        Args:
+            subject: Email subject
+            template: Plain-text template (defaults to DEFAULT_EMAIL_TEMPLATE)
+            constants: Run-wide placeholder values (company_name, hr_email, hr_department)
+            html_template: Optional HTML template; derived from the text template if omitted
+            sender: From address used for MIME messages
+            attachments: Files to attach (shared and/or per-candidate column)
+            invites: Calendar invite builder (None = no .ics invite)
+            send_html: Whether Outlook sends the HTML body (MIME messages always carry both)
+        """
+        constants = constants or {}
+        self.subject = subject
+        self.sender = sender
+        self.attachments = attachments or AttachmentSet()
+        self.invites = invites
+        self.send_html = send_html
+        self.text = CompiledTemplate(template or DEFAULT_EMAIL_TEMPLATE, constants)
+        if html_template:
+            self.html = CompiledTemplate(html_template, constants, escape=html.escape)
+        else:
+            self.html = CompiledTemplate(template or DEFAULT_EMAIL_TEMPLATE, constants,
+                                         escape=html.escape, escape_literals=True,
+                                         prefix=HTML_PREFIX, suffix=HTML_SUFFIX)
+
+        # Invariant MIME pieces, encoded once per run
+        boundary = f"=_interview_{uuid.uuid4().hex}"
+        self._encoded_subject = Header(subject, "utf-8").encode()
+        self._msgid_domain = socket.getfqdn()
+        self._mime_headers = (
+            "MIME-Version: 1.0" + CRLF +
+            f'Content-Type: multipart/alternative; boundary="{boundary}"' + CRLF
+        )
+        self._text_part_header = (
+            f"--{boundary}" + CRLF +
+            "Content-Type: text/plain; charset=utf-8" + CRLF +
+            "Content-Transfer-Encoding: quoted-printable" + CRLF + CRLF
+        )
+        self._html_part_header = (
+            CRLF + f"--{boundary}" + CRLF +
+            "Content-Type: text/html; charset=utf-8" + CRLF +
+            "Content-Transfer-Encoding: quoted-printable" + CRLF + CRLF
+        )
+        self._closing = CRLF + f"--{boundary}--" + CRLF
+        # multipart/mixed wrapper used when a message has attachments
+        mixed = f"=_attachments_{uuid.uuid4().hex}"
+        self._mixed_headers = (
+            "MIME-Version: 1.0" + CRLF +
+            f'Content-Type: multipart/mixed; boundary="{mixed}"' + CRLF
+        )
+        self._alternative_header = (
+            f"--{mixed}" + CRLF +
+            f'Content-Type: multipart/alternative; boundary="{boundary}"' + CRLF + CRLF
+        )
+        self._attachment_separator = f"--{mixed}{CRLF}".encode("ascii")
+        self._mixed_closing = f"--{mixed}--{CRLF}".encode("ascii")
+
+    @classmethod
+    def from_config(cls, config=None) -> "MessageBuilder":
+        """
+        Create a builder from the email_config module
+
+        Args:
+            config: Config module (imports email_config if omitted)
+
+        Returns:
+            MessageBuilder using the configured subject and templates
+        """
+        if config is None:
+            try:
+                import email_config as config
+            except ImportError:
+                return cls()
+
+        from excel_reader import column_key
+        column = getattr(config, "ATTACHMENT_COLUMN", None)
+        attachments = AttachmentSet(
+            getattr(config, "ATTACHMENTS", []),
+            field=column_key(column) if column else None,
+            directory=getattr(config, "ATTACHMENT_DIRECTORY", "attachments"),
+        )
+
+        return cls(
+            subject=getattr(config, "EMAIL_SUBJECT", DEFAULT_EMAIL_SUBJECT),
+            template=getattr(config, "EMAIL_TEMPLATE", None),
+            constants={
+                'company_name': getattr(config, "COMPANY_NAME", "Our Company"),
+                'hr_email': getattr(config, "HR_EMAIL", "hr@company.com"),
+                'hr_department': getattr(config, "HR_DEPARTMENT", "Recruitment Department"),
+            },
+            html_template=getattr(config, "EMAIL_HTML_TEMPLATE", None),
+            sender=getattr(config, "SMTP_SENDER", ""),
+            attachments=attachments,
+            invites=InviteBuilder.from_config(config),
+            send_html=getattr(config, "SEND_HTML", False),
+        )
+
+    @classmethod
+    def reminder_from_config(cls, config=None) -> "MessageBuilder":
+        """
+        Create a builder for reminder emails from the email_config module
+
+        Reminders carry neither attachments nor a calendar invite; the
+        candidate already has both from the notification.
+
+        Args:
+            config: Config module (imports email_config if omitted)
+
+        Returns:
+            MessageBuilder using REMINDER_SUBJECT and REMINDER_TEMPLATE
+        """
+        if config is None:
+            try:
+                import email_config as config
+            except ImportError:
+                return cls(DEFAULT_REMINDER_SUBJECT, DEFAULT_REMINDER_TEMPLATE)
+
+        return cls(
+            subject=getattr(config, "REMINDER_SUBJECT", DEFAULT_REMINDER_SUBJECT),
+            template=getattr(config, "REMINDER_TEMPLATE", DEFAULT_REMINDER_TEMPLATE),
+            constants={
+                'company_name': getattr(config, "COMPANY_NAME", "Our Company"),
+                'hr_email': getattr(config, "HR_EMAIL", "hr@company.com"),
+                'hr_department': getattr(config, "HR_DEPARTMENT", "Recruitment Department"),
+            },
+            sender=getattr(config, "SMTP_SENDER", ""),
+            send_html=getattr(config, "SEND_HTML", False),
+        )
+
+    @property
+    def fields(self) -> Set[str]:
+        """Per-candidate placeholders used by the text or HTML template, plus the attachment column"""
+        fields = self.text.fields | self.html.fields
+        if self.attachments.field:
+            fields = fields | {self.attachments.field}
+        if self.invites:
+            fields = fields | self.invites.fields
+        return fields
+
+    def sample_data(self, interview_data: Dict) -> Dict:
+        """
+        Fill every placeholder missing from a synthetic record with a dummy value
+
+        The attachment column is left empty so no file is looked up.
+
+        Args:
+            interview_data: Record with at least 'email', 'date', 'time' and 'description'
+
+        Returns:
+            New record covering every field in `fields`
+        """
+        data = {field: f"[{field}]" for field in self.fields if field != self.attachments.field}
+        data.update(interview_data)
+        return data
+
+    def render_text(self, interview_data: Dict) -> str:
+        """Render the plain-text body"""
+        return self.text.render(interview_data)
+
+    def render_html(self, interview_data: Dict) -> str:
+        """Render the HTML body (used for Outlook's HTMLBody)"""
+        return self.html.render(interview_data)
+
+    def plan_invite(self, interview_data: Dict) -> Optional[InviteRevision]:
+        """The calendar invite revision a message would send (see InviteBuilder.plan)"""
+        return self.invites.plan(interview_data) if self.invites else None
+
+    def record_sent(self, message: Dict):
+        """Commit what a sent message carried to the invite store (its 'invite_revision')"""
+        if self.invites:
+            self.invites.commit(message.get('invite_revision'))
+
+    def render_invites(self, interview_data: Dict,
+                       revision: Optional[InviteRevision] = None) -> List[Tuple[str, str]]:
+        """Render the .ics files as (file name, text): the invite plus any cancellations it brings"""
+        return self.invites.calendars(interview_data, revision) if self.invites else []
+
+    def build_mime(self, interview_data: Dict, revision: Optional[InviteRevision] = None) -> bytes:
+        """
+        Build a multipart/alternative message ready for SMTP (wrapped in
+        multipart/mixed when it carries attachments or a calendar invite)
+
+        Args:
+            interview_data: Dictionary containing email, date, time, and description
+            revision: Calendar invite revision from plan_invite()
+
+        Returns:
+            Complete RFC 5322 message as bytes
+        """
+        attachments = self.attachments.for_interview(interview_data) if self.attachments else []
+        if self.invites:
+            attachments.extend(self.invites.attachments(interview_data, revision))
+        headers = (
+            f"From: {self.sender}" + CRLF +
+            f"To: {interview_data['email']}" + CRLF +
+            f"Subject: {self._encoded_subject}" + CRLF +
+            f"Date: {formatdate(localtime=True)}" + CRLF +
+            f"Message-ID: {make_msgid(domain=self._msgid_domain)}" + CRLF +
+            (self._mixed_headers if attachments else self._mime_headers) + CRLF
+        )
+        body = (
+            headers +
+            (self._alternative_header if attachments else "") +
+            self._text_part_header + self.text.render_encoded(interview_data) +
+            self._html_part_header + self.html.render_encoded(interview_data) +
+            self._closing
+        ).encode("ascii")
+        if not attachments:
+            return body
+
+        # The encoded attachment parts are shared; only the join copies them
+        parts = [body]
+        for attachment in attachments:
+            parts.append(self._attachment_separator)
+            parts.append(attachment.headers)
+            parts.append(attachment.body)
+        parts.append(self._mixed_closing)
+        return b"".join(parts)
+
+
+def replace_sender(mime: bytes, sender: str) -> bytes:
+    """
+    Swap the From header of a message built by MessageBuilder.build_mime
+
+    Args:
+        mime: Message bytes (From is the first header)
+        sender: New From address
+
+    Returns:
+        Message bytes with the new From header
+    """
+    end = mime.index(CRLF.encode("ascii"))
+    return f"From: {sender}".encode("ascii") + mime[end:]
+
+
+def _naive_build(interview_data: Dict, builder: MessageBuilder) -> bytes:
+    """Reference implementation: construct and encode the full message every time"""
+    from email.message import EmailMessage
+    from email.policy import SMTP
+
+    msg = EmailMessage(policy=SMTP)
+    msg["From"] = builder.sender
+    msg["To"] = interview_data['email']
+    msg["Subject"] = builder.subject
+    msg["Date"] = formatdate(localtime=True)
+    msg["Message-ID"] = make_msgid()
+    msg.set_content(builder.render_text(interview_data), cte="quoted-printable")
+    msg.add_alternative(builder.render_html(interview_data), subtype="html", cte="quoted-printable")
+    return msg.as_bytes()
+
+
+if __name__ == "__main__":
+    # Benchmark: pre-encoded builder vs. naive per-message construction
+    builder = MessageBuilder.from_config()
+    # Extra template placeholders (e.g. {meeting_link}) get dummy values
+    rows = [
+        builder.sample_data({'email': f"candidate{i}@example.com", 'date': "2025-12-20", 'time': "10:00 AM",
+                             'description': f"Technical Interview - Round {i % 3 + 1}"})
+        for i in range(5000)
+    ]
+
+    start = time.perf_counter()
+    for row in rows:
+        _naive_build(row, builder)
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in rows:
+        builder.build_mime(row)
+    compiled = time.perf_counter() - start
+
+    print(f"Naive EmailMessage:  {naive * 1000:8.1f} ms  ({len(rows) / naive:8.0f} msg/s)")
+    print(f"MessageBuilder:      {compiled * 1000:8.1f} ms  ({len(rows) / compiled:8.0f} msg/s)")
+    print(f"Speed-up:            {naive / compiled:8.1f}x")
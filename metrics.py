@@ -0,0 +1,233 @@
+"""
+Metrics Module
+Runtime counters, gauges and histograms served in Prometheus text format
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Sequence
+try:
+    from email_config import METRICS_PORT
+except ImportError:
+    METRICS_PORT = None
+
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_value(value: float) -> str:
+    """
+    Sample value in exposition format, exact at any size
+
+    Whole numbers are written as integers (1234567, not 1.23457e+06) and
+    other values with repr, which round-trips.
+    """
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """Monotonically increasing value"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {format_value(self.value)}",
+        ]
+
+
+class Gauge:
+    """Value that can go up and down"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {format_value(self.value)}",
+        ]
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the with-block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum {format_value(total)}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all metrics of the process"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Render every metric in Prometheus text exposition format
+
+        Returns:
+            Metrics text
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+EMAILS_SENT = METRICS.counter("interview_emails_sent_total", "Emails sent successfully")
+EMAILS_FAILED = METRICS.counter("interview_emails_failed_total", "Emails that failed to send")
+EMAILS_SKIPPED = METRICS.counter("interview_emails_skipped_total", "Rows skipped because they were already sent")
+EMAILS_LATE = METRICS.counter("interview_emails_late_total", "Notifications skipped because the interview was too close")
+EMAILS_RETRIED = METRICS.counter("interview_emails_retried_total", "Send attempts retried after a transient failure")
+
+RENDER_SECONDS = METRICS.histogram("interview_email_render_seconds", "Time spent rendering a message")
+TRANSPORT_SECONDS = METRICS.histogram("interview_email_transport_seconds", "Time spent handing a message to the transport")
+WRITEBACK_SECONDS = METRICS.histogram("interview_status_writeback_seconds", "Time spent writing a status back to the workbook")
+
+QUEUE_DEPTH = METRICS.gauge("interview_send_queue_depth", "Messages waiting to be sent")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves METRICS at /metrics"""
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = METRICS.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep scrapes out of the console output
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """
+    Start the metrics HTTP endpoint in a background thread (once per process)
+
+    Args:
+        port: Port to listen on (defaults to METRICS_PORT; None disables the endpoint)
+        host: Interface to bind; local only by default
+
+    Returns:
+        Running server, or None if disabled or the port is unavailable
+    """
+    global _server
+    port = port if port is not None else METRICS_PORT
+    if port is None:
+        return None
+
+    with _server_lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            print(f"⚠ Warning: Metrics endpoint not started on {host}:{port}: {str(e)}")
+            return None
+
+        thread = threading.Thread(target=_server.serve_forever, name="MetricsServer", daemon=True)
+        thread.start()
+        print(f"✓ Metrics available at http://{host}:{_server.server_address[1]}/metrics")
+        return _server
@@ -0,0 +1,203 @@
+"""
+Outlook Worker Module
+Runs all Outlook COM calls on a single dedicated worker thread
+"""
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+from email_sender import OutlookEmailer
+from message_builder import MessageBuilder
+from metrics import QUEUE_DEPTH
+try:
+    import pythoncom
+except ImportError:
+    # pywin32 is Windows-only; fake COM objects need no apartment setup
+    pythoncom = None
+
+
+# Sentinel telling the worker thread to shut down
+_STOP = object()
+
+
+class QueuedOutlookEmailer(OutlookEmailer):
+    """
+    Outlook emailer that owns one STA worker thread
+
+    COM is initialized once on the worker thread, which also creates the
+    Outlook.Application object and performs every CreateItem/Send call.
+    Callers render messages on their own thread and submit them to a queue;
+    each submission returns a Future that resolves to True/False once
+    Outlook has processed it.
+    """
+
+    def __init__(self, application_factory: Optional[Callable] = None, max_pending: int = 0,
+                 builder: Optional[MessageBuilder] = None):
+        """
+        Initialize queued emailer
+
+        Args:
+            application_factory: Optional callable returning an Outlook.Application
+                                 object (used to inject a fake COM object)
+            max_pending: Maximum number of queued messages (0 = unbounded);
+                         submit() blocks while the queue is full
+            builder: Message builder (defaults to one built from email_config)
+        """
+        super().__init__(application_factory, builder)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._ready = threading.Event()
+        self._connected = False
+
+    def connect(self) -> bool:
+        """
+        Start the worker thread and connect to Outlook from it
+
+        Returns:
+            True if connected successfully, False otherwise
+        """
+        if self._thread is not None:
+            return self._connected
+
+        self._thread = threading.Thread(target=self._run, name="OutlookCOMWorker", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self._connected
+
+    def submit(self, interview_data: Dict) -> Future:
+        """
+        Render an interview notification and queue it for sending
+
+        Args:
+            interview_data: Dictionary containing email, date, time, and description
+
+        Returns:
+            Future resolving to True if the email was sent, False otherwise
+        """
+        return self.submit_message(self.render_message(interview_data))
+
+    def submit_message(self, message: Dict) -> Future:
+        """
+        Queue an already rendered message for sending
+
+        Args:
+            message: Rendered message from render_message()
+
+        Returns:
+            Future resolving to True if the email was sent, False otherwise
+        """
+        future = Future()
+        if not self._connected:
+            print("✗ Outlook not connected!")
+            future.set_result(False)
+            return future
+
+        # Count before enqueuing: the worker may take the item (and
+        # decrement) before put() returns
+        QUEUE_DEPTH.inc()
+        self._queue.put((future, message))
+        return future
+
+    def send_interview_notification(self, interview_data: Dict) -> bool:
+        """
+        Send interview notification email and wait for the result
+
+        Args:
+            interview_data: Dictionary containing email, date, time, and description
+
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        return self.submit(interview_data).result()
+
+    def send_message(self, message: Dict) -> bool:
+        """
+        Send an already rendered message and wait for the result
+
+        Args:
+            message: Rendered message from render_message()
+
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        return self.submit_message(message).result()
+
+    def deliver(self, message: Dict):
+        """
+        Send an already rendered message on the worker thread, raising on failure
+
+        Args:
+            message: Rendered message from render_message()
+
+        Raises:
+            The delivery error (see send_retry.is_transient / is_permanent)
+        """
+        self.call(lambda outlook: OutlookEmailer.deliver(self, message))
+
+    def call(self, func: Callable):
+        """
+        Run a function against the Outlook application object on the worker
+        thread (COM objects can't cross threads) and wait for it
+
+        Args:
+            func: Called with the Outlook.Application object
+
+        Returns:
+            Whatever func returns (exceptions are re-raised here)
+        """
+        if not self._connected:
+            raise RuntimeError("Outlook not connected")
+        future = Future()
+        QUEUE_DEPTH.inc()
+        self._queue.put((future, func))
+        return future.result()
+
+    @property
+    def pending(self) -> int:
+        """Number of messages waiting for the worker thread"""
+        return self._queue.qsize()
+
+    def close(self):
+        """Drain the queue, stop the worker thread and remove scratch files"""
+        if self._thread is not None:
+            if self._connected:
+                self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+            self._connected = False
+        OutlookEmailer.close(self)
+
+    def _run(self):
+        """Worker thread body: initialize COM once, then drain the queue"""
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+        try:
+            self._connected = OutlookEmailer.connect(self)
+            self._ready.set()
+            if not self._connected:
+                return
+
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+
+                QUEUE_DEPTH.dec()
+                future, message = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                if callable(message):
+                    try:
+                        future.set_result(message(self.outlook))
+                    except Exception as e:
+                        future.set_exception(e)
+                    continue
+
+                future.set_result(OutlookEmailer.send_message(self, message))
+        finally:
+            # COM objects must be released on the thread that created them
+            self.outlook = None
+            self._ready.set()
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
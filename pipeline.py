@@ -0,0 +1,255 @@
+"""
+Pipeline Module
+Streams interviews through read -> render -> send -> write-back stages
+connected by bounded queues
+"""
+import queue
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from address_validator import AddressValidator, normalize_address
+from metrics import EMAILS_SENT, EMAILS_FAILED, WRITEBACK_SECONDS
+try:
+    from email_config import (PIPELINE_QUEUE_SIZE, PIPELINE_RENDER_WORKERS,
+                              PIPELINE_SEND_WORKERS, PIPELINE_SAVE_EVERY)
+except ImportError:
+    PIPELINE_QUEUE_SIZE = 100
+    PIPELINE_RENDER_WORKERS = 1
+    PIPELINE_SEND_WORKERS = 1
+    PIPELINE_SAVE_EVERY = 1
+
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class Stage:
+    """One pipeline step: a function applied to every item by N worker threads"""
+
+    def __init__(self, name: str, func: Callable, workers: int = 1):
+        """
+        Initialize stage
+
+        Args:
+            name: Stage name (used for thread names)
+            func: Called with each item; returns the item for the next stage,
+                  or None to drop it
+            workers: Number of worker threads
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+
+
+class Pipeline:
+    """
+    Runs stages concurrently, each fed by a bounded queue
+
+    When a stage falls behind, its input queue fills up and the upstream
+    stage blocks on put(), so at most queue_size items wait between any
+    two stages no matter how large the input is.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = PIPELINE_QUEUE_SIZE):
+        """
+        Initialize pipeline
+
+        Args:
+            stages: Stages in processing order
+            queue_size: Capacity of each inter-stage queue
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.errors: List[Tuple[str, Exception]] = []
+        self._errors_lock = threading.Lock()
+
+    def run(self, source: Iterable):
+        """
+        Feed every item of source through the stages and wait for completion
+
+        Args:
+            source: Iterable of input items (read lazily)
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            output = queues[index + 1] if index + 1 < len(self.stages) else None
+            downstream_workers = self.stages[index + 1].workers if output is not None else 0
+            remaining = [stage.workers]
+            remaining_lock = threading.Lock()
+
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[index], output, downstream_workers, remaining, remaining_lock),
+                    name=f"Pipeline-{stage.name}-{n + 1}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        # The calling thread is the reader stage
+        first = queues[0]
+        try:
+            for item in source:
+                first.put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                first.put(_DONE)
+
+        for thread in threads:
+            thread.join()
+
+    def _work(self, stage: Stage, inbox: queue.Queue, outbox: Optional[queue.Queue],
+              downstream_workers: int, remaining: List[int], remaining_lock: threading.Lock):
+        """Worker loop for one stage thread"""
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                with self._errors_lock:
+                    self.errors.append((stage.name, e))
+                print(f"✗ Error in {stage.name} stage: {str(e)}")
+                continue
+            if result is not None and outbox is not None:
+                outbox.put(result)
+
+        # The last worker of a stage tells the next stage its input has ended
+        with remaining_lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and outbox is not None:
+            for _ in range(downstream_workers):
+                outbox.put(_DONE)
+
+
+def run_send_pipeline(interviews: Iterable[Dict], excel_reader, emailer, logger,
+                      validator: Optional[AddressValidator] = None,
+                      render_workers: int = PIPELINE_RENDER_WORKERS,
+                      send_workers: int = PIPELINE_SEND_WORKERS,
+                      save_every: int = PIPELINE_SAVE_EVERY,
+                      queue_size: int = PIPELINE_QUEUE_SIZE,
+                      journal: Optional[List[Tuple[int, str, datetime]]] = None) -> Dict:
+    """
+    Send notifications for a stream of interviews
+
+    Stages: render (validates the address, then renders the message),
+    send, and write-back. Write-back always runs on a single thread because
+    openpyxl workbooks are not thread-safe.
+
+    Args:
+        interviews: Iterable of pending interviews (e.g. ExcelReader.iter_pending_interviews())
+        excel_reader: Loaded Excel reader used for status write-back
+        emailer: Connected emailer providing render_message() and send_message()
+        logger: Email logger
+        validator: Address validator (defaults to one built from email_config)
+        render_workers: Threads rendering messages
+        send_workers: Threads handing messages to the transport
+        save_every: Save the workbook after this many status updates (rows count
+                    as sent only once the save succeeds)
+        queue_size: Capacity of each inter-stage queue
+        journal: If given, (row number, email, send start time) is appended for
+                 every sent email (see delivery_reconciler)
+
+    Returns:
+        Dictionary with 'sent' and 'failed' counts, the 'invalid' entries and
+        the 'internal' recipients (see INTERNAL_DOMAINS)
+    """
+    validator = validator or AddressValidator()
+    results = {'sent': 0, 'failed': 0, 'invalid': [], 'internal': []}
+    invalid_lock = threading.Lock()
+    # Interviews marked as sent in the workbook but not saved yet
+    unsaved: List[Dict] = []
+
+    def fail(interview, error):
+        logger.log_email_failed(interview['email'], error)
+        EMAILS_FAILED.inc()
+        results['failed'] += 1
+
+    def persist():
+        # Rows only count as sent once the workbook holding their status is saved
+        with WRITEBACK_SECONDS.time():
+            saved = excel_reader.save()
+        for interview in unsaved:
+            if saved:
+                logger.log_email_sent(interview['email'])
+                EMAILS_SENT.inc()
+                results['sent'] += 1
+            else:
+                fail(interview, "Failed to update Excel")
+        unsaved.clear()
+
+    def render(interview):
+        address = normalize_address(interview['email'])
+        error = validator.check(address)
+        if error:
+            with invalid_lock:
+                results['invalid'].append({'email': str(interview['email']), 'error': error,
+                                           'row_num': interview.get('row_num')})
+            return None
+        interview['email'] = address
+        if validator.is_internal(address):
+            with invalid_lock:
+                results['internal'].append({'email': address, 'row_num': interview.get('row_num')})
+        try:
+            return interview, emailer.render_message(interview)
+        except Exception as e:
+            # e.g. a missing attachment file: count the row as failed, don't drop it
+            print(f"✗ Error preparing email to {address}: {str(e)}")
+            return interview, None
+
+    def send(item):
+        interview, message = item
+        started = datetime.now()
+        if message is None:
+            return interview, False, started
+        try:
+            return interview, emailer.send_message(message), started
+        except Exception as e:
+            # Emailers report failures as False; anything raised still counts against the row
+            print(f"✗ Error sending email to {interview['email']}: {str(e)}")
+            return interview, False, started
+
+    def write_back(item):
+        interview, sent, started = item
+        if not sent:
+            fail(interview, "Failed to send email")
+            return None
+
+        if journal is not None:
+            journal.append((interview['row_num'], interview['email'], started))
+        try:
+            with WRITEBACK_SECONDS.time():
+                marked = excel_reader.mark_as_sent(interview['row_num'], save=False)
+            if not marked:
+                fail(interview, "Failed to update Excel")
+                return None
+            unsaved.append(interview)
+            if len(unsaved) >= save_every:
+                persist()
+        except Exception as e:
+            print(f"✗ Error updating Excel for {interview['email']}: {str(e)}")
+            fail(interview, "Failed to update Excel")
+        return None
+
+    pipeline = Pipeline([
+        Stage("render", render, render_workers),
+        Stage("send", send, send_workers),
+        Stage("write-back", write_back, 1),
+    ], queue_size)
+    pipeline.run(interviews)
+
+    if unsaved:
+        persist()
+
+    if results['invalid']:
+        logger.log_invalid_addresses(results['invalid'])
+        EMAILS_FAILED.inc(len(results['invalid']))
+        results['failed'] += len(results['invalid'])
+    logger.log_internal_recipients(results['internal'])
+
+    return results
@@ -0,0 +1,403 @@
+"""
+Reminder Scheduler Module
+Sends reminder emails at fixed offsets before each interview
+"""
+import json
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from interview_dates import interview_datetime
+try:
+    from email_config import (REMINDER_OFFSETS_HOURS, REMINDER_POLL_SECONDS, REMINDER_MAX_ATTEMPTS,
+                              REMINDER_RETRY_SECONDS)
+except ImportError:
+    REMINDER_OFFSETS_HOURS = [24, 1]
+    REMINDER_POLL_SECONDS = 30
+    REMINDER_MAX_ATTEMPTS = 5
+    REMINDER_RETRY_SECONDS = 60
+
+
+class ReminderStore:
+    """Persistent store of pending reminders, indexed by due time"""
+
+    def __init__(self, db_path: str = "reminders.db"):
+        """
+        Initialize reminder store
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS reminders (
+                id INTEGER PRIMARY KEY,
+                due_at REAL NOT NULL,
+                offset_hours REAL NOT NULL,
+                email TEXT NOT NULL,
+                date TEXT NOT NULL,
+                time TEXT NOT NULL,
+                description TEXT NOT NULL,
+                extra TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (email, date, time, offset_hours)
+            );
+            CREATE INDEX IF NOT EXISTS idx_reminders_pending_due
+                ON reminders (due_at) WHERE status = 'pending';
+        """)
+        # Databases created before extra placeholder columns and retries were supported
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(reminders)")}
+        if 'extra' not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE reminders ADD COLUMN extra TEXT NOT NULL DEFAULT '{}'")
+        if 'attempts' not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE reminders ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    def add_many(self, reminders: Iterable[Dict]) -> int:
+        """
+        Add reminders, ignoring ones that are already scheduled (cancelled
+        ones for the same slot are scheduled again)
+
+        Args:
+            reminders: Dictionaries with due_at, offset_hours, email, date, time, description, extra
+
+        Returns:
+            Number of new reminders stored
+        """
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT INTO reminders (due_at, offset_hours, email, date, time, description, extra) "
+                "VALUES (:due_at, :offset_hours, :email, :date, :time, :description, :extra) "
+                "ON CONFLICT (email, date, time, offset_hours) DO UPDATE SET "
+                "status = 'pending', due_at = excluded.due_at, description = excluded.description, "
+                "extra = excluded.extra, attempts = 0 WHERE status = 'cancelled'",
+                reminders
+            )
+            return self._conn.total_changes - before
+
+    def cancel(self, email: str, date: Optional[str] = None, time: Optional[str] = None) -> int:
+        """
+        Cancel the pending reminders of a candidate (e.g. interview called off)
+
+        Args:
+            email: Candidate email address
+            date: Only the interview on this date (formatted as in the sheet)
+            time: Only the interview at this time
+
+        Returns:
+            Number of reminders cancelled
+        """
+        query = "UPDATE reminders SET status = 'cancelled' WHERE status = 'pending' AND lower(email) = lower(?)"
+        params = [email]
+        if date is not None:
+            query += " AND date = ?"
+            params.append(date)
+        if time is not None:
+            query += " AND time = ?"
+            params.append(time)
+        with self._lock, self._conn:
+            return self._conn.execute(query, params).rowcount
+
+    def cancel_other_slots(self, email: str, slots: Iterable) -> int:
+        """
+        Cancel a candidate's pending reminders for any interview slot not
+        in `slots` (the interview was moved or dropped)
+
+        Args:
+            email: Candidate email address
+            slots: (date, time) pairs the candidate is still booked for
+
+        Returns:
+            Number of reminders cancelled
+        """
+        keep = set(slots)
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, date, time FROM reminders WHERE status = 'pending' AND lower(email) = lower(?)",
+                (email,)
+            ).fetchall()
+            stale = [(row[0],) for row in rows if (row[1], row[2]) not in keep]
+            self._conn.executemany("UPDATE reminders SET status = 'cancelled' WHERE id = ?", stale)
+        return len(stale)
+
+    def next_due_at(self) -> Optional[float]:
+        """
+        Get the due time of the earliest pending reminder
+
+        Returns:
+            Unix timestamp, or None if nothing is pending
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(due_at) FROM reminders WHERE status = 'pending'"
+            ).fetchone()
+        return row[0]
+
+    def get_due(self, now: float, limit: int = 100) -> List[Dict]:
+        """
+        Get pending reminders that are due
+
+        Args:
+            now: Current Unix timestamp
+            limit: Maximum number of reminders to return
+
+        Returns:
+            List of reminder dictionaries ordered by due time
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, due_at, offset_hours, email, date, time, description, extra FROM reminders "
+                "WHERE status = 'pending' AND due_at <= ? ORDER BY due_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+        keys = ('id', 'due_at', 'offset_hours', 'email', 'date', 'time', 'description')
+        reminders = []
+        for row in rows:
+            # Extra placeholder values (e.g. interviewer) are stored as JSON
+            reminder = json.loads(row[-1])
+            reminder.update(zip(keys, row))
+            reminders.append(reminder)
+        return reminders
+
+    def mark(self, reminder_id: int, status: str):
+        """
+        Update the status of a reminder
+
+        Args:
+            reminder_id: Reminder ID
+            status: New status ("sent" or "failed")
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE reminders SET status = ? WHERE id = ?", (status, reminder_id))
+
+    def retry_later(self, reminder_id: int, now: float, max_attempts: int = REMINDER_MAX_ATTEMPTS,
+                    backoff: float = REMINDER_RETRY_SECONDS) -> bool:
+        """
+        Record a failed send: keep the reminder pending with a later due
+        time, or mark it failed once it has used up its attempts
+
+        Args:
+            reminder_id: Reminder ID
+            now: Current Unix timestamp
+            max_attempts: Sends tried before the reminder is marked failed
+            backoff: Seconds before the first retry (doubles on every retry)
+
+        Returns:
+            True if the reminder will be tried again
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT attempts FROM reminders WHERE id = ?", (reminder_id,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            if attempts >= max_attempts:
+                self._conn.execute("UPDATE reminders SET status = 'failed', attempts = ? WHERE id = ?",
+                                   (attempts, reminder_id))
+                return False
+            self._conn.execute("UPDATE reminders SET due_at = ?, attempts = ? WHERE id = ?",
+                               (now + backoff * 2 ** (attempts - 1), attempts, reminder_id))
+            return True
+
+    def count_pending(self) -> int:
+        """Number of reminders still waiting to be sent"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM reminders WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+
+
+class ReminderScheduler:
+    """Dispatches stored reminders when they become due"""
+
+    def __init__(self, store: ReminderStore, emailer, logger=None, batch_size: int = 100,
+                 max_attempts: int = REMINDER_MAX_ATTEMPTS, retry_seconds: float = REMINDER_RETRY_SECONDS):
+        """
+        Initialize scheduler
+
+        Args:
+            store: Reminder store
+            emailer: Connected emailer with send_interview_notification(),
+                     built with a reminder MessageBuilder (see main)
+            logger: Optional EmailLogger
+            batch_size: Maximum number of due reminders fetched at once
+            max_attempts: Sends tried before a reminder is marked failed
+            retry_seconds: Wait before the first retry of a failed send (doubles on every retry)
+        """
+        self.store = store
+        self.emailer = emailer
+        self.logger = logger
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def schedule_interviews(self, interviews: List[Dict], offsets_hours: Optional[List[float]] = None,
+                            replace: bool = False) -> int:
+        """
+        Schedule reminders for a list of interviews
+
+        Args:
+            interviews: Interview dictionaries from ExcelReader
+            offsets_hours: Hours before each interview to send a reminder
+            replace: Treat the list as the current schedule of its candidates:
+                     their pending reminders for other slots (rescheduled or
+                     cancelled interviews) are cancelled
+
+        Returns:
+            Number of new reminders scheduled
+        """
+        offsets_hours = offsets_hours if offsets_hours is not None else REMINDER_OFFSETS_HOURS
+        now = datetime.now()
+        reminders = []
+
+        if replace:
+            slots: Dict[str, set] = {}
+            for interview in interviews:
+                slots.setdefault(interview['email'].lower(), set()).add((interview['date'], interview['time']))
+            cancelled = sum(self.store.cancel_other_slots(email, booked) for email, booked in slots.items())
+            if cancelled:
+                print(f"✓ Cancelled {cancelled} reminder(s) of rescheduled interviews")
+
+        for interview in interviews:
+            starts_at = interview_datetime(interview['date'], interview['time'])
+            if starts_at is None:
+                print(f"⚠ Warning: Can't parse date/time for {interview['email']}, no reminders scheduled")
+                continue
+            extra = json.dumps(getattr(interview, 'extra', None) or {}, default=str)
+
+            for offset in offsets_hours:
+                due = starts_at - timedelta(hours=offset)
+                if due <= now:
+                    continue
+                reminders.append({
+                    'due_at': due.timestamp(),
+                    'offset_hours': float(offset),
+                    'email': interview['email'],
+                    'date': interview['date'],
+                    'time': interview['time'],
+                    'description': interview['description'],
+                    'extra': extra
+                })
+
+        added = self.store.add_many(reminders)
+        # Wake the dispatcher in case a new reminder is due before the one it is sleeping on
+        self._wake.set()
+        return added
+
+    def run_forever(self, poll_seconds: float = REMINDER_POLL_SECONDS):
+        """
+        Send reminders as they fall due until stop() is called
+
+        Args:
+            poll_seconds: Longest sleep between store checks; reminders
+                          scheduled by another process (the schedule
+                          command) are picked up within this time
+        """
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.run_due()
+
+            next_due = self.store.next_due_at()
+            timeout = poll_seconds if next_due is None else min(poll_seconds, max(0.0, next_due - time.time()))
+            # Sleep until the next reminder is due, the next check, or a wake-up
+            self._wake.wait(timeout)
+
+    def run_due(self) -> int:
+        """
+        Send every reminder that is currently due
+
+        Returns:
+            Number of reminders processed
+        """
+        processed = 0
+        while True:
+            batch = self.store.get_due(time.time(), self.batch_size)
+            if not batch:
+                return processed
+
+            for reminder in batch:
+                if self.emailer.send_interview_notification(reminder):
+                    self.store.mark(reminder['id'], "sent")
+                    if self.logger:
+                        self.logger.log_email_sent(reminder['email'], f"Reminder sent ({reminder['offset_hours']:g}h)")
+                elif self.store.retry_later(reminder['id'], time.time(), self.max_attempts, self.retry_seconds):
+                    print(f"⚠ Reminder to {reminder['email']} failed, will retry")
+                else:
+                    if self.logger:
+                        self.logger.log_email_failed(reminder['email'], "Failed to send reminder")
+                processed += 1
+
+    def stop(self):
+        """Stop run_forever()"""
+        self._stop.set()
+        self._wake.set()
+
+
+def main():
+    """Command line entry point: schedule reminders or run the dispatcher"""
+    usage = ("Usage: python reminder_scheduler.py schedule [excel_file] [--replace] | "
+             "cancel EMAIL [DATE [TIME]] | run")
+    args = [arg for arg in sys.argv[1:] if arg != "--replace"]
+    if not args or args[0] not in ("schedule", "cancel", "run") or (args[0] == "cancel" and len(args) < 2):
+        print(usage)
+        sys.exit(1)
+
+    store = ReminderStore()
+
+    if args[0] == "cancel":
+        cancelled = store.cancel(*args[1:4])
+        print(f"✓ Cancelled {cancelled} pending reminder(s) for {args[1]}")
+        store.close()
+        return
+
+    if args[0] == "schedule":
+        from excel_reader import ExcelReader
+        from message_builder import MessageBuilder
+        excel_reader = ExcelReader(args[1] if len(args) > 1 else "interviews.xlsx",
+                                   fields=MessageBuilder.reminder_from_config().fields)
+        if not excel_reader.load_file():
+            sys.exit(1)
+        interviews = excel_reader.get_all_interviews()
+        excel_reader.close()
+
+        added = ReminderScheduler(store, emailer=None).schedule_interviews(
+            interviews, replace="--replace" in sys.argv)
+        print(f"✓ Scheduled {added} new reminder(s), {store.count_pending()} pending in total")
+        store.close()
+        return
+
+    from logger import EmailLogger
+    from message_builder import MessageBuilder
+    from transports import create_emailer
+
+    emailer = create_emailer()
+    # Reminders use their own subject and template, not the notification's
+    emailer.builder = MessageBuilder.reminder_from_config()
+    if not emailer.connect():
+        emailer.close()
+        sys.exit(1)
+
+    logger = EmailLogger()
+    scheduler = ReminderScheduler(store, emailer, logger)
+    print(f"✓ Reminder scheduler running with {store.count_pending()} pending reminder(s)")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print("\n✓ Reminder scheduler stopped.")
+    finally:
+        emailer.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
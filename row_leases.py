@@ -0,0 +1,401 @@
+"""
+Row Leases Module
+Lets several runner processes (on one host or on hosts sharing a
+filesystem) drain the same workbook without sending a row twice
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from excel_reader import ExcelReader
+from pipeline import run_send_pipeline
+try:
+    from email_config import LEASE_SECONDS, LEASE_BATCH_SIZE
+except ImportError:
+    LEASE_SECONDS = 120
+    LEASE_BATCH_SIZE = 50
+
+
+# Pseudo row used as the workbook write lock
+_WRITER_ROW = 0
+
+
+class LeaseStore:
+    """
+    SQLite table of row leases for one workbook
+
+    A row moves leased -> sent -> written. Leases expire unless renewed, so
+    rows held by a crashed runner are picked up again by the others; rows
+    that reached 'sent' are never handed out again. Each lease also stores
+    the row's identity (email, date, time), so a replaced workbook with the
+    same name does not inherit the old file's statuses.
+
+    The database uses the default rollback journal rather than WAL so that
+    it also works when runners on different hosts share it over a network
+    filesystem.
+    """
+
+    def __init__(self, db_path: str, workbook: str, worker: Optional[str] = None,
+                 lease_seconds: float = LEASE_SECONDS):
+        """
+        Initialize lease store
+
+        Args:
+            db_path: Path to the shared SQLite database
+            workbook: Key identifying the workbook (e.g. its file name)
+            worker: Unique runner id (defaults to host:pid)
+            lease_seconds: How long a lease lasts without renewal
+        """
+        self.db_path = db_path
+        self.workbook = workbook
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS leases (
+                workbook TEXT NOT NULL,
+                row_num INTEGER NOT NULL,
+                identity TEXT NOT NULL,
+                worker TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                status TEXT NOT NULL DEFAULT 'leased',
+                PRIMARY KEY (workbook, row_num)
+            ) WITHOUT ROWID;
+        """)
+
+    def _transaction(self, statements):
+        """Run statements in one write transaction (BEGIN IMMEDIATE serializes runners)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def claim(self, rows: Iterable[Tuple[int, str]]) -> Set[int]:
+        """
+        Lease whichever of the given rows are free or whose lease expired
+
+        Args:
+            rows: Candidate (row number, row identity) pairs
+
+        Returns:
+            Row numbers now leased to this worker
+        """
+        rows = list(rows)
+        if not rows:
+            return set()
+        row_nums = [row for row, _ in rows]
+
+        def claim_rows(conn):
+            now = time.time()
+            conn.executemany(
+                "INSERT INTO leases (workbook, row_num, identity, worker, expires_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (workbook, row_num) DO UPDATE SET identity = excluded.identity, "
+                "worker = excluded.worker, expires_at = excluded.expires_at, status = 'leased' "
+                "WHERE leases.identity != excluded.identity OR (leases.status = 'leased' "
+                "AND (leases.expires_at < ? OR leases.worker = excluded.worker))",
+                [(self.workbook, row, identity, self.worker, now + self.lease_seconds, now)
+                 for row, identity in rows]
+            )
+            placeholders = ",".join("?" * len(row_nums))
+            found = conn.execute(
+                f"SELECT row_num FROM leases WHERE workbook = ? AND worker = ? AND status = 'leased' "
+                f"AND row_num IN ({placeholders})",
+                [self.workbook, self.worker] + row_nums
+            ).fetchall()
+            return {r[0] for r in found}
+
+        return self._transaction(claim_rows)
+
+    def complete(self, row_num: int) -> bool:
+        """
+        Record that a leased row was sent
+
+        Args:
+            row_num: Row number
+
+        Returns:
+            False if this worker no longer held the lease
+        """
+        def mark(conn):
+            cursor = conn.execute(
+                "UPDATE leases SET status = 'sent' WHERE workbook = ? AND row_num = ? AND worker = ? "
+                "AND status = 'leased'",
+                (self.workbook, row_num, self.worker)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(mark)
+
+    def renew(self) -> int:
+        """
+        Extend every lease this worker holds
+
+        Returns:
+            Number of leases renewed
+        """
+        def extend(conn):
+            return conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE workbook = ? AND worker = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, self.workbook, self.worker)
+            ).rowcount
+
+        return self._transaction(extend)
+
+    def release(self) -> int:
+        """
+        Give up this worker's unfinished leases (e.g. rows that failed to send)
+
+        Returns:
+            Number of leases released
+        """
+        def drop(conn):
+            return conn.execute(
+                "DELETE FROM leases WHERE workbook = ? AND worker = ? AND status = 'leased' AND row_num != ?",
+                (self.workbook, self.worker, _WRITER_ROW)
+            ).rowcount
+
+        return self._transaction(drop)
+
+    def expired_rows(self) -> Set[int]:
+        """Rows whose lease expired without being sent (their runner probably crashed)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row_num FROM leases WHERE workbook = ? AND status = 'leased' "
+                "AND expires_at < ? AND row_num != ?",
+                (self.workbook, time.time(), _WRITER_ROW)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def sent_rows(self) -> List[int]:
+        """Rows sent by any worker but not yet written to the workbook"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row_num FROM leases WHERE workbook = ? AND status = 'sent' ORDER BY row_num",
+                (self.workbook,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def mark_written(self, row_nums: List[int]):
+        """Record that rows were saved to the workbook as "Sent\""""
+        def mark(conn):
+            conn.executemany(
+                "UPDATE leases SET status = 'written' WHERE workbook = ? AND row_num = ? AND status = 'sent'",
+                [(self.workbook, row) for row in row_nums]
+            )
+
+        self._transaction(mark)
+
+    def acquire_writer(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take the workbook write lock (a lease on a pseudo row)
+
+        Args:
+            timeout: Seconds to wait (None = wait for as long as it takes)
+
+        Returns:
+            True if the lock was acquired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.claim([(_WRITER_ROW, "")]):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.5)
+        return True
+
+    def release_writer(self):
+        """Release the workbook write lock"""
+        self._transaction(lambda conn: conn.execute(
+            "DELETE FROM leases WHERE workbook = ? AND row_num = ? AND worker = ?",
+            (self.workbook, _WRITER_ROW, self.worker)
+        ))
+
+    def start_heartbeat(self):
+        """Renew leases in the background every third of the lease duration"""
+        if self._heartbeat:
+            return
+        self._stop.clear()
+
+        def beat():
+            while not self._stop.wait(self.lease_seconds / 3):
+                try:
+                    self.renew()
+                except sqlite3.Error as e:
+                    print(f"⚠ Warning: Could not renew row leases: {str(e)}")
+
+        self._heartbeat = threading.Thread(target=beat, name="LeaseHeartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def stop_heartbeat(self):
+        """Stop renewing leases"""
+        if self._heartbeat:
+            self._stop.set()
+            self._heartbeat.join()
+            self._heartbeat = None
+
+    def close(self):
+        """Stop the heartbeat and close the database"""
+        self.stop_heartbeat()
+        self._conn.close()
+
+
+class LeasedEmailer:
+    """
+    Wraps an emailer so a row is recorded as sent in the lease store as
+    soon as the transport accepts its message, in the send stage itself.
+
+    A runner that crashes can therefore only leave behind the messages it
+    was sending at that moment (at most one per send worker) as rows that
+    get sent again, not everything queued for write-back.
+    """
+
+    def __init__(self, emailer, store: LeaseStore):
+        self.emailer = emailer
+        self.store = store
+
+    def render_message(self, interview_data: Dict) -> Dict:
+        message = self.emailer.render_message(interview_data)
+        message['row_num'] = interview_data['row_num']
+        return message
+
+    def send_message(self, message: Dict) -> bool:
+        if not self.emailer.send_message(message):
+            return False
+        if not self.store.complete(message['row_num']):
+            print(f"⚠ Warning: Lease on row {message['row_num']} expired before it was recorded as sent")
+        return True
+
+
+class LeasedWriteBack:
+    """
+    Stands in for ExcelReader in the send pipeline; the workbook is written
+    once at the end by write_sent_rows()
+    """
+
+    def mark_as_sent(self, row_num: int, save: bool = True) -> bool:
+        return True
+
+    def save(self) -> bool:
+        return True
+
+
+def iter_leased(interviews: Iterable[Dict], store: LeaseStore,
+                batch_size: int = LEASE_BATCH_SIZE) -> Iterator[Dict]:
+    """
+    Yield only the interviews this worker managed to lease
+
+    Rows are claimed in batches, so runners that read the sheet in the same
+    order quickly skip past each other's batches.
+
+    Args:
+        interviews: Pending interviews
+        store: Lease store
+        batch_size: Rows claimed per transaction
+
+    Yields:
+        Interviews leased to this worker
+    """
+    batch = []
+    for interview in interviews:
+        batch.append(interview)
+        if len(batch) >= batch_size:
+            yield from _claim_batch(batch, store)
+            batch = []
+    if batch:
+        yield from _claim_batch(batch, store)
+
+
+def _claim_batch(batch: List[Dict], store: LeaseStore) -> List[Dict]:
+    claimed = store.claim((i['row_num'], row_identity(i)) for i in batch)
+    return [i for i in batch if i['row_num'] in claimed]
+
+
+def row_identity(interview: Dict) -> str:
+    """Key that tells apart different interviews stored in the same row"""
+    return f"{interview['email'].lower()}|{interview['date']}|{interview['time']}"
+
+
+def write_sent_rows(file_path: str, store: LeaseStore) -> int:
+    """
+    Mark every row sent by any worker as "Sent" in the workbook
+
+    Runs under the workbook write lock and reloads the file first, so saves
+    from different runners never overwrite each other.
+
+    Args:
+        file_path: Workbook path
+        store: Lease store
+
+    Returns:
+        Number of rows written
+    """
+    store.acquire_writer()
+    try:
+        rows = store.sent_rows()
+        if not rows:
+            return 0
+        excel_reader = ExcelReader(file_path)
+        if not excel_reader.load_file():
+            return 0
+        try:
+            for row_num in rows:
+                excel_reader.mark_as_sent(row_num, save=False)
+            if not excel_reader.save():
+                return 0
+        finally:
+            excel_reader.close()
+        store.mark_written(rows)
+        return len(rows)
+    finally:
+        store.release_writer()
+
+
+def run_leased_send(excel_reader: ExcelReader, emailer, logger, store: LeaseStore,
+                    order: Callable[[Iterable[Dict]], Iterable[Dict]] = iter, **pipeline_options) -> Dict:
+    """
+    Send this worker's share of a workbook's pending interviews
+
+    After the first pass, rows whose leases expired (crashed runners) are
+    claimed and sent too. Finally every sent row is written to the workbook.
+
+    Args:
+        excel_reader: Loaded Excel reader
+        emailer: Connected emailer
+        logger: Email logger
+        store: Lease store for this workbook
+        order: Puts the pending interviews in send order (e.g. PrioritySendQueue);
+               runners that share the same order claim the same rows first
+        **pipeline_options: Passed to run_send_pipeline
+
+    Returns:
+        Dictionary with 'sent' and 'failed' counts, the 'invalid' entries and
+        the 'internal' recipients
+    """
+    def source():
+        yield from iter_leased(order(excel_reader.iter_pending_interviews(count_skipped=True)), store)
+        expired = store.expired_rows()
+        if expired:
+            print(f"⚠ Reclaiming {len(expired)} row(s) from expired leases")
+            yield from iter_leased(order(i for i in excel_reader.iter_pending_interviews()
+                                         if i['row_num'] in expired), store)
+
+    store.start_heartbeat()
+    try:
+        results = run_send_pipeline(source(), LeasedWriteBack(), LeasedEmailer(emailer, store), logger,
+                                    **pipeline_options)
+    finally:
+        store.stop_heartbeat()
+        store.release()
+
+    written = write_sent_rows(excel_reader.file_path, store)
+    print(f"✓ Wrote {written} sent row(s) to {excel_reader.file_path}")
+    return results
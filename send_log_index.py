@@ -0,0 +1,331 @@
+"""
+Send Log Index Module
+Indexes the email logs by recipient and date for fast
+"was this candidate notified?" lookups
+"""
+import glob
+import gzip
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from address_validator import normalize_address
+try:
+    from email_config import SEND_LOG_INDEX
+except ImportError:
+    SEND_LOG_INDEX = "send_log_index.db"
+
+
+DEFAULT_LOG_FILES = ["email_notifications.log", "streamlit_email_notifications.log"]
+
+# Matches EmailLogger lines, e.g.
+# 2025-12-14 10:30:16 | INFO | Email: john@example.com | Status: Sent
+LOG_LINE_PATTERN = re.compile(
+    r"^(?P<logged_at>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \| \w+ \| "
+    r"Email: (?P<email>.*?) \| Status: (?P<status>[^|\n]*?)(?: \| .*)?$"
+)
+
+# Records buffered in memory before they are written in one transaction
+COMMIT_EVERY = 100
+
+# Rotation time in archive names (email_notifications.log.<time>.gz); an
+# archive holds the lines written to its log before that time
+ARCHIVE_TIME_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+
+class SendLogIndex:
+    """SQLite index of log entries keyed by (email, date)"""
+
+    def __init__(self, db_path: str = SEND_LOG_INDEX):
+        """
+        Open (or create) the index
+
+        Args:
+            db_path: Path to the SQLite index file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending = []
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS sends (
+                email TEXT NOT NULL,
+                sent_on TEXT NOT NULL,
+                logged_at TEXT NOT NULL,
+                status TEXT NOT NULL,
+                log_file TEXT NOT NULL,
+                written_after REAL,
+                written_at REAL,
+                PRIMARY KEY (email, sent_on, logged_at, status)
+            ) WITHOUT ROWID;
+        """)
+        # Indexes created before entries recorded their exact write time
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sends)")}
+        if 'written_at' not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE sends ADD COLUMN written_after REAL")
+                self._conn.execute("ALTER TABLE sends ADD COLUMN written_at REAL")
+
+    def record(self, email: str, status: str, log_file: str, logged_at: Optional[datetime] = None,
+               written_after: Optional[float] = None):
+        """
+        Add one log entry to the index, once it has been written
+
+        Args:
+            email: Recipient address (normalized before storing)
+            status: Logged status, e.g. "Sent" or "Failed"
+            log_file: Log file the entry was written to (an active log; lookup
+                      finds the archive it was rotated into)
+            logged_at: Time of the entry (defaults to now)
+            written_after: time.time() from just before the entry was written
+        """
+        written_at = logged_at.timestamp() if logged_at else time.time()
+        if written_after is None:
+            written_after = written_at
+        stamp = datetime.fromtimestamp(written_at).strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            self._pending.append((normalize_address(email), stamp[:10], stamp, status, log_file,
+                                  written_after, written_at))
+            if len(self._pending) >= COMMIT_EVERY:
+                self._write_pending()
+
+    def flush(self):
+        """Write buffered records"""
+        with self._lock:
+            self._write_pending()
+
+    def _write_pending(self):
+        """Write buffered records in one short transaction (call with the lock held)"""
+        if not self._pending:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany("INSERT OR IGNORE INTO sends VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending)
+            self._pending = []
+        except sqlite3.Error as e:
+            # The log file itself is complete; the index can be rebuilt from it
+            print(f"⚠ Warning: Could not update send log index: {str(e)}")
+
+    def lookup(self, email: str, since: Optional[str] = None, until: Optional[str] = None,
+               status: Optional[str] = None) -> List[Dict]:
+        """
+        Find log entries for a recipient
+
+        Args:
+            email: Recipient address
+            since: First date to include (YYYY-MM-DD)
+            until: Last date to include (YYYY-MM-DD)
+            status: Only return entries with this status (e.g. "Sent")
+
+        Returns:
+            Matching entries, oldest first, with the file that now holds each
+            one (the log, or the archive it was rotated into)
+        """
+        query = ("SELECT email, logged_at, status, log_file, written_after, written_at FROM sends "
+                 "WHERE email = ? AND sent_on BETWEEN ? AND ?")
+        params = [normalize_address(email), since or "0000-00-00", until or "9999-99-99"]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY sent_on, logged_at"
+
+        with self._lock:
+            self._write_pending()
+            rows = self._conn.execute(query, params).fetchall()
+        archives = {}
+        entries = []
+        for address, logged_at, entry_status, log_file, written_after, written_at in rows:
+            if log_file not in archives:
+                archives[log_file] = list_archives(log_file)
+            if written_at is None:
+                # Rebuilt from the log: written within the logged second
+                written_after = datetime.strptime(logged_at, "%Y-%m-%d %H:%M:%S").timestamp()
+                written_at = written_after + 1
+            entries.append({'logged_at': logged_at, 'status': entry_status,
+                            'log_file': locate_entry(log_file, address, written_after, written_at,
+                                                     archives[log_file])})
+        return entries
+
+    def sent_since(self, since: str) -> List[Tuple[str, str]]:
+        """
+        List every successful send since a date
+
+        Args:
+            since: First date to include (YYYY-MM-DD)
+
+        Returns:
+            (normalized email, logged_at) pairs, oldest first
+        """
+        with self._lock:
+            self._write_pending()
+            return self._conn.execute(
+                "SELECT email, logged_at FROM sends WHERE sent_on >= ? AND status = 'Sent' ORDER BY logged_at",
+                (since,)
+            ).fetchall()
+
+    def was_notified(self, email: str, since: Optional[str] = None, until: Optional[str] = None) -> bool:
+        """
+        Check whether a recipient was successfully emailed in a date range
+
+        Args:
+            email: Recipient address
+            since: First date to include (YYYY-MM-DD)
+            until: Last date to include (YYYY-MM-DD)
+
+        Returns:
+            True if at least one "Sent" entry exists
+        """
+        return bool(self.lookup(email, since, until, status="Sent"))
+
+    def rebuild(self, log_files: Iterable[str]) -> int:
+        """
+        Recreate the index from log files and their compressed archives
+
+        Args:
+            log_files: Paths of log files (plain or .gz)
+
+        Returns:
+            Number of entries indexed
+        """
+        count = 0
+        with self._lock, self._conn:
+            self._pending = []
+            self._conn.execute("DELETE FROM sends")
+            for path in log_files:
+                opener = gzip.open if path.endswith(".gz") else open
+                with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+                    rows = []
+                    for line in f:
+                        match = LOG_LINE_PATTERN.match(line)
+                        if not match:
+                            continue
+                        stamp = match.group("logged_at")
+                        rows.append((normalize_address(match.group("email")), stamp[:10], stamp,
+                                     match.group("status"), path, None, None))
+                    self._conn.executemany("INSERT OR IGNORE INTO sends VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                    count += len(rows)
+        return count
+
+    def close(self):
+        """Commit and close the index"""
+        self.flush()
+        self._conn.close()
+
+
+def list_archives(log_file: str) -> List[Tuple[float, str]]:
+    """
+    Rotated archives of a log with their rotation times
+
+    Args:
+        log_file: Active log path
+
+    Returns:
+        (rotation timestamp, archive path) pairs, oldest first
+    """
+    archives = []
+    for path in glob.glob(glob.escape(log_file) + ".*.gz"):
+        try:
+            rotated = datetime.strptime(path[len(log_file) + 1:-3], ARCHIVE_TIME_FORMAT)
+        except ValueError:
+            continue
+        archives.append((rotated.timestamp(), path))
+    return sorted(archives)
+
+
+def archive_mentions(path: str, email: str) -> bool:
+    """Whether an archive has a log line for a (normalized) address"""
+    with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = LOG_LINE_PATTERN.match(line)
+            if match and normalize_address(match.group("email")) == email:
+                return True
+    return False
+
+
+def locate_entry(log_file: str, email: str, written_after: float, written_at: float,
+                 archives: List[Tuple[float, str]]) -> str:
+    """
+    The file now holding an entry written to a log: the first archive
+    rotated after it was written, or the log itself
+
+    Another process may rotate the log while the entry is being written, so
+    an archive rotated within that window is only chosen if it has the entry.
+
+    Args:
+        log_file: Log the entry was written to (archives are returned as is)
+        email: Normalized address of the entry
+        written_after: Time just before the entry was written
+        written_at: Time just after the entry was written
+        archives: list_archives(log_file)
+
+    Returns:
+        Log or archive path
+    """
+    if log_file.endswith(".gz"):
+        return log_file
+    for rotated, path in archives:
+        if rotated < written_after:
+            continue
+        if rotated >= written_at or archive_mentions(path, email):
+            return path
+    return log_file
+
+
+def find_log_files(base_names: Iterable[str] = DEFAULT_LOG_FILES) -> List[str]:
+    """
+    List log files together with their rotated archives
+
+    Args:
+        base_names: Active log file names
+
+    Returns:
+        Existing log and archive paths, archives first
+    """
+    paths = []
+    for base in base_names:
+        paths.extend(sorted(glob.glob(glob.escape(base) + ".*.gz")))
+        paths.extend(glob.glob(glob.escape(base)))
+    return paths
+
+
+def main():
+    """Command line entry point"""
+    usage = ("Usage: python send_log_index.py lookup EMAIL [SINCE] [UNTIL]\n"
+             "       python send_log_index.py rebuild [LOG_FILE ...]")
+    if len(sys.argv) < 2 or sys.argv[1] not in ("lookup", "rebuild"):
+        print(usage)
+        sys.exit(1)
+
+    index = SendLogIndex()
+
+    if sys.argv[1] == "rebuild":
+        log_files = find_log_files(sys.argv[2:] or DEFAULT_LOG_FILES)
+        count = index.rebuild(log_files)
+        print(f"✓ Indexed {count} log entries from {len(log_files)} file(s)")
+        index.close()
+        return
+
+    if len(sys.argv) < 3:
+        print(usage)
+        sys.exit(1)
+
+    email = sys.argv[2]
+    entries = index.lookup(email, *sys.argv[3:5])
+    index.close()
+
+    if not entries:
+        print(f"✗ No log entries for {email}")
+        sys.exit(1)
+    for entry in entries:
+        print(f"  {entry['logged_at']} | {entry['status']:<10} | {entry['log_file']}")
+    sent = sum(1 for entry in entries if entry['status'] == "Sent")
+    print(f"✓ {email}: {sent} sent, {len(entries) - sent} other entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Send Queue Module
+Orders pending interviews so the soonest interviews are notified first,
+and catches notifications that can no longer arrive in time
+"""
+import heapq
+import itertools
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from metrics import EMAILS_LATE
+try:
+    from email_config import (SEND_ROUND_WEIGHTS, SEND_DEADLINE_MODE, SEND_MIN_NOTICE_MINUTES,
+                              SEND_PRIORITY_WINDOW)
+except ImportError:
+    SEND_ROUND_WEIGHTS = {}
+    SEND_DEADLINE_MODE = "warn"
+    SEND_MIN_NOTICE_MINUTES = 60
+    SEND_PRIORITY_WINDOW = 10000
+
+
+DEADLINE_MODES = (None, "warn", "skip")
+
+
+class PrioritySendQueue:
+    """
+    Heap of pending interviews keyed on time until the interview
+
+    The key is the lead time (interview start minus now) multiplied by the
+    weight of the interview's round, so with a weight of 0.5 a final round
+    three days out goes ahead of a screening two days out. Rows whose date
+    or time can't be parsed go last, in sheet order; ties keep sheet order.
+
+    The deadline is checked as each interview leaves the queue, i.e. just
+    before it is rendered and sent, so time spent waiting behind earlier
+    rows counts against it.
+
+    Rows are read lazily and at most `window` of them are held at once:
+    when the heap is full, the most urgent row goes out before the next one
+    is read. Memory stays bounded however long the sheet is, at the cost
+    of exact order: a row can only move ahead of the `window` rows above
+    it in the sheet, so an urgent row near the bottom of a very long sheet
+    waits until the reader gets there.
+    """
+
+    def __init__(self, interviews: Iterable[Dict] = (),
+                 round_weights: Optional[Dict[str, float]] = None,
+                 deadline_mode: Optional[str] = SEND_DEADLINE_MODE,
+                 min_notice_minutes: float = SEND_MIN_NOTICE_MINUTES,
+                 window: Optional[int] = SEND_PRIORITY_WINDOW,
+                 clock: Callable[[], datetime] = datetime.now):
+        """
+        Initialize send queue
+
+        Args:
+            interviews: Pending interviews (with 'interview_at' and 'description')
+            round_weights: Lead-time multiplier per round, keyed by text found in
+                           the description (case-insensitive, first match wins);
+                           defaults to SEND_ROUND_WEIGHTS
+            deadline_mode: None (off), "warn" (send anyway) or "skip"
+            min_notice_minutes: Least notice a candidate should get
+            window: Most rows held in the heap (None = the whole sheet, exact order)
+            clock: Returns the current time
+        """
+        if deadline_mode not in DEADLINE_MODES:
+            raise ValueError(f"Unknown deadline mode '{deadline_mode}' (expected 'warn', 'skip' or None)")
+        weights = SEND_ROUND_WEIGHTS if round_weights is None else round_weights
+        self.round_weights = [(keyword.lower(), weight) for keyword, weight in weights.items()]
+        self.deadline_mode = deadline_mode
+        self.min_notice = timedelta(minutes=min_notice_minutes)
+        self.window = window
+        self.clock = clock
+        self.late: List[Dict] = []
+        self._now = clock()
+        self._heap = []
+        self._order = itertools.count()
+        self._weights: Dict[str, float] = {}
+        self._source = iter(interviews)
+
+    def round_weight(self, description: str) -> float:
+        """
+        Weight of the round an interview belongs to
+
+        Args:
+            description: Interview description
+
+        Returns:
+            Lead-time multiplier (1.0 if no keyword matches)
+        """
+        # Descriptions repeat across rows, so each is matched only once
+        weight = self._weights.get(description)
+        if weight is None:
+            text = str(description).lower()
+            weight = next((w for keyword, w in self.round_weights if keyword in text), 1.0)
+            self._weights[description] = weight
+        return weight
+
+    def push(self, interview: Dict):
+        """
+        Add an interview to the queue
+
+        Args:
+            interview: Pending interview
+        """
+        interview_at = interview.get('interview_at')
+        if interview_at is None:
+            key = (1, 0.0)
+        else:
+            lead = (interview_at - self._now).total_seconds()
+            # Weighting only brings future interviews forward; overdue ones stay first
+            if lead > 0:
+                lead *= self.round_weight(interview.get('description', ""))
+            key = (0, lead)
+        heapq.heappush(self._heap, (key, next(self._order), interview))
+
+    def __len__(self) -> int:
+        """Interviews currently held (rows not read yet are not counted)"""
+        return len(self._heap)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """
+        Read the interviews and pop them in priority order, applying the deadline check
+
+        Yields:
+            Interviews to send
+        """
+        for interview in self._source:
+            self.push(interview)
+            if self.window and len(self._heap) >= self.window:
+                interview = self._pop()
+                if interview is not None:
+                    yield interview
+        while self._heap:
+            interview = self._pop()
+            if interview is not None:
+                yield interview
+
+    def _pop(self) -> Optional[Dict]:
+        """The most urgent interview, or None if the deadline check skips it"""
+        _, _, interview = heapq.heappop(self._heap)
+        if self.deadline_mode and self._too_late(interview) and self.deadline_mode == "skip":
+            return None
+        return interview
+
+    def _too_late(self, interview: Dict) -> bool:
+        """Record and report an interview whose notification can't give enough notice"""
+        interview_at = interview.get('interview_at')
+        if interview_at is None:
+            return False
+        notice = interview_at - self.clock()
+        if notice >= self.min_notice:
+            return False
+
+        skipped = self.deadline_mode == "skip"
+        if notice <= timedelta(0):
+            reason = "interview has already started"
+        else:
+            reason = f"only {int(notice.total_seconds() // 60)} minute(s) before the interview"
+        self.late.append({'email': str(interview['email']), 'row_num': interview.get('row_num'),
+                          'error': reason, 'skipped': skipped})
+        action = "Skipping" if skipped else "Sending anyway"
+        print(f"⚠ Row {interview.get('row_num')}: {interview['email']} - {reason}. {action}.")
+        if skipped:
+            EMAILS_LATE.inc()
+        return True
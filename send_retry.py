@@ -0,0 +1,91 @@
+"""
+Send Retry Module
+Retries temporary delivery failures (throttling, 4xx replies) the same way
+for every transport
+"""
+import smtplib
+import time
+from typing import Callable, Dict
+from metrics import EMAILS_RETRIED
+try:
+    from email_config import SEND_MAX_RETRIES, SEND_RETRY_BACKOFF
+except ImportError:
+    SEND_MAX_RETRIES = 3
+    SEND_RETRY_BACKOFF = 0.5
+
+
+class TransientSendError(Exception):
+    """Temporary failure (e.g. 421 throttled); worth retrying"""
+
+
+class PermanentSendError(Exception):
+    """Permanent failure (e.g. 550 mailbox unavailable)"""
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether a delivery error is worth retrying
+
+    Args:
+        error: Exception raised by a transport
+
+    Returns:
+        True for TransientSendError and SMTP 4xx replies
+    """
+    if isinstance(error, TransientSendError):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    return False
+
+
+def is_permanent(error: Exception) -> bool:
+    """
+    Whether a delivery error rejects the message itself (e.g. 550 mailbox
+    unavailable), so sending it from another account would fail the same way
+
+    Args:
+        error: Exception raised by a transport
+
+    Returns:
+        True for PermanentSendError and SMTP 5xx replies about the recipient
+        or the message (not about the sending account)
+    """
+    if isinstance(error, PermanentSendError):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPAuthenticationError)):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def deliver_with_retry(deliver: Callable[[Dict], None], message: Dict,
+                       max_retries: int = SEND_MAX_RETRIES, backoff: float = SEND_RETRY_BACKOFF):
+    """
+    Deliver a message, retrying transient failures with exponential backoff
+
+    Args:
+        deliver: Sends one message, raising on failure
+        message: Rendered message
+        max_retries: Retries after the first attempt
+        backoff: First retry delay in seconds (doubles on every retry)
+
+    Raises:
+        The last error once retries are used up, or any permanent error at once
+    """
+    attempt = 0
+    while True:
+        try:
+            deliver(message)
+            return
+        except Exception as e:
+            if attempt >= max_retries or not is_transient(e):
+                raise
+        time.sleep(backoff * (2 ** attempt))
+        attempt += 1
+        EMAILS_RETRIED.inc()
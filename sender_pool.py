@@ -0,0 +1,470 @@
+"""
+Sender Pool Module
+Spreads messages across several Outlook accounts or SMTP identities, each
+with its own quota and rate limit, so a run isn't capped by what one
+mailbox may send
+"""
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from datetime import date
+from typing import Dict, List, Optional
+from message_builder import replace_sender
+from send_retry import is_permanent, is_transient
+try:
+    from email_config import (SENDER_USAGE_FILE, SENDER_COOLDOWN_SECONDS,
+                              SENDER_FAILURES_BEFORE_COOLDOWN, SENDER_FAILOVER_ATTEMPTS)
+except ImportError:
+    SENDER_USAGE_FILE = "sender_usage.db"
+    SENDER_COOLDOWN_SECONDS = 60
+    SENDER_FAILURES_BEFORE_COOLDOWN = 3
+    SENDER_FAILOVER_ATTEMPTS = 2
+
+
+# Identity settings used by the pool itself; everything else goes to the emailer
+POOL_KEYS = ("name", "weight", "daily_quota", "per_minute", "account")
+
+
+class SenderUsage:
+    """
+    SQLite table of each identity's sends per day, shared by every runner
+
+    A send is counted when it is reserved, in one write transaction that
+    also checks the daily quota, so runners started at the same time can't
+    overshoot a quota or overwrite each other's counts.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the usage store
+
+        Args:
+            db_path: Path to the SQLite database
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS usage (
+                day TEXT NOT NULL,
+                name TEXT NOT NULL,
+                sent INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, name)
+            ) WITHOUT ROWID;
+        """)
+
+    def _transaction(self, statements):
+        """Run statements in one write transaction (BEGIN IMMEDIATE serializes runners)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def count(self, day: str, name: str) -> int:
+        """Sends of an identity on a day, by every runner"""
+        with self._lock:
+            row = self._conn.execute("SELECT sent FROM usage WHERE day = ? AND name = ?", (day, name)).fetchone()
+        return row[0] if row else 0
+
+    def reserve(self, day: str, name: str, quota: int) -> Optional[int]:
+        """
+        Count one send if the identity has quota left
+
+        Args:
+            day: ISO date
+            name: Identity name
+            quota: Messages allowed per day (0 = unlimited)
+
+        Returns:
+            The day's count including this send, or None if the quota is used up
+        """
+        def reserve_send(conn):
+            # Earlier days are no longer needed
+            conn.execute("DELETE FROM usage WHERE day < ?", (day,))
+            conn.execute("INSERT OR IGNORE INTO usage (day, name) VALUES (?, ?)", (day, name))
+            updated = conn.execute("UPDATE usage SET sent = sent + 1 WHERE day = ? AND name = ? "
+                                   "AND (? = 0 OR sent < ?)", (day, name, quota, quota)).rowcount
+            if not updated:
+                return None
+            return conn.execute("SELECT sent FROM usage WHERE day = ? AND name = ?", (day, name)).fetchone()[0]
+
+        return self._transaction(reserve_send)
+
+    def release(self, day: str, name: str):
+        """Give back a reserved send that failed"""
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE usage SET sent = sent - 1 WHERE day = ? AND name = ? AND sent > 0", (day, name)))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SenderIdentity:
+    """One account / identity in the pool and its sending budget"""
+
+    def __init__(self, name: str, emailer, weight: int = 1, daily_quota: int = 0,
+                 per_minute: float = 0, account: Optional[str] = None, sender: Optional[str] = None):
+        """
+        Initialize identity
+
+        Args:
+            name: Identity name (used in messages and the usage file)
+            emailer: Emailer that sends for this identity (may be shared)
+            weight: Share of the traffic relative to the other identities
+            daily_quota: Messages allowed per day (0 = unlimited)
+            per_minute: Messages allowed per minute (0 = unlimited)
+            account: Outlook account to send from (SendUsingAccount)
+            sender: From address written into MIME messages
+        """
+        self.name = name
+        self.emailer = emailer
+        self.weight = max(1, int(weight))
+        self.daily_quota = daily_quota
+        self.per_minute = per_minute
+        self.account = account
+        self.sender = sender
+
+        self.sent_today = 0
+        self.sent = 0
+        self.failed = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.current_weight = 0
+        # Token bucket holding up to one minute of sends
+        self._tokens = float(per_minute)
+        self._refilled_at = time.monotonic()
+
+    def quota_left(self) -> bool:
+        return not self.daily_quota or self.sent_today < self.daily_quota
+
+    def wait_for_token(self, now: float) -> float:
+        """Seconds until this identity may send (0 = now); refills the bucket"""
+        if now < self.cooldown_until:
+            return self.cooldown_until - now
+        if not self.per_minute:
+            return 0.0
+        self._tokens = min(self.per_minute, self._tokens + (now - self._refilled_at) * self.per_minute / 60)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) * 60 / self.per_minute
+
+    def take_token(self):
+        if self.per_minute:
+            self._tokens -= 1
+
+    def prepare(self, message: Dict) -> Dict:
+        """The message as this identity sends it"""
+        if self.account:
+            return dict(message, account=self.account)
+        if self.sender and 'mime' in message:
+            return dict(message, mime=replace_sender(message['mime'], self.sender))
+        return message
+
+
+class SenderPool:
+    """
+    Emailer that sends each message from one of several identities
+
+    Identities are picked by smooth weighted round-robin among those with
+    quota and a rate-limit token left. When a send fails the message is
+    retried on another identity, unless the server rejected the message
+    itself (e.g. 550 unknown mailbox), which no other identity can fix. An
+    identity whose sends keep failing temporarily (throttled, 4xx) is rested
+    for a cooldown that doubles while the failures continue.
+    """
+
+    def __init__(self, identities: List[SenderIdentity], usage_file: Optional[str] = SENDER_USAGE_FILE,
+                 cooldown_seconds: float = SENDER_COOLDOWN_SECONDS,
+                 failures_before_cooldown: int = SENDER_FAILURES_BEFORE_COOLDOWN,
+                 failover_attempts: int = SENDER_FAILOVER_ATTEMPTS):
+        """
+        Initialize sender pool
+
+        Args:
+            identities: Identities to send from
+            usage_file: SQLite file counting each identity's sends per day, shared
+                        with other runners (None = per run only)
+            cooldown_seconds: First rest period of a failing identity
+            failures_before_cooldown: Consecutive temporary failures that trigger a rest
+            failover_attempts: Other identities tried after a failed send
+        """
+        if not identities:
+            raise ValueError("A sender pool needs at least one identity")
+        self.identities = identities
+        self.usage_file = usage_file
+        self.usage: Optional[SenderUsage] = None
+        self.cooldown_seconds = cooldown_seconds
+        self.failures_before_cooldown = failures_before_cooldown
+        self.failover_attempts = failover_attempts
+        self._emailers = list({id(i.emailer): i.emailer for i in identities}.values())
+        self._lock = threading.Lock()
+        self._day = date.today().isoformat()
+
+    @property
+    def builder(self):
+        return self.identities[0].emailer.builder
+
+    @builder.setter
+    def builder(self, builder):
+        # Messages are rendered once and get each identity's From address when sent
+        for emailer in self._emailers:
+            emailer.builder = builder
+
+    def connect(self) -> bool:
+        """
+        Connect every identity's emailer; identities that can't connect are left out
+
+        Returns:
+            True if at least one identity can send
+        """
+        connected = set()
+        for emailer in self._emailers:
+            if emailer.connect():
+                connected.add(id(emailer))
+        self.identities = [i for i in self.identities if id(i.emailer) in connected]
+        self._emailers = [e for e in self._emailers if id(e) in connected]
+
+        # Outlook identities must name an account configured in Outlook
+        for identity in list(self.identities):
+            accounts = getattr(identity.emailer, "account_names", None)
+            if identity.account and accounts is not None and identity.account.lower() not in accounts:
+                print(f"✗ Outlook has no account '{identity.account}'; leaving it out of the sender pool")
+                self.identities.remove(identity)
+        if not self.identities:
+            print("✗ No sender identity could connect")
+            return False
+
+        self._load_usage()
+        print(f"✓ Sender pool: {', '.join(f'{i.name} (x{i.weight})' for i in self.identities)}")
+        return True
+
+    def render_message(self, interview_data: Dict) -> Dict:
+        """Render a message (the sending identity is picked when it is sent)"""
+        return self.identities[0].emailer.render_message(interview_data)
+
+    def send_interview_notification(self, interview_data: Dict) -> bool:
+        return self.send_message(self.render_message(interview_data))
+
+    def submit(self, interview_data: Dict) -> Future:
+        """
+        Send an email and return its result as an already completed Future
+
+        Args:
+            interview_data: Dictionary containing email, date, time, and description
+
+        Returns:
+            Future resolving to True if the email was sent, False otherwise
+        """
+        future = Future()
+        future.set_result(self.send_interview_notification(interview_data))
+        return future
+
+    def send_message(self, message: Dict) -> bool:
+        """
+        Send a rendered message from the next identity, failing over to
+        another one unless the message itself was rejected
+
+        Args:
+            message: Rendered message from render_message()
+
+        Returns:
+            True if one of the identities sent it, False otherwise
+        """
+        tried = set()
+        for _ in range(1 + self.failover_attempts):
+            identity = self._acquire(tried)
+            if identity is None:
+                break
+            tried.add(identity.name)
+            verbose = getattr(identity.emailer, "verbose", True)
+            try:
+                identity.emailer.deliver(identity.prepare(message))
+            except Exception as e:
+                if verbose:
+                    print(f"✗ Error sending email to {message['to']} from {identity.name}: {str(e)}")
+                self._record(identity, e)
+                if is_permanent(e):
+                    # The recipient or message was refused; another identity won't do better
+                    return False
+                if len(tried) < len(self.identities):
+                    print(f"⚠ Sending to {message['to']} failed from {identity.name}, trying another identity")
+                continue
+            self._record(identity)
+            identity.emailer.builder.record_sent(message)
+            if verbose:
+                print(f"✓ Email sent to {message['to']} from {identity.name}")
+            return True
+        return False
+
+    def _acquire(self, exclude) -> Optional[SenderIdentity]:
+        """
+        Pick the next identity by smooth weighted round-robin, waiting for a
+        rate-limit token if every candidate is momentarily out of them
+
+        Returns:
+            Identity with a token taken, or None if none has quota left
+        """
+        while True:
+            with self._lock:
+                self._roll_day()
+                candidates = [i for i in self.identities if i.name not in exclude and i.quota_left()]
+                if not candidates:
+                    if not exclude:
+                        print("✗ Every sender identity has used up its daily quota")
+                    return None
+                now = time.monotonic()
+                waits = {i.name: i.wait_for_token(now) for i in candidates}
+                ready = [i for i in candidates if waits[i.name] == 0]
+                if ready:
+                    total = sum(i.weight for i in ready)
+                    for i in ready:
+                        i.current_weight += i.weight
+                    chosen = max(ready, key=lambda i: i.current_weight)
+                    chosen.current_weight -= total
+                    if self._reserve(chosen):
+                        chosen.take_token()
+                        return chosen
+                    # Another runner used up the quota; pick again
+                    continue
+                delay = min(waits.values())
+            time.sleep(min(delay, 1.0))
+
+    def _record(self, identity: SenderIdentity, error: Optional[Exception] = None):
+        """
+        Count a send attempt
+
+        Only temporary failures (throttling, 4xx) count towards a cooldown; a
+        permanent rejection of the message shows the identity itself works.
+
+        Args:
+            identity: Identity that tried
+            error: Delivery error (None = sent)
+        """
+        with self._lock:
+            if error is None:
+                identity.sent += 1
+                identity.failures = 0
+                return
+            identity.failed += 1
+            # A failed send doesn't use up quota
+            identity.sent_today -= 1
+            if self.usage:
+                self.usage.release(self._day, identity.name)
+            if is_permanent(error):
+                identity.failures = 0
+                return
+            if not is_transient(error):
+                return
+            identity.failures += 1
+            if identity.failures >= self.failures_before_cooldown:
+                rest = self.cooldown_seconds * 2 ** (identity.failures - self.failures_before_cooldown)
+                identity.cooldown_until = time.monotonic() + rest
+                print(f"⚠ Resting sender {identity.name} for {rest:g}s after {identity.failures} "
+                      f"temporary failures in a row")
+
+    def _roll_day(self):
+        """Reset daily counts at midnight (call with the lock held)"""
+        today = date.today().isoformat()
+        if today != self._day:
+            self._day = today
+            for identity in self.identities:
+                identity.sent_today = 0
+
+    def _reserve(self, identity: SenderIdentity) -> bool:
+        """
+        Count a send against the identity's quota (call with the lock held)
+
+        With a usage store the count is shared with other runners, so
+        sent_today is refreshed from it; without one it is per run.
+
+        Returns:
+            False if the quota turned out to be used up
+        """
+        if not self.usage:
+            identity.sent_today += 1
+            return True
+        try:
+            count = self.usage.reserve(self._day, identity.name, identity.daily_quota)
+        except sqlite3.Error as e:
+            print(f"⚠ Warning: Could not update sender usage: {str(e)}")
+            identity.sent_today += 1
+            return True
+        if count is None:
+            identity.sent_today = identity.daily_quota
+            return False
+        identity.sent_today = count
+        return True
+
+    def _load_usage(self):
+        """Open the usage store and start from today's counts of other runs"""
+        if not self.usage_file:
+            return
+        try:
+            self.usage = SenderUsage(self.usage_file)
+            for identity in self.identities:
+                identity.sent_today = self.usage.count(self._day, identity.name)
+        except sqlite3.Error as e:
+            print(f"⚠ Warning: Could not open sender usage file, counting this run only: {str(e)}")
+            self.usage = None
+
+    def stats(self) -> List[Dict]:
+        """Per-identity counts for this run"""
+        return [{'name': i.name, 'sent': i.sent, 'failed': i.failed, 'sent_today': i.sent_today,
+                 'daily_quota': i.daily_quota} for i in self.identities]
+
+    def close(self):
+        """Close the usage store and every emailer"""
+        if self.usage:
+            self.usage.close()
+            self.usage = None
+        for emailer in self._emailers:
+            emailer.close()
+
+
+def create_sender_pool(transport: str, identities: List[Dict], **kwargs) -> SenderPool:
+    """
+    Build a pool from SENDER_IDENTITIES entries
+
+    Outlook identities share one Outlook connection and differ by account;
+    SMTP and fake identities each get their own emailer (and connection),
+    with the remaining keys of the entry passed to its constructor.
+
+    Args:
+        transport: "outlook", "smtp" or "fake"
+        identities: Entries with name/weight/daily_quota/per_minute and
+                    "account" (Outlook) or emailer settings such as
+                    sender/username/password (SMTP)
+        **kwargs: Passed to every emailer constructor
+
+    Returns:
+        Unconnected sender pool
+    """
+    from transports import create_emailer
+
+    shared = create_emailer(transport, identities=[], **kwargs) if transport == "outlook" else None
+    pool = []
+    for entry in identities:
+        options = {k: v for k, v in entry.items() if k not in POOL_KEYS}
+        if shared is not None:
+            emailer = shared
+            if not entry.get("account"):
+                raise ValueError("Outlook sender identities need an 'account'")
+        else:
+            if transport == "fake":
+                options.pop("sender", None)
+            emailer = create_emailer(transport, identities=[], **dict(kwargs, **options))
+        sender = entry.get("sender")
+        if sender and transport != "outlook":
+            emailer.builder.sender = sender
+        name = entry.get("name") or entry.get("account") or sender or f"identity{len(pool) + 1}"
+        pool.append(SenderIdentity(name, emailer, entry.get("weight", 1), entry.get("daily_quota", 0),
+                                   entry.get("per_minute", 0), entry.get("account"), sender))
+    return SenderPool(pool)
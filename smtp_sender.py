@@ -0,0 +1,183 @@
+"""
+SMTP Email Sender Module
+Handles sending emails through an SMTP server
+"""
+import smtplib
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional
+from message_builder import MessageBuilder
+from metrics import RENDER_SECONDS, TRANSPORT_SECONDS
+from send_retry import deliver_with_retry
+try:
+    from email_config import (SMTP_HOST, SMTP_PORT, SMTP_USE_TLS, SMTP_USERNAME,
+                              SMTP_PASSWORD, SMTP_SENDER)
+except ImportError:
+    # Default values if config file doesn't exist
+    SMTP_HOST = "localhost"
+    SMTP_PORT = 25
+    SMTP_USE_TLS = False
+    SMTP_USERNAME = ""
+    SMTP_PASSWORD = ""
+    SMTP_SENDER = "hr@company.com"
+
+
+class SMTPEmailer:
+    """Sends interview notification emails as multipart messages over SMTP"""
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, use_tls: bool = SMTP_USE_TLS,
+                 username: str = SMTP_USERNAME, password: str = SMTP_PASSWORD,
+                 sender: str = SMTP_SENDER, builder: Optional[MessageBuilder] = None):
+        """
+        Initialize SMTP emailer
+
+        Args:
+            host: SMTP server host
+            port: SMTP server port
+            use_tls: Whether to upgrade the connection with STARTTLS
+            username: Login user name (empty to skip authentication)
+            password: Login password
+            sender: Envelope and From address
+            builder: Message builder (defaults to one built from email_config)
+        """
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.builder = builder or MessageBuilder.from_config()
+        self.builder.sender = sender
+        self.smtp = None
+        # smtplib connections are not thread-safe
+        self._lock = threading.Lock()
+
+    def connect(self) -> bool:
+        """
+        Connect (and log in) to the SMTP server
+
+        Returns:
+            True if connected successfully, False otherwise
+        """
+        try:
+            self.smtp = smtplib.SMTP(self.host, self.port, timeout=30)
+            if self.use_tls:
+                self.smtp.starttls()
+            if self.username:
+                self.smtp.login(self.username, self.password)
+            print(f"✓ Connected to SMTP server {self.host}:{self.port}")
+            return True
+        except Exception as e:
+            print(f"✗ Error connecting to SMTP server {self.host}:{self.port}: {str(e)}")
+            self.smtp = None
+            return False
+
+    def send_interview_notification(self, interview_data: Dict) -> bool:
+        """
+        Send interview notification email
+
+        Args:
+            interview_data: Dictionary containing email, date, time, and description
+
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        if not self.smtp:
+            print("✗ SMTP server not connected!")
+            return False
+
+        return self.send_message(self.render_message(interview_data))
+
+    def render_message(self, interview_data: Dict) -> Dict:
+        """
+        Render the MIME message for one email
+
+        Args:
+            interview_data: Dictionary containing interview details
+
+        Returns:
+            Dictionary with to, mime (message bytes) and invite_revision
+            (committed once the message is sent)
+        """
+        with RENDER_SECONDS.time():
+            revision = self.builder.plan_invite(interview_data)
+            return {'to': interview_data['email'], 'mime': self.builder.build_mime(interview_data, revision),
+                    'invite_revision': revision}
+
+    def send_message(self, message: Dict) -> bool:
+        """
+        Send an already rendered message, retrying temporary (4xx) failures
+
+        Args:
+            message: Rendered message from render_message()
+
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        try:
+            self.deliver(message)
+            self.builder.record_sent(message)
+            print(f"✓ Email sent to {message['to']}")
+            return True
+        except Exception as e:
+            print(f"✗ Error sending email to {message['to']}: {str(e)}")
+            return False
+
+    def deliver(self, message: Dict):
+        """
+        Send an already rendered message, retrying temporary (4xx) failures,
+        and raise instead of reporting (the sender pool tells failures apart)
+
+        Args:
+            message: Rendered message from render_message()
+
+        Raises:
+            The delivery error (see send_retry.is_transient / is_permanent)
+        """
+        deliver_with_retry(self._locked_deliver, message)
+
+    def _locked_deliver(self, message: Dict):
+        # Retries wait outside the lock so other threads can send meanwhile
+        with self._lock, TRANSPORT_SECONDS.time():
+            self._deliver(message)
+
+    def _deliver(self, message: Dict):
+        """
+        Hand one message to the server (call with the lock held)
+
+        Servers drop idle connections (e.g. between watch daemon batches),
+        so a dropped connection is reopened and the message sent once more.
+
+        Args:
+            message: Rendered message from render_message()
+        """
+        try:
+            self.smtp.sendmail(self.sender, [message['to']], message['mime'])
+        except smtplib.SMTPServerDisconnected:
+            print(f"⚠ SMTP connection to {self.host}:{self.port} was closed, reconnecting")
+            if not self.connect():
+                raise
+            self.smtp.sendmail(self.sender, [message['to']], message['mime'])
+
+    def submit(self, interview_data: Dict) -> Future:
+        """
+        Send an email and return its result as an already completed Future
+
+        Args:
+            interview_data: Dictionary containing email, date, time, and description
+
+        Returns:
+            Future resolving to True if the email was sent, False otherwise
+        """
+        future = Future()
+        future.set_result(self.send_interview_notification(interview_data))
+        return future
+
+    def close(self):
+        """Close the SMTP connection"""
+        if self.smtp:
+            try:
+                self.smtp.quit()
+            except Exception:
+                pass
+            self.smtp = None
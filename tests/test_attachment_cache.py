@@ -0,0 +1,58 @@
+"""Attachments named in the sheet stay inside the attachment directory"""
+import os
+
+import pytest
+
+from attachment_cache import AttachmentCache, AttachmentSet
+
+
+@pytest.fixture
+def directory(tmp_path):
+    root = tmp_path / "attachments"
+    (root / "guides").mkdir(parents=True)
+    (root / "guides" / "onsite.pdf").write_bytes(b"%PDF onsite")
+    (root / "welcome.pdf").write_bytes(b"%PDF welcome")
+    (tmp_path / "secret.txt").write_text("not for candidates")
+    return root
+
+
+@pytest.mark.parametrize("name", ["welcome.pdf", "guides/onsite.pdf", "guides/../welcome.pdf"])
+def test_resolve_cell_accepts_files_inside(directory, name):
+    attachments = AttachmentSet(directory=str(directory))
+
+    path = attachments.resolve_cell(name)
+
+    assert path.startswith(str(directory.resolve()) + os.sep)
+    assert os.path.isfile(path)
+
+
+@pytest.mark.parametrize("name", ["../secret.txt", "guides/../../secret.txt", "../attachments-old/x.pdf"])
+def test_resolve_cell_rejects_parent_paths(directory, name):
+    with pytest.raises(ValueError):
+        AttachmentSet(directory=str(directory)).resolve_cell(name)
+
+
+def test_resolve_cell_rejects_absolute_paths(directory, tmp_path):
+    with pytest.raises(ValueError):
+        AttachmentSet(directory=str(directory)).resolve_cell(str(tmp_path / "secret.txt"))
+
+
+def test_resolve_cell_rejects_symlinks_leading_out(directory, tmp_path):
+    os.symlink(tmp_path / "secret.txt", directory / "innocent.pdf")
+    os.symlink(tmp_path, directory / "guides" / "up")
+
+    attachments = AttachmentSet(directory=str(directory))
+    with pytest.raises(ValueError):
+        attachments.resolve_cell("innocent.pdf")
+    with pytest.raises(ValueError):
+        attachments.resolve_cell("guides/up/secret.txt")
+
+
+def test_sheet_column_attachments(directory):
+    cache = AttachmentCache()
+    attachments = AttachmentSet(["welcome.pdf"], field="attachments", directory=str(directory), cache=cache)
+
+    sent = attachments.for_interview({'attachments': "guides/onsite.pdf; welcome.pdf"})
+    assert [a.filename for a in sent] == ["welcome.pdf", "onsite.pdf"]
+    with pytest.raises(ValueError):
+        attachments.for_interview({'attachments': "welcome.pdf; ../secret.txt"})
@@ -0,0 +1,116 @@
+"""Calendar invites: the store only records invites that were sent"""
+import email
+import re
+from datetime import datetime
+from email.policy import default
+
+import pytest
+
+from calendar_invite import InviteBuilder, InviteStore
+from fake_transport import FakeEmailer
+from message_builder import MessageBuilder
+
+CONSTANTS = {'company_name': "Acme", 'hr_email': "hr@example.com", 'hr_department': "People"}
+
+
+def interview(row_num, at, description="Technical Interview", email_address="john@example.com", **extra):
+    return dict({'row_num': row_num, 'email': email_address, 'date': at.strftime("%Y-%m-%d"),
+                 'time': at.strftime("%I:%M %p"), 'description': description, 'interview_at': at}, **extra)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InviteStore(str(tmp_path / "invites.db"))
+    yield store
+    store.close()
+
+
+def emailer(store, **options):
+    builder = MessageBuilder(constants=CONSTANTS, invites=InviteBuilder(None, store=store, **options))
+    fake = FakeEmailer(latency=0, verbose=False, builder=builder)
+    fake.connect()
+    return fake
+
+
+def calendars(message):
+    """(file name, UID, SEQUENCE) of each .ics file in a rendered message"""
+    parsed = email.message_from_bytes(message['mime'], policy=default)
+    found = []
+    for part in parsed.iter_attachments():
+        text = part.get_content()
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        found.append((part.get_filename(), re.search(r"UID:(\S+)", text).group(1),
+                      int(re.search(r"SEQUENCE:(\d+)", text).group(1))))
+    return found
+
+
+def stored(store):
+    return store._conn.execute("SELECT uid, starts_at, sequence, status FROM invites ORDER BY starts_at").fetchall()
+
+
+def test_failed_send_leaves_the_store_unchanged(store):
+    fake = emailer(store)
+    first = interview(2, datetime(2026, 3, 2, 10))
+    fake.permanent_failure_rate = 1.0
+
+    assert not fake.send_message(fake.render_message(first))
+    assert stored(store) == []
+
+    fake.permanent_failure_rate = 0.0
+    message = fake.render_message(first)
+    assert [sequence for _, _, sequence in calendars(message)] == [0]
+    assert fake.send_message(message)
+    assert len(stored(store)) == 1
+
+
+def test_rendering_does_not_bump_the_sequence(store):
+    fake = emailer(store)
+    first = interview(2, datetime(2026, 3, 2, 10))
+    assert fake.send_message(fake.render_message(first))
+
+    moved = interview(2, datetime(2026, 3, 3, 14))
+    # Rendered (e.g. previewed or failed) several times before it is sent
+    for _ in range(3):
+        [(_, uid, sequence)] = calendars(fake.render_message(moved))
+        assert sequence == 1
+    assert fake.send_message(fake.render_message(moved))
+
+    [(stored_uid, starts_at, sequence, status)] = stored(store)
+    assert uid.startswith(stored_uid)
+    assert (starts_at, sequence, status) == ("2026-03-03T14:00:00", 1, "active")
+
+
+def test_cancellations_are_recorded_once_sent(store):
+    fake = emailer(store)
+    assert fake.send_message(fake.render_message(interview(2, datetime(2026, 3, 2, 10))))
+
+    overlapping = interview(3, datetime(2026, 3, 2, 10, 30), description="HR Screening")
+    fake.permanent_failure_rate = 1.0
+    message = fake.render_message(overlapping)
+    assert [name for name, _, _ in calendars(message)] == ["invite.ics", "cancelled.ics"]
+    assert not fake.send_message(message)
+    assert [status for _, _, _, status in stored(store)] == ["active"]
+
+    fake.permanent_failure_rate = 0.0
+    assert fake.send_message(fake.render_message(overlapping))
+    assert [(sequence, status) for _, _, sequence, status in stored(store)] == [(1, "cancelled"), (0, "active")]
+
+
+def test_interviews_on_different_rows_are_different_events():
+    builder = InviteBuilder(None)
+    at = datetime(2026, 3, 2, 10)
+
+    first, second = interview(2, at), interview(9, datetime(2026, 4, 6, 10))
+    assert builder.uid(first) != builder.uid(second)
+    # Rescheduling an interview keeps its row, and so its event
+    assert builder.uid(first) == builder.uid(interview(2, datetime(2026, 3, 5, 15)))
+
+
+def test_interview_id_column_identifies_the_event():
+    builder = InviteBuilder(None, id_field="interview_id")
+    at = datetime(2026, 3, 2, 10)
+
+    assert "interview_id" in builder.fields
+    assert builder.uid(interview(2, at, interview_id="INT-7")) == builder.uid(interview(5, at, interview_id="INT-7"))
+    assert builder.uid(interview(2, at, interview_id="INT-7")) != builder.uid(interview(2, at, interview_id="INT-8"))
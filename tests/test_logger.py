@@ -0,0 +1,40 @@
+"""Log rotation and the send log index entries that point into it"""
+import glob
+import gzip
+import os
+
+from logger import EmailLogger
+
+
+def test_index_entries_follow_rotated_lines(tmp_path):
+    log_file = str(tmp_path / "email_notifications.log")
+    logger = EmailLogger(log_file, max_bytes=2000, index_path=str(tmp_path / "index.db"))
+    try:
+        for i in range(40):
+            logger.log_email_sent(f"person{i}@example.com")
+        logger.index.flush()
+
+        archives = glob.glob(log_file + ".*.gz")
+        assert archives
+        for i in range(40):
+            email = f"person{i}@example.com"
+            [entry] = logger.index.lookup(email)
+            opener = gzip.open if entry['log_file'].endswith(".gz") else open
+            with opener(entry['log_file'], 'rt', encoding='utf-8') as f:
+                assert email in f.read()
+    finally:
+        logger.close()
+
+
+def test_log_stays_open_between_records(tmp_path):
+    log_file = str(tmp_path / "email_notifications.log")
+    logger = EmailLogger(log_file, max_bytes=0, index_path=None)
+    try:
+        logger.log_email_sent("a@example.com")
+        handler = next(h for h in logger.logger.handlers if hasattr(h, "lock_file"))
+        stream = handler.stream
+        logger.log_email_sent("b@example.com")
+        assert handler.stream is stream
+        assert not os.path.exists(handler.lock_file)
+    finally:
+        logger.close()
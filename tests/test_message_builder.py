@@ -0,0 +1,70 @@
+"""Pre-encoded MIME messages decode back to the rendered text and HTML"""
+import email
+from email.policy import default
+
+import pytest
+
+from attachment_cache import AttachmentSet
+from message_builder import MessageBuilder
+
+CONSTANTS = {'company_name': "Acme & Söhne", 'hr_email': "hr@example.com",
+             'hr_department': "People <Ops>"}
+
+INTERVIEWS = [
+    {'email': "john@example.com", 'date': "2025-12-14", 'time': "10:00 AM",
+     'description': "Technical Interview"},
+    {'email': "zoe@example.com", 'date': "2025-12-15", 'time': "2:30 PM",
+     'description': "Café chat with <b>R&D</b> = \"fun\" " + "very long line " * 12},
+    {'email': "a@example.com", 'date': "2025-12-16", 'time': "9:00 AM",
+     'description': "Trailing spaces   \nand a second line.\tTabbed\r\nend "},
+]
+
+
+def parts(mime: bytes):
+    """The message and its decoded text and HTML bodies"""
+    message = email.message_from_bytes(mime, policy=default)
+    text = message.get_body(preferencelist=("plain",))
+    html = message.get_body(preferencelist=("html",))
+    return message, lines(text.get_content()), lines(html.get_content())
+
+
+def lines(body: str) -> str:
+    """MIME text travels with CRLF line breaks"""
+    return body.replace("\r\n", "\n")
+
+
+@pytest.mark.parametrize("interview", INTERVIEWS)
+def test_mime_decodes_to_rendered_bodies(interview):
+    builder = MessageBuilder(subject="Entretien prévu", constants=CONSTANTS, sender="hr@example.com")
+
+    message, text, html = parts(builder.build_mime(interview))
+
+    assert message['Subject'] == "Entretien prévu"
+    assert message['From'] == "hr@example.com"
+    assert text == lines(builder.render_text(interview))
+    assert html == lines(builder.render_html(interview))
+
+
+def test_custom_html_template_decodes():
+    builder = MessageBuilder(template="Hi {email}, see you at {time} on {date}.",
+                             html_template="<p>Hi {email}, see you at <b>{time}</b> on {date}.</p>",
+                             constants=CONSTANTS)
+
+    for interview in INTERVIEWS:
+        _, text, html = parts(builder.build_mime(interview))
+        assert text == lines(builder.render_text(interview))
+        assert html == lines(builder.render_html(interview))
+
+
+def test_attachments_keep_bodies_and_content(tmp_path):
+    (tmp_path / "guide.pdf").write_bytes(bytes(range(256)) * 40)
+    attachments = AttachmentSet(["guide.pdf"], directory=str(tmp_path))
+    builder = MessageBuilder(constants=CONSTANTS, attachments=attachments)
+
+    message, text, html = parts(builder.build_mime(INTERVIEWS[1]))
+
+    assert text == lines(builder.render_text(INTERVIEWS[1]))
+    assert html == lines(builder.render_html(INTERVIEWS[1]))
+    [attachment] = list(message.iter_attachments())
+    assert attachment.get_filename() == "guide.pdf"
+    assert attachment.get_content() == bytes(range(256)) * 40
@@ -0,0 +1,27 @@
+"""Exposition format of metric values"""
+from metrics import Counter, Histogram, format_value
+
+
+def test_large_counts_are_exact():
+    counter = Counter("emails_sent_total", "Emails sent")
+    counter.inc(1234567)
+    counter.inc()
+    assert counter.render()[-1] == "emails_sent_total 1234568"
+
+
+def test_fractions_round_trip():
+    assert float(format_value(0.1 + 0.2)) == 0.1 + 0.2
+    assert format_value(2.5) == "2.5"
+
+
+def test_special_values():
+    assert format_value(float("inf")) == "+Inf"
+    assert format_value(float("-inf")) == "-Inf"
+    assert format_value(float("nan")) == "NaN"
+
+
+def test_histogram_sum_is_exact():
+    histogram = Histogram("render_seconds", "Render time")
+    for _ in range(3):
+        histogram.observe(1000000.25)
+    assert "render_seconds_sum 3000000.75" in histogram.render()
@@ -0,0 +1,95 @@
+"""Send pipeline: rows count as sent only once their status is saved"""
+from datetime import datetime, timedelta
+
+import openpyxl
+import pytest
+
+from excel_reader import ExcelReader
+from fake_transport import FakeEmailer
+from message_builder import MessageBuilder
+from pipeline import run_send_pipeline
+from workbook_cache import WorkbookCache
+
+
+class RecordingLogger:
+    """EmailLogger stand-in that keeps what was logged"""
+
+    def __init__(self):
+        self.sent = []
+        self.failed = []
+
+    def log_email_sent(self, email, status="Sent"):
+        self.sent.append(email)
+
+    def log_email_failed(self, email, error=""):
+        self.failed.append((email, error))
+
+    def log_invalid_addresses(self, invalid):
+        self.failed.extend((entry['email'], entry['error']) for entry in invalid)
+
+    def log_internal_recipients(self, internal):
+        pass
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "interviews.xlsx"
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.append(["Email", "Date", "Time", "Description", "Status"])
+    start = datetime.now() + timedelta(days=3)
+    for n in range(6):
+        sheet.append([f"candidate{n}@example.com", start.strftime("%Y-%m-%d"), "10:00 AM",
+                      "Technical Interview", None])
+    book.save(path)
+    return str(path)
+
+
+def run(path, tmp_path, save_every=1, fail_saves=False, permanent_failure_rate=0.0):
+    reader = ExcelReader(path, cache=WorkbookCache(str(tmp_path / "cache")))
+    assert reader.load_file()
+    if fail_saves:
+        reader.save = lambda: False
+    emailer = FakeEmailer(latency=0, verbose=False, permanent_failure_rate=permanent_failure_rate,
+                          seed=1, builder=MessageBuilder.from_config())
+    emailer.connect()
+    logger = RecordingLogger()
+    try:
+        results = run_send_pipeline(reader.iter_pending_interviews(), reader, emailer, logger,
+                                    save_every=save_every)
+    finally:
+        emailer.close()
+        reader.close()
+    return results, logger, emailer
+
+
+def statuses(path):
+    sheet = openpyxl.load_workbook(path).active
+    return [row[4] for row in sheet.iter_rows(min_row=2, values_only=True)]
+
+
+def test_saved_rows_count_as_sent(workbook, tmp_path):
+    results, logger, emailer = run(workbook, tmp_path, save_every=4)
+
+    assert results['sent'] == 6
+    assert len(logger.sent) == 6
+    assert statuses(workbook) == ["Sent"] * 6
+
+
+def test_unsaved_rows_count_as_failed(workbook, tmp_path):
+    results, logger, emailer = run(workbook, tmp_path, save_every=4, fail_saves=True)
+
+    assert results['sent'] == 0
+    assert results['failed'] == 6
+    assert logger.sent == []
+    assert {error for _, error in logger.failed} == {"Failed to update Excel"}
+    assert statuses(workbook) == [None] * 6
+
+
+def test_failed_sends_are_not_marked(workbook, tmp_path):
+    results, logger, emailer = run(workbook, tmp_path, permanent_failure_rate=0.5)
+
+    failed = results['failed']
+    assert failed > 0
+    assert results['sent'] + failed == 6
+    assert statuses(workbook).count("Sent") == results['sent']
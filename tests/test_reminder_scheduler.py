@@ -0,0 +1,85 @@
+"""Reminder emails: their own template, and retries of failed sends"""
+import time
+
+from message_builder import MessageBuilder
+from reminder_scheduler import ReminderScheduler, ReminderStore
+
+
+class RecordingEmailer:
+    """Renders with its builder like a real emailer; fails the first `failures` sends"""
+
+    def __init__(self, builder, failures=0):
+        self.builder = builder
+        self.failures = failures
+        self.sent = []
+
+    def send_interview_notification(self, interview_data):
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.sent.append((self.builder.subject, self.builder.render_text(interview_data)))
+        return True
+
+
+def reminder(email="ana@example.com", due_at=None):
+    return {'due_at': due_at if due_at is not None else time.time() - 1, 'offset_hours': 24.0,
+            'email': email, 'date': "2026-03-02", 'time': "9:00 AM",
+            'description': "Technical Interview", 'extra': "{}"}
+
+
+def make_store(tmp_path, *reminders):
+    store = ReminderStore(str(tmp_path / "reminders.db"))
+    store.add_many(list(reminders))
+    return store
+
+
+def test_reminder_uses_reminder_template(tmp_path):
+    store = make_store(tmp_path, reminder())
+    builder = MessageBuilder("Interview Reminder", "Reminder: {description} on {date} at {time}")
+    emailer = RecordingEmailer(builder)
+
+    assert ReminderScheduler(store, emailer).run_due() == 1
+    assert emailer.sent == [("Interview Reminder", "Reminder: Technical Interview on 2026-03-02 at 9:00 AM")]
+    assert store.count_pending() == 0
+    store.close()
+
+
+def test_reminder_builder_from_config_differs_from_notification():
+    reminder_builder = MessageBuilder.reminder_from_config()
+    assert reminder_builder.subject != MessageBuilder.from_config().subject
+    assert reminder_builder.invites is None
+
+
+def test_failed_reminder_stays_pending_with_backoff(tmp_path):
+    store = make_store(tmp_path, reminder())
+    scheduler = ReminderScheduler(store, RecordingEmailer(MessageBuilder(), failures=1),
+                                  max_attempts=3, retry_seconds=60)
+
+    before = time.time()
+    scheduler.run_due()
+    assert store.count_pending() == 1
+    assert store.next_due_at() >= before + 60
+    store.close()
+
+
+def test_failed_reminder_is_retried_then_sent(tmp_path):
+    store = make_store(tmp_path, reminder())
+    emailer = RecordingEmailer(MessageBuilder("Reminder", "{date}"), failures=2)
+    scheduler = ReminderScheduler(store, emailer, max_attempts=3, retry_seconds=0)
+
+    scheduler.run_due()
+    assert len(emailer.sent) == 1
+    assert store.count_pending() == 0
+    store.close()
+
+
+def test_reminder_gives_up_after_max_attempts(tmp_path):
+    store = make_store(tmp_path, reminder())
+    emailer = RecordingEmailer(MessageBuilder(), failures=10)
+    scheduler = ReminderScheduler(store, emailer, max_attempts=3, retry_seconds=0)
+
+    scheduler.run_due()
+    assert emailer.failures == 7
+    assert store.count_pending() == 0
+    assert store.get_due(time.time() + 3600) == []
+    store.close()
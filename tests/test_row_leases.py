@@ -0,0 +1,116 @@
+"""Row leases: concurrent runners send every row exactly once"""
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import openpyxl
+import pytest
+
+from excel_reader import ExcelReader
+from fake_transport import FakeEmailer
+from logger import EmailLogger
+from message_builder import MessageBuilder
+from row_leases import LeaseStore, row_identity, run_leased_send
+
+ROWS = 160
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "interviews.xlsx"
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.append(["Email", "Date", "Time", "Description", "Status"])
+    start = datetime.now() + timedelta(days=3)
+    for n in range(ROWS):
+        sheet.append([f"candidate{n}@example.com", start.strftime("%Y-%m-%d"), "10:00 AM",
+                      "Technical Interview", None])
+    book.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def logger(tmp_path):
+    logger = EmailLogger(str(tmp_path / "email_notifications.log"), index_path=None)
+    yield logger
+    logger.close()
+
+
+def runner(path, db_path, worker, logger, **store_options):
+    """One runner process: its own workbook reader, emailer and lease store"""
+    reader = ExcelReader(path)
+    assert reader.load_file()
+    emailer = FakeEmailer(latency=0.001, verbose=False, builder=MessageBuilder.from_config())
+    emailer.connect()
+    store = LeaseStore(db_path, "interviews.xlsx", worker=worker, **store_options)
+    try:
+        run_leased_send(reader, emailer, logger, store, send_workers=2)
+    finally:
+        store.close()
+        emailer.close()
+        reader.close()
+    return [to for to, _ in emailer.outbox]
+
+
+def statuses(path):
+    sheet = openpyxl.load_workbook(path).active
+    return [row[4] for row in sheet.iter_rows(min_row=2, values_only=True)]
+
+
+def test_each_row_sent_once_across_runners(workbook, tmp_path, logger):
+    db_path = str(tmp_path / "leases.db")
+    outboxes = {}
+
+    def run(worker):
+        outboxes[worker] = runner(workbook, db_path, worker, logger)
+
+    threads = [threading.Thread(target=run, args=(f"runner{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sent = Counter(to for outbox in outboxes.values() for to in outbox)
+    assert len(outboxes) == 4
+    assert set(sent) == {f"candidate{n}@example.com" for n in range(ROWS)}
+    assert set(sent.values()) == {1}
+    assert statuses(workbook) == ["Sent"] * ROWS
+
+
+def test_expired_leases_are_reclaimed(tmp_path):
+    rows = [(n, f"candidate{n}@example.com|2025-12-14|10:00 AM") for n in range(2, 7)]
+    crashed = LeaseStore(str(tmp_path / "leases.db"), "interviews.xlsx", worker="crashed",
+                         lease_seconds=0.05)
+    other = LeaseStore(str(tmp_path / "leases.db"), "interviews.xlsx", worker="other")
+    try:
+        assert crashed.claim(rows) == {2, 3, 4, 5, 6}
+        assert crashed.complete(2)
+        assert other.claim(rows) == set()
+
+        time.sleep(0.1)
+        assert other.expired_rows() == {3, 4, 5, 6}
+        # A row that reached 'sent' is never handed out again
+        assert other.claim(rows) == {3, 4, 5, 6}
+        assert not crashed.complete(3)
+        assert other.sent_rows() == [2]
+    finally:
+        crashed.close()
+        other.close()
+
+
+def test_runner_sends_rows_left_by_a_crashed_runner(workbook, tmp_path, logger):
+    db_path = str(tmp_path / "leases.db")
+    crashed = LeaseStore(db_path, "interviews.xlsx", worker="crashed", lease_seconds=0.05)
+    reader = ExcelReader(workbook)
+    assert reader.load_file()
+    leased = [(i['row_num'], row_identity(i)) for i in reader.get_all_interviews()]
+    reader.close()
+    assert len(crashed.claim(leased)) == ROWS
+    crashed.close()
+
+    time.sleep(0.1)
+    sent = runner(workbook, db_path, "survivor", logger)
+
+    assert sorted(sent) == sorted(f"candidate{n}@example.com" for n in range(ROWS))
+    assert statuses(workbook) == ["Sent"] * ROWS
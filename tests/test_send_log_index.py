@@ -0,0 +1,55 @@
+"""Send log index: lookups by address and date, and rebuilding from the logs"""
+import gzip
+from datetime import datetime
+
+from send_log_index import SendLogIndex, find_log_files
+
+LINES = [
+    "2025-12-13 09:00:00 | INFO | Email: Old@Example.com | Status: Sent\n",
+    "2025-12-14 10:30:15 | INFO | SESSION START | Total emails to send: 2\n",
+    "2025-12-14 10:30:16 | INFO | Email: john@example.com | Status: Sent\n",
+    "2025-12-14 10:30:18 | ERROR | Email: jane@example.com | Status: Failed | Error: 550 Mailbox unavailable\n",
+]
+
+
+def test_lookup_by_address_and_date(tmp_path):
+    index = SendLogIndex(str(tmp_path / "index.db"))
+    try:
+        index.record("John@Example.com", "Failed", "email_notifications.log", datetime(2025, 12, 13, 9))
+        index.record("john@example.com", "Sent", "email_notifications.log", datetime(2025, 12, 14, 10, 30))
+        index.record("jane@example.com", "Sent", "email_notifications.log", datetime(2025, 12, 15, 8))
+
+        entries = index.lookup(" JOHN@example.com ")
+        assert [(e['logged_at'], e['status']) for e in entries] == [
+            ("2025-12-13 09:00:00", "Failed"), ("2025-12-14 10:30:00", "Sent")]
+        assert index.was_notified("john@example.com", "2025-12-14", "2025-12-14")
+        assert not index.was_notified("john@example.com", "2025-12-13", "2025-12-13")
+        assert index.sent_since("2025-12-14") == [("john@example.com", "2025-12-14 10:30:00"),
+                                                  ("jane@example.com", "2025-12-15 08:00:00")]
+    finally:
+        index.close()
+
+
+def test_rebuild_from_logs_and_archives(tmp_path):
+    log_file = tmp_path / "email_notifications.log"
+    archive = tmp_path / "email_notifications.log.20251214-000000-000000.gz"
+    with gzip.open(archive, "wt", encoding="utf-8") as f:
+        f.write(LINES[0])
+    log_file.write_text("".join(LINES[1:]), encoding="utf-8")
+
+    log_files = find_log_files([str(log_file)])
+    assert log_files == [str(archive), str(log_file)]
+
+    index = SendLogIndex(str(tmp_path / "index.db"))
+    try:
+        index.record("stale@example.com", "Sent", str(log_file))
+        assert index.rebuild(log_files) == 3
+
+        assert index.lookup("stale@example.com") == []
+        assert index.lookup("old@example.com") == [
+            {'logged_at': "2025-12-13 09:00:00", 'status': "Sent", 'log_file': str(archive)}]
+        assert index.lookup("jane@example.com") == [
+            {'logged_at': "2025-12-14 10:30:18", 'status': "Failed", 'log_file': str(log_file)}]
+        assert index.was_notified("john@example.com", "2025-12-14")
+    finally:
+        index.close()
@@ -0,0 +1,91 @@
+"""Sender pool: only failures an identity causes fail over or rest it"""
+import smtplib
+
+import pytest
+
+from fake_transport import FakeEmailer
+from message_builder import MessageBuilder
+from send_retry import PermanentSendError, TransientSendError
+from sender_pool import SenderIdentity, SenderPool
+
+
+class ScriptedEmailer:
+    """Emailer whose deliveries raise the queued errors, then succeed"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.delivered = []
+        self.verbose = False
+        self.builder = MessageBuilder.from_config()
+
+    def deliver(self, message):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.delivered.append(message['to'])
+
+
+def pool(*emailers, **options):
+    identities = [SenderIdentity(f"id{n}", emailer, daily_quota=10) for n, emailer in enumerate(emailers)]
+    return SenderPool(identities, usage_file=None, failover_attempts=len(emailers) - 1, **options)
+
+
+@pytest.mark.parametrize("error", [
+    PermanentSendError("550 5.1.1 Mailbox unavailable"),
+    smtplib.SMTPRecipientsRefused({"x@example.com": (550, b"5.1.1 No such user")}),
+    smtplib.SMTPDataError(554, b"5.6.0 Message rejected"),
+])
+def test_permanent_rejection_is_not_failed_over(error):
+    first, second = ScriptedEmailer(error), ScriptedEmailer()
+    senders = pool(first, second, failures_before_cooldown=1)
+
+    assert not senders.send_message({'to': "x@example.com"})
+
+    assert second.delivered == []
+    a, b = senders.identities
+    assert (a.failed, a.failures, a.cooldown_until, a.sent_today) == (1, 0, 0.0, 0)
+    assert (b.failed, b.sent_today) == (0, 0)
+
+
+def test_temporary_failures_fail_over_and_rest_the_identity():
+    throttled = [TransientSendError("421 4.7.0 Too many messages")] * 2
+    first, second = ScriptedEmailer(*throttled), ScriptedEmailer()
+    senders = pool(first, second, failures_before_cooldown=2, cooldown_seconds=60)
+
+    assert senders.send_message({'to': "a@example.com"})
+    a, b = senders.identities
+    assert (a.failures, a.cooldown_until) == (1, 0.0)
+    assert senders.send_message({'to': "b@example.com"})
+    assert senders.send_message({'to': "c@example.com"})
+
+    assert second.delivered == ["a@example.com", "b@example.com", "c@example.com"]
+    assert a.failures == 2
+    assert a.cooldown_until > 0
+    assert b.sent == 3
+
+
+def test_sender_refusals_fail_over():
+    refused = smtplib.SMTPSenderRefused(550, b"5.7.1 Not allowed to send as this address", "hr@example.com")
+    first, second = ScriptedEmailer(refused), ScriptedEmailer()
+    senders = pool(first, second)
+
+    assert senders.send_message({'to': "a@example.com"})
+    assert second.delivered == ["a@example.com"]
+
+
+def test_rejected_recipients_do_not_slow_the_pool():
+    emailers = [FakeEmailer(latency=0, verbose=False, permanent_failure_rate=0.3, seed=n,
+                            builder=MessageBuilder.from_config()) for n in range(2)]
+    identities = [SenderIdentity(f"id{n}", emailer) for n, emailer in enumerate(emailers)]
+    senders = SenderPool(identities, usage_file=None, failures_before_cooldown=1, cooldown_seconds=3600)
+    assert senders.connect()
+    try:
+        results = [senders.send_message({'to': f"candidate{n}@example.com", 'mime': b""}) for n in range(60)]
+    finally:
+        senders.close()
+
+    failed = results.count(False)
+    assert failed > 0
+    # Each rejected recipient was tried once, and nobody was rested
+    assert sum(e.stats['permanent'] for e in emailers) == failed
+    assert sum(e.stats['sent'] for e in emailers) == 60 - failed
+    assert all(i.cooldown_until == 0.0 for i in senders.identities)
@@ -0,0 +1,71 @@
+"""Workbook cache: snapshots read like pandas.read_excel and follow file edits"""
+import shutil
+from datetime import datetime, time
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from workbook_cache import WorkbookCache, parse_workbook
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "interviews.xlsx"
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.append(["Email", "Date", "Time", None, "Score", "Score", "Hired", "Notes"])
+    sheet.append(["john@example.com", datetime(2025, 12, 14), time(10, 30), "x", 4.0, 3.5, True, None])
+    sheet.append(["jane@example.com", "2025-12-15", "2:30 PM", None, 5, None, False, "called"])
+    sheet.append([None] * 8)
+    sheet.append(["li@example.com", datetime(2025, 12, 16, 9), None, 7, None, 1, None, 12.25])
+    sheet.append([None, None, None, None, None, None, None, None])
+    book.save(path)
+    return str(path)
+
+
+def test_snapshot_dataframe_matches_read_excel(workbook, tmp_path):
+    expected = pd.read_excel(workbook)
+
+    with parse_workbook(workbook) as snapshot:
+        pd.testing.assert_frame_equal(snapshot.to_dataframe(), expected)
+
+    cache = WorkbookCache(str(tmp_path / "cache"))
+    cache.load(workbook).close()
+    with cache.load(workbook) as snapshot:
+        assert cache.stats['hits'] == 1
+        pd.testing.assert_frame_equal(snapshot.to_dataframe(), expected)
+
+
+def test_empty_sheet_matches_read_excel(tmp_path):
+    path = str(tmp_path / "empty.xlsx")
+    openpyxl.Workbook().save(path)
+
+    with parse_workbook(path) as snapshot:
+        pd.testing.assert_frame_equal(snapshot.to_dataframe(), pd.read_excel(path))
+
+
+def test_cache_follows_file_changes(workbook, tmp_path):
+    cache = WorkbookCache(str(tmp_path / "cache"))
+    with cache.load(workbook) as snapshot:
+        assert snapshot.column(1)[0] == "john@example.com"
+    with cache.load(workbook):
+        pass
+    assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0}
+
+    book = openpyxl.load_workbook(workbook)
+    book.active["A2"] = "johnny@example.com"
+    book.save(workbook)
+
+    with cache.load(workbook) as snapshot:
+        assert snapshot.column(1)[0] == "johnny@example.com"
+        pd.testing.assert_frame_equal(snapshot.to_dataframe(), pd.read_excel(workbook))
+    assert cache.stats['misses'] == 2
+
+    # A copy of the same content shares the entry
+    copy = str(tmp_path / "upload.xlsx")
+    shutil.copyfile(workbook, copy)
+    with cache.load(copy) as snapshot:
+        assert snapshot.column(1)[0] == "johnny@example.com"
+    assert cache.stats['hits'] == 2
+    assert len(cache.entries()) == 2
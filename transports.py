@@ -0,0 +1,49 @@
+"""
+Transports Module
+Creates the emailer for the transport selected in email_config
+"""
+from typing import Dict, List, Optional
+try:
+    from email_config import EMAIL_TRANSPORT, SENDER_IDENTITIES
+except ImportError:
+    EMAIL_TRANSPORT = "outlook"
+    SENDER_IDENTITIES = []
+
+
+TRANSPORTS = ("outlook", "smtp", "fake")
+
+
+def create_emailer(transport: Optional[str] = None, identities: Optional[List[Dict]] = None, **kwargs):
+    """
+    Create an emailer for the configured transport
+
+    Every emailer provides connect(), submit(), send_interview_notification()
+    and close().
+
+    Args:
+        transport: Transport name (defaults to EMAIL_TRANSPORT)
+        identities: Sender identities to spread messages over (defaults to
+                    SENDER_IDENTITIES; empty = send from the default account)
+        **kwargs: Passed through to the emailer constructor
+
+    Returns:
+        Unconnected emailer instance
+    """
+    transport = (transport or EMAIL_TRANSPORT).lower()
+    identities = SENDER_IDENTITIES if identities is None else identities
+
+    if identities and transport in TRANSPORTS:
+        from sender_pool import create_sender_pool
+        return create_sender_pool(transport, identities, **kwargs)
+
+    if transport == "outlook":
+        from outlook_worker import QueuedOutlookEmailer
+        return QueuedOutlookEmailer(**kwargs)
+    if transport == "smtp":
+        from smtp_sender import SMTPEmailer
+        return SMTPEmailer(**kwargs)
+    if transport == "fake":
+        from fake_transport import FakeEmailer
+        return FakeEmailer(**kwargs)
+
+    raise ValueError(f"Unknown email transport '{transport}' (expected one of: {', '.join(TRANSPORTS)})")
@@ -0,0 +1,271 @@
+"""
+Watch Daemon - Interview Notification Scheduler
+Watches a drop directory for new or changed workbooks and sends their
+pending notifications, keeping the transport connection and compiled
+templates warm between batches
+"""
+import importlib
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from address_validator import AddressValidator
+from excel_reader import ExcelReader
+from logger import EmailLogger
+from main import print_internal_recipients, print_invalid_addresses, print_late_interviews
+from message_builder import MessageBuilder
+from metrics import start_metrics_server
+from pipeline import run_send_pipeline
+from send_queue import PrioritySendQueue
+from transports import create_emailer
+try:
+    import email_config
+    from email_config import WATCH_DIRECTORY, WATCH_POLL_SECONDS
+except ImportError:
+    email_config = None
+    WATCH_DIRECTORY = "incoming"
+    WATCH_POLL_SECONDS = 2.0
+
+
+class DirectoryIndex:
+    """Tracks (mtime, size) of the workbooks in a directory"""
+
+    def __init__(self, directory: str, suffix: str = ".xlsx"):
+        """
+        Initialize directory index
+
+        Args:
+            directory: Directory to watch
+            suffix: File extension of interest
+        """
+        self.directory = directory
+        self.suffix = suffix
+        self._known: Dict[str, Tuple[int, int]] = {}
+        self._settling: Dict[str, Tuple[int, int]] = {}
+
+    def scan(self) -> List[str]:
+        """
+        Stat the directory once and report workbooks that changed
+
+        A file is reported only after its signature is unchanged for two
+        consecutive scans, so workbooks still being copied are not read.
+
+        Returns:
+            Paths of new or changed workbooks
+        """
+        ready = []
+        seen = set()
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                # Skip Excel lock files ("~$name.xlsx") and non-workbooks
+                if not entry.is_file() or entry.name.startswith("~$") or not entry.name.endswith(self.suffix):
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+                seen.add(entry.path)
+
+                if self._known.get(entry.path) == signature:
+                    continue
+                if self._settling.get(entry.path) == signature:
+                    del self._settling[entry.path]
+                    ready.append(entry.path)
+                else:
+                    self._settling[entry.path] = signature
+
+        # Forget deleted files
+        for path in list(self._known):
+            if path not in seen:
+                del self._known[path]
+        for path in list(self._settling):
+            if path not in seen:
+                del self._settling[path]
+
+        return ready
+
+    def remember(self, path: str):
+        """Record the current signature of a file (e.g. after we wrote to it)"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        self._known[path] = (stat.st_mtime_ns, stat.st_size)
+
+
+class NotificationDaemon:
+    """Long-running sender that processes workbooks as they arrive"""
+
+    def __init__(self, directory: str = WATCH_DIRECTORY, poll_seconds: float = WATCH_POLL_SECONDS,
+                 emailer=None, logger: Optional[EmailLogger] = None):
+        """
+        Initialize daemon
+
+        Args:
+            directory: Drop directory to watch
+            poll_seconds: Seconds between directory scans
+            emailer: Emailer to use (defaults to the configured transport)
+            logger: Email logger
+        """
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self.emailer = emailer or create_emailer()
+        self.logger = logger or EmailLogger()
+        self.index = DirectoryIndex(directory)
+        self.validator = AddressValidator()
+        self._config_mtime = self._config_signature()
+        self._running = False
+
+    @staticmethod
+    def _config_signature() -> Optional[int]:
+        try:
+            return os.stat(email_config.__file__).st_mtime_ns
+        except (OSError, AttributeError, TypeError):
+            return None
+
+    def reload_config_if_changed(self) -> bool:
+        """
+        Reload email_config.py if it changed on disk and recompile templates
+
+        Templates, domain policy, SEND_HTML, PIPELINE_* and SEND_* settings
+        apply from the next workbook. Transport settings (EMAIL_TRANSPORT,
+        SMTP_*, SENDER_IDENTITIES) still need a restart.
+
+        Returns:
+            True if the configuration was reloaded
+        """
+        signature = self._config_signature()
+        if email_config is None or signature == self._config_mtime:
+            return False
+        self._config_mtime = signature
+
+        try:
+            config = importlib.reload(email_config)
+        except Exception as e:
+            print(f"✗ Error reloading email_config.py, keeping previous settings: {str(e)}")
+            return False
+
+        # Keep the sender the transport was configured with
+        sender = self.emailer.builder.sender
+        self.emailer.builder = MessageBuilder.from_config(config)
+        if sender:
+            self.emailer.builder.sender = sender
+        self.validator = AddressValidator(getattr(config, "BLOCKED_DOMAINS", []),
+                                          getattr(config, "INTERNAL_DOMAINS", []))
+        print("✓ Reloaded email_config.py")
+        return True
+
+    def process_workbook(self, path: str) -> Tuple[int, int]:
+        """
+        Send pending notifications from one workbook
+
+        Args:
+            path: Workbook path
+
+        Returns:
+            Tuple of (sent count, failed count)
+        """
+        excel_reader = ExcelReader(path, fields=self.emailer.builder.fields)
+        if not excel_reader.load_file():
+            return 0, 0
+
+        try:
+            interviews = excel_reader.iter_pending_interviews(count_skipped=True)
+            queue = None
+            # Read from the module so a reloaded config takes effect
+            if getattr(email_config, "SEND_PRIORITY", False):
+                queue = PrioritySendQueue(
+                    interviews,
+                    round_weights=getattr(email_config, "SEND_ROUND_WEIGHTS", {}),
+                    deadline_mode=getattr(email_config, "SEND_DEADLINE_MODE", "warn"),
+                    min_notice_minutes=getattr(email_config, "SEND_MIN_NOTICE_MINUTES", 60),
+                    window=getattr(email_config, "SEND_PRIORITY_WINDOW", 10000)
+                )
+                interviews = queue
+            results = run_send_pipeline(
+                interviews, excel_reader, self.emailer, self.logger, self.validator,
+                render_workers=getattr(email_config, "PIPELINE_RENDER_WORKERS", 1),
+                send_workers=getattr(email_config, "PIPELINE_SEND_WORKERS", 1),
+                save_every=getattr(email_config, "PIPELINE_SAVE_EVERY", 1),
+                queue_size=getattr(email_config, "PIPELINE_QUEUE_SIZE", 100)
+            )
+            print_invalid_addresses(results['invalid'])
+            print_internal_recipients(results['internal'])
+            late = queue.late if queue else []
+            print_late_interviews(late, self.logger)
+            return results['sent'], results['failed'] + sum(1 for entry in late if entry['skipped'])
+        finally:
+            excel_reader.close()
+            # Our own status write-back must not trigger another pass
+            self.index.remember(path)
+
+    def run_once(self) -> Tuple[int, int]:
+        """
+        Scan the drop directory once and process whatever changed
+
+        Returns:
+            Tuple of (sent count, failed count) for this pass
+        """
+        self.reload_config_if_changed()
+        sent_total = 0
+        failed_total = 0
+
+        for path in self.index.scan():
+            start = time.perf_counter()
+            try:
+                sent, failed = self.process_workbook(path)
+            except Exception as e:
+                # One bad workbook must not stop the daemon; retry it once it changes
+                print(f"✗ Error processing {os.path.basename(path)}: {str(e)}")
+                self.logger.logger.exception(f"Error processing {path}")
+                self.index.remember(path)
+                continue
+            sent_total += sent
+            failed_total += failed
+            if sent or failed:
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"✓ {os.path.basename(path)}: {sent} sent, {failed} failed in {elapsed:.0f} ms")
+                self.logger.log_session_end(sent, failed)
+
+        return sent_total, failed_total
+
+    def run_forever(self) -> bool:
+        """
+        Connect once and keep processing until stopped
+
+        Returns:
+            False if the transport could not be connected
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if not self.emailer.connect():
+            self.emailer.close()
+            return False
+
+        self.logger.log_session_start()
+        print(f"✓ Watching '{self.directory}' for workbooks (every {self.poll_seconds:g}s)")
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    self.run_once()
+                except Exception as e:
+                    # e.g. the drop directory was unmounted; try again next poll
+                    print(f"✗ Error watching '{self.directory}': {str(e)}")
+                    self.logger.logger.exception(f"Error watching {self.directory}")
+                time.sleep(self.poll_seconds)
+        finally:
+            self.emailer.close()
+        return True
+
+    def stop(self):
+        """Stop run_forever() after the current pass"""
+        self._running = False
+
+
+if __name__ == "__main__":
+    start_metrics_server()
+    daemon = NotificationDaemon(sys.argv[1] if len(sys.argv) > 1 else WATCH_DIRECTORY)
+    try:
+        if not daemon.run_forever():
+            sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n✓ Watch daemon stopped.")
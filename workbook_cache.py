@@ -0,0 +1,585 @@
+"""
+Workbook Cache Module
+Keeps a parsed copy of each workbook sheet on disk so the CLI and the web
+app only pay for openpyxl parsing the first time they see a file's content
+"""
+import array
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+try:
+    from email_config import WORKBOOK_CACHE_DIR, WORKBOOK_CACHE_MB
+except ImportError:
+    WORKBOOK_CACHE_DIR = ".workbook_cache"
+    WORKBOOK_CACHE_MB = 256
+
+
+MAGIC = b"WBSNAP2\n"
+
+# Snapshot file: MAGIC, header length (8 bytes), JSON layout, the header row
+# as JSON, then per column a JSON table of its distinct values and an array
+# of codes into that table. Only plain data is stored (dates and times as
+# tagged ISO strings), so reading a cache file can't run code.
+_LENGTH = struct.Struct("<Q")
+_ALIGN = 8
+
+# Cache key used for the workbook's active sheet
+ACTIVE_SHEET = "@active"
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _encode_value(value):
+    """JSON form of the cell values json can't store natively"""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, dt_time):
+        return {"t": value.isoformat()}
+    if isinstance(value, timedelta):
+        return {"td": value.total_seconds()}
+    raise TypeError(f"Cannot cache a cell value of type {type(value).__name__}")
+
+
+def _decode_value(tagged: Dict):
+    """Inverse of _encode_value (cells never hold dicts, so every object is tagged)"""
+    if "dt" in tagged:
+        return datetime.fromisoformat(tagged["dt"])
+    if "d" in tagged:
+        return date.fromisoformat(tagged["d"])
+    if "t" in tagged:
+        return dt_time.fromisoformat(tagged["t"])
+    if "td" in tagged:
+        return timedelta(seconds=tagged["td"])
+    raise ValueError(f"Unknown cached value {tagged!r}")
+
+
+def _dumps(values: List[Any]) -> bytes:
+    return json.dumps(values, default=_encode_value, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(blob) -> List[Any]:
+    return json.loads(bytes(blob), object_hook=_decode_value)
+
+
+def _pandas_cell(value):
+    """A cell as pandas.read_excel's openpyxl reader passes it to its parser"""
+    if value is None:
+        return ""
+    if type(value) is float:
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value in _ERROR_CODES:
+        return math.nan
+    return value
+
+
+# Excel error values, which read_excel turns into NaN
+_ERROR_CODES = frozenset(("#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A"))
+
+
+def _code_type(distinct: int) -> str:
+    """Smallest array type code that can number `distinct` values"""
+    if distinct <= 0xFF:
+        return "B"
+    if distinct <= 0xFFFF:
+        return "H"
+    return "I"
+
+
+class Column(Sequence):
+    """
+    One column of a snapshot
+
+    Values are stored once in a table and rows refer to them by number, so
+    a status or date column costs a byte or two per row. The table is only
+    decoded when the column is first read.
+    """
+
+    def __init__(self, codes: Sequence[int], values: Optional[List[Any]] = None, blob=None):
+        self._codes = codes
+        self._values = values
+        self._blob = blob
+
+    @property
+    def values(self) -> List[Any]:
+        """Distinct values of the column"""
+        if self._values is None:
+            self._values = _loads(self._blob)
+            self._blob = None
+        return self._values
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index):
+        values = self.values
+        if isinstance(index, slice):
+            return [values[code] for code in self._codes[index]]
+        return values[self._codes[index]]
+
+    def __iter__(self) -> Iterator[Any]:
+        values = self.values
+        return map(values.__getitem__, self._codes)
+
+
+class Snapshot:
+    """
+    Header and column values of one worksheet (rows after the header)
+
+    A snapshot opened from a file keeps it mapped until close(); use it as
+    a context manager, or close it once its values have been read.
+    """
+
+    def __init__(self, headers: List[Any], columns: List[Column], rows: int, digest: Optional[str] = None,
+                 mapping: Optional[mmap.mmap] = None, views: Optional[List[memoryview]] = None):
+        self.headers = headers
+        self.columns = columns
+        self.rows = rows
+        self.digest = digest
+        self._mapping = mapping
+        self._views = views or []
+
+    def close(self):
+        """Unmap the snapshot file (columns can't be read afterwards)"""
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @classmethod
+    def from_rows(cls, rows, digest: Optional[str] = None) -> "Snapshot":
+        """
+        Build a snapshot from worksheet rows
+
+        Args:
+            rows: Row value tuples, header row first (e.g. iter_rows(values_only=True))
+            digest: Content hash of the workbook the rows came from
+
+        Returns:
+            Snapshot with trailing empty rows dropped
+        """
+        rows = iter(rows)
+        headers = list(next(rows, ()))
+        tables: List[Dict[Any, int]] = [{} for _ in headers]
+        codes: List[List[int]] = [[] for _ in headers]
+        count = 0
+        last = 0
+        for row in rows:
+            count += 1
+            if len(row) > len(codes):
+                # A row wider than the header: earlier rows were empty there
+                for _ in range(len(row) - len(codes)):
+                    tables.append({(None.__class__, None): 0})
+                    codes.append([0] * (count - 1))
+                    headers.append(None)
+            for index, column in enumerate(codes):
+                value = row[index] if index < len(row) else None
+                table = tables[index]
+                # Key on the type too, so 1, 1.0 and True stay apart
+                key = (value.__class__, value)
+                code = table.get(key)
+                if code is None:
+                    code = table[key] = len(table)
+                column.append(code)
+                if value is not None:
+                    last = count
+        columns = []
+        for table, column in zip(tables, codes):
+            values = [value for _, value in table]
+            columns.append(Column(column[:last], values))
+        return cls(headers, columns, last, digest)
+
+    def column(self, number: int) -> Column:
+        """
+        A column by its 1-based sheet number
+
+        Columns beyond the last one with a header or value read as empty.
+        """
+        if 1 <= number <= len(self.columns):
+            return self.columns[number - 1]
+        return Column(bytes(self.rows), [None])
+
+    def sheet_data(self) -> List[List[Any]]:
+        """
+        Rows (header first) as pandas.read_excel reads them with openpyxl:
+        empty cells as "", whole floats as ints, error values as NaN, and
+        trailing empty cells and rows trimmed
+
+        Returns:
+            List of equally long rows
+        """
+        columns = [[header, *column] for header, column in zip(self.headers, self.columns)]
+        data = []
+        last = -1
+        for number, row in enumerate(zip(*columns)):
+            row = [_pandas_cell(value) for value in row]
+            while row and row[-1] == "":
+                row.pop()
+            if row:
+                last = number
+            data.append(row)
+        data = data[:last + 1]
+        if data:
+            width = max(len(row) for row in data)
+            data = [row + [""] * (width - len(row)) for row in data]
+        return data
+
+    def to_dataframe(self):
+        """
+        The sheet as a DataFrame, the same as pandas.read_excel(file) gives:
+        same column names ("Unnamed: 3", "Name.1"), dtypes and NaN for blanks
+
+        Returns:
+            pandas DataFrame
+        """
+        import pandas as pd
+        from pandas.io.parsers import TextParser
+
+        data = self.sheet_data()
+        if not data:
+            return pd.DataFrame()
+        return TextParser(data, header=0, skip_blank_lines=False).read()
+
+    def write(self, path: str):
+        """
+        Write the snapshot to a file (atomically, so concurrent readers
+        never see a partial file)
+
+        Args:
+            path: Destination file
+        """
+        blobs = []
+        offset = 0
+
+        def add(blob) -> List[int]:
+            nonlocal offset
+            padding = -offset % _ALIGN
+            blobs.append(b"\0" * padding)
+            blobs.append(blob)
+            offset += padding + len(blob)
+            return [offset - len(blob), len(blob)]
+
+        headers = add(_dumps(self.headers))
+        layout = []
+        for column in self.columns:
+            typecode = _code_type(len(column.values))
+            layout.append({
+                "values": add(_dumps(column.values)),
+                "codes": add(array.array(typecode, column._codes).tobytes()),
+                "type": typecode,
+            })
+
+        header = json.dumps({
+            "rows": self.rows,
+            "digest": self.digest,
+            "byteorder": sys.byteorder,
+            "headers": headers,
+            "columns": layout,
+        }).encode("utf-8")
+        start = len(MAGIC) + _LENGTH.size + len(header)
+        header += b" " * (-start % _ALIGN)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC)
+                f.write(_LENGTH.pack(len(header)))
+                f.write(header)
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def open(cls, path: str) -> Optional["Snapshot"]:
+        """
+        Map a snapshot file into memory
+
+        Only the header is parsed; column codes are read straight from the
+        mapping and value tables are decoded when a column is first used.
+        The file stays mapped until the snapshot is closed.
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            Snapshot, or None if the file isn't a usable snapshot
+        """
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        views = []
+        try:
+            if data[:len(MAGIC)] != MAGIC:
+                # e.g. an older snapshot format
+                raise ValueError("not a snapshot")
+            position = len(MAGIC) + _LENGTH.size
+            (length,) = _LENGTH.unpack(data[len(MAGIC):position])
+            header = json.loads(data[position:position + length])
+            if header["byteorder"] != sys.byteorder:
+                raise ValueError("snapshot written on another byte order")
+            view = memoryview(data)[position + length:]
+            views.append(view)
+            columns = []
+            for entry in header["columns"]:
+                start, size = entry["codes"]
+                codes = view[start:start + size].cast(entry["type"])
+                start, size = entry["values"]
+                blob = view[start:start + size]
+                views.extend((codes, blob))
+                columns.append(Column(codes, blob=blob))
+            start, size = header["headers"]
+            headers = _loads(view[start:start + size])
+            return cls(headers, columns, header["rows"], header["digest"], data, views)
+        except (KeyError, ValueError, TypeError, struct.error):
+            for view in reversed(views):
+                view.release()
+            data.close()
+            return None
+
+
+def parse_workbook(file_path: str, sheet: Optional[str] = None, digest: Optional[str] = None) -> Snapshot:
+    """
+    Parse a worksheet with openpyxl (read-only mode, values only)
+
+    Args:
+        file_path: Workbook path
+        sheet: Sheet name (None = the active sheet)
+        digest: Content hash recorded in the snapshot
+
+    Returns:
+        Snapshot of the sheet
+    """
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        return Snapshot.from_rows(worksheet.iter_rows(values_only=True), digest)
+    finally:
+        workbook.close()
+
+
+class WorkbookCache:
+    """
+    Directory of sheet snapshots keyed by workbook content
+
+    Snapshots are named after the SHA-256 of the workbook file and the
+    sheet, so a copy of a workbook (e.g. the web app's upload) hits the
+    same entry and any edit to the file misses. Every process using the
+    same directory shares the entries. The least recently used ones are
+    removed once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: Optional[str] = WORKBOOK_CACHE_DIR,
+                 max_bytes: int = WORKBOOK_CACHE_MB * 1024 * 1024):
+        """
+        Initialize workbook cache
+
+        Args:
+            directory: Snapshot directory (None = parse every time, keep nothing)
+            max_bytes: Size cap of the directory
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    def path_for(self, digest: str, sheet: Optional[str] = None) -> str:
+        sheet_key = hashlib.sha256((sheet or ACTIVE_SHEET).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}-{sheet_key}.snap")
+
+    def load(self, file_path: str, sheet: Optional[str] = None) -> Snapshot:
+        """
+        Snapshot of a workbook sheet, parsing the workbook only on a miss
+
+        Args:
+            file_path: Workbook path
+            sheet: Sheet name (None = the active sheet)
+
+        Returns:
+            Snapshot (raises if the workbook can't be read); close it when done
+        """
+        digest = file_digest(file_path)
+        if self.directory:
+            path = self.path_for(digest, sheet)
+            snapshot = Snapshot.open(path) if os.path.exists(path) else None
+            if snapshot is not None and snapshot.digest == digest:
+                self._touch(path)
+                with self._lock:
+                    self.stats['hits'] += 1
+                return snapshot
+            if snapshot is not None:
+                snapshot.close()
+
+        snapshot = parse_workbook(file_path, sheet, digest)
+        with self._lock:
+            self.stats['misses'] += 1
+        self.store(snapshot, sheet)
+        return snapshot
+
+    def store(self, snapshot: Snapshot, sheet: Optional[str] = None) -> bool:
+        """
+        Save a snapshot under its digest and trim the directory
+
+        Args:
+            snapshot: Snapshot with its workbook digest set
+            sheet: Sheet name (None = the active sheet)
+
+        Returns:
+            True if the snapshot was written
+        """
+        if not self.directory or not snapshot.digest:
+            return False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            snapshot.write(self.path_for(snapshot.digest, sheet))
+        except (OSError, TypeError, ValueError) as e:
+            # TypeError: a cell type the JSON format doesn't cover
+            print(f"⚠ Warning: Could not write workbook cache: {str(e)}")
+            return False
+        self.evict()
+        return True
+
+    @staticmethod
+    def _touch(path: str):
+        """Record a use, for least-recently-used eviction"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def entries(self) -> List[os.DirEntry]:
+        """Snapshot files, least recently used first"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".snap") and e.is_file()]
+        return sorted(entries, key=lambda e: e.stat().st_mtime)
+
+    def size(self) -> int:
+        return sum(e.stat().st_size for e in self.entries())
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used snapshots until the directory fits max_bytes
+
+        Returns:
+            Number of snapshots removed
+        """
+        entries = self.entries()
+        total = sum(e.stat().st_size for e in entries)
+        removed = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                # Another process removed it, or (on Windows) still has it mapped
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self.stats['evictions'] += removed
+        return removed
+
+    def clear(self) -> int:
+        """Remove every snapshot; returns how many were removed"""
+        removed = 0
+        for entry in self.entries():
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+_default_cache: Optional[WorkbookCache] = None
+
+
+def default_cache() -> WorkbookCache:
+    """Process-wide cache configured by WORKBOOK_CACHE_DIR / WORKBOOK_CACHE_MB"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = WorkbookCache()
+    return _default_cache
+
+
+def load_snapshot(file_path: str, sheet: Optional[str] = None) -> Snapshot:
+    """Snapshot of a workbook sheet from the shared cache (close it when done)"""
+    return default_cache().load(file_path, sheet)
+
+
+def benchmark(file_path: str, repeat: int = 5) -> Dict[str, float]:
+    """
+    Time a cold parse against reopening the cached snapshot
+
+    Args:
+        file_path: Workbook to load
+        repeat: Number of warm reopens
+
+    Returns:
+        Seconds for the cold load and the fastest warm load
+    """
+    cache = WorkbookCache(tempfile.mkdtemp(prefix="workbook_cache_"))
+    started = time.perf_counter()
+    cold = cache.load(file_path)
+    cold_seconds = time.perf_counter() - started
+    warm_seconds = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with cache.load(file_path) as warm:
+            # Read one column the way ExcelReader does, so lazy decoding is counted
+            sum(1 for value in warm.column(1) if value)
+        warm_seconds = min(warm_seconds, time.perf_counter() - started)
+    cache.clear()
+    os.rmdir(cache.directory)
+    return {'rows': cold.rows, 'cold': cold_seconds, 'warm': warm_seconds}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python workbook_cache.py WORKBOOK   (time a cold parse against a cached reopen)")
+        print("       python workbook_cache.py --clear    (empty the workbook cache)")
+        sys.exit(1)
+    if sys.argv[1] == "--clear":
+        print(f"✓ Removed {default_cache().clear()} cached sheet(s) from {WORKBOOK_CACHE_DIR}")
+        sys.exit(0)
+    result = benchmark(sys.argv[1])
+    print(f"{result['rows']} rows: parse {result['cold'] * 1000:.0f} ms, "
+          f"cached reopen {result['warm'] * 1000:.1f} ms")